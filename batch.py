@@ -0,0 +1,235 @@
+"""
+Batch query module for propositional logic resolution prover.
+Prepares a knowledge base once and answers many queries against it.
+
+The knowledge base is simplified with consequences of itself only, so the result can be
+shared by every query: clauses are strengthened with the knowledge base's unit clauses,
+subsumed clauses are removed, and a bounded number of knowledge-base-only resolvents is
+added. Its consistency is decided once with the CDCL solver. Each query is then answered
+with the set-of-support strategy, using its negation as the support, so that resolution
+never repeats work between knowledge base clauses.
+
+Queries are independent, so they can also be answered by a pool of worker processes.
+The prepared knowledge base and the atom table are sent to each worker once, when it
+starts, and only the negated queries and their results cross process boundaries.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from clause_index import SubsumptionIndex
+from literals import atom_table, auxiliary_atoms, load_atom_table
+from profiling import phase
+from resolver import sentence_to_clause_set, resolve_clause_pair
+from resolver_cdcl import CDCLSolver
+
+EMPTY_CLAUSE = frozenset()
+
+# Shared state of a worker process, set by _init_worker
+_worker_state = {}
+
+# Statistics that are not totals, so that summing them over queries is meaningless:
+# ratios, and the memory statistics of each search (its growth, rate and samples)
+RATIO_STATS = {"parallel_utilisation"}
+PER_SEARCH_PREFIXES = ("memory_",)
+
+
+def _reduce(clauses, stats):
+    """
+    Strengthens clauses with unit clauses (keeping the units) and removes subsumed clauses.
+
+    Returns:
+        SubsumptionIndex: Index holding the reduced clause set
+    """
+    clauses = set(clauses)
+    units = {next(iter(clause)) for clause in clauses if len(clause) == 1}
+    pending = set(units)
+    while pending:
+        falsified = {-literal for literal in pending}
+        pending = set()
+        for clause in [clause for clause in clauses if len(clause) > 1 and not clause.isdisjoint(falsified)]:
+            clauses.discard(clause)
+            strengthened = clause - falsified
+            stats["kb_literals_removed"] += len(clause) - len(strengthened)
+            clauses.add(strengthened)
+            if len(strengthened) == 1 and next(iter(strengthened)) not in units:
+                literal = next(iter(strengthened))
+                units.add(literal)
+                pending.add(literal)
+        if any(-literal in units for literal in units):
+            clauses.add(EMPTY_CLAUSE)
+            break
+
+    index = SubsumptionIndex()
+    # Shorter clauses first, so that only forward subsumption is needed
+    for clause in sorted(clauses, key=len):
+        if index.subsumed(clause):
+            stats["kb_subsumed_clauses"] += 1
+        else:
+            index.add(clause)
+    return index
+
+
+def prepare_knowledge_base(knowledge_base, rounds=1, max_resolvents=None):
+    """
+    Preprocesses and partially saturates a knowledge base for answering many queries.
+
+    Args:
+        knowledge_base (list): Clauses of the knowledge base (frozensets of encoded literals)
+        rounds (int): Number of rounds of knowledge-base-only resolution
+        max_resolvents (int, optional): Maximum number of resolvents kept over all rounds
+                                        (default: the number of clauses after reduction)
+
+    Returns:
+        tuple: (clauses, consistent, stats)
+            - clauses (list): Prepared clauses, equivalent to the knowledge base
+            - consistent (bool): Whether the knowledge base is satisfiable
+            - stats (dict): Preparation statistics
+    """
+    start_time = time.time()
+    stats = {
+        "kb_initial_clauses": 0,
+        "kb_literals_removed": 0,
+        "kb_subsumed_clauses": 0,
+        "kb_resolvents_added": 0,
+        "tautologies_discarded": 0,
+    }
+    clause_set = sentence_to_clause_set(knowledge_base, stats)
+    stats["kb_initial_clauses"] = len(clause_set)
+
+    index = _reduce(clause_set, stats)
+    if max_resolvents is None:
+        max_resolvents = len(index.signatures)
+
+    for _ in range(rounds):
+        if EMPTY_CLAUSE in index or stats["kb_resolvents_added"] >= max_resolvents:
+            break
+        clause_list = list(index.signatures)
+        position = {clause: i for i, clause in enumerate(clause_list)}
+        new_resolvents = []
+        for i, c1 in enumerate(clause_list):
+            for c2 in index.clashing(c1):
+                if position.get(c2, -1) <= i:
+                    continue
+                for resolvent, _ in resolve_clause_pair(c1, c2, stats):
+                    if resolvent not in index and not index.subsumed(resolvent):
+                        new_resolvents.append(resolvent)
+            if stats["kb_resolvents_added"] + len(new_resolvents) >= max_resolvents:
+                break
+        if not new_resolvents:
+            break
+        for resolvent in sorted(new_resolvents, key=len)[:max_resolvents - stats["kb_resolvents_added"]]:
+            if resolvent in index or index.subsumed(resolvent):
+                continue
+            for subsumed in index.subsumes(resolvent):
+                index.remove(subsumed)
+                stats["kb_subsumed_clauses"] += 1
+            index.add(resolvent)
+            stats["kb_resolvents_added"] += 1
+
+    clauses = list(index.signatures)
+    consistent = EMPTY_CLAUSE not in index and CDCLSolver(clauses).solve()
+    stats["kb_prepared_clauses"] = len(clauses)
+    stats["kb_preparation_time"] = time.time() - start_time
+    return clauses, consistent, stats
+
+
+def answer_query(resolve, prepared, consistent, negated_query, verbose=False, resolver_options=None):
+    """
+    Answers one query against a prepared knowledge base.
+
+    Args:
+        resolve (function): Resolve function of the selected resolver
+        prepared (list): Clauses returned by prepare_knowledge_base()
+        consistent (bool): Consistency returned by prepare_knowledge_base()
+        negated_query (list): Clauses of the negated query
+        verbose (bool): Whether to print resolution steps
+        resolver_options (dict, optional): Extra keyword arguments of the resolver
+
+    Returns:
+        tuple: (result, time_taken, peak_memory, stats), as returned by the resolver
+    """
+    if not consistent:
+        # An inconsistent knowledge base entails every query
+        return True, 0.0, 0.0, {"clauses_generated": 0, "clause_pairs_examined": 0}
+    # The knowledge base is satisfiable, so the set of support strategy is complete
+    return resolve(prepared.copy(), verbose, support=list(negated_query), **(resolver_options or {}))
+
+
+def _timed_answer(resolve, prepared, consistent, negated_query, verbose, resolver_options):
+    """Answer a query, returning (result, time_taken, stats)"""
+    start_time = time.time()
+    with phase("resolution"):
+        result, _, _, stats = answer_query(resolve, prepared, consistent, negated_query, verbose, resolver_options)
+    return result, time.time() - start_time, stats
+
+
+def _init_worker(names, auxiliary, resolve, prepared, consistent, resolver_options):
+    """Install the atom table and the prepared knowledge base in a worker process"""
+    load_atom_table(names, auxiliary)
+    # Spinners of concurrent workers would garble the parent's output
+    sys.stdout = open(os.devnull, "w")
+    _worker_state.update(resolve=resolve, prepared=prepared, consistent=consistent,
+                         resolver_options=resolver_options)
+
+
+def _answer_in_worker(negated_query):
+    """Answer a query against the knowledge base installed by _init_worker"""
+    state = _worker_state
+    return _timed_answer(state["resolve"], state["prepared"], state["consistent"], negated_query,
+                         False, state["resolver_options"])
+
+
+def answer_queries(resolve, prepared, consistent, negated_queries, jobs=1, verbose=False,
+                   resolver_options=None):
+    """
+    Answers queries against a prepared knowledge base, optionally in parallel.
+
+    All queries must be converted before calling this function, so that the atom table
+    sent to the workers knows every atom.
+
+    Args:
+        resolve (function): Resolve function of the selected resolver (a module-level
+                            function, so that workers can import it)
+        prepared (list): Clauses returned by prepare_knowledge_base()
+        consistent (bool): Consistency returned by prepare_knowledge_base()
+        negated_queries (list): Clauses of each negated query
+        jobs (int): Number of worker processes; 1 answers the queries in this process
+        verbose (bool): Whether to print resolution steps (ignored by workers)
+        resolver_options (dict, optional): Extra keyword arguments of the resolver
+
+    Yields:
+        tuple: (result, time_taken, stats) for each query, in input order
+    """
+    if jobs <= 1:
+        for negated_query in negated_queries:
+            yield _timed_answer(resolve, prepared, consistent, negated_query, verbose, resolver_options)
+        return
+
+    initargs = (atom_table(), auxiliary_atoms(), resolve, prepared, consistent, resolver_options or {})
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        # map() returns results in input order however the queries are scheduled
+        chunksize = max(1, len(negated_queries) // (4 * jobs))
+        yield from executor.map(_answer_in_worker, negated_queries, chunksize=chunksize)
+
+
+def aggregate_stats(stats_list):
+    """
+    Sums the numeric statistics of several queries, except ratios and per-search memory
+    statistics (RATIO_STATS and PER_SEARCH_PREFIXES).
+
+    Args:
+        stats_list (list): Statistics dictionaries returned by the resolver
+
+    Returns:
+        dict: Key -> sum over the queries that report it
+    """
+    totals = {}
+    for stats in stats_list:
+        for key, value in stats.items():
+            if key in RATIO_STATS or key.startswith(PER_SEARCH_PREFIXES):
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+    return totals
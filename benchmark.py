@@ -0,0 +1,310 @@
+"""
+Benchmark module for propositional logic resolution prover.
+Generates scalable problem families, runs resolver configurations on them and
+compares the measurements with a saved baseline.
+
+Every instance is generated as text sentences, like a knowledge base file, so that both
+CNF encodings can be measured. Each run takes place in a fresh process: the peak memory
+of one run does not include the memory left behind by earlier runs, and a run that
+overruns its time budget by far can be terminated. Results are written as JSON; a
+later run compared with them as the baseline reports every measurement that grew by
+more than the threshold.
+"""
+
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import sys
+import time
+
+# Problem families: name -> function(size) returning (sentences, query or None, expected),
+# where expected is the resolver result (True when the clauses with the negated query are
+# unsatisfiable) or None when it is not known in advance
+FAMILIES = {}
+
+# Instance sizes run by default for each family
+DEFAULT_SIZES = {
+    "pigeonhole": [3, 4, 5],
+    "coloring": [5, 8, 11],
+    "random-3cnf": [8, 12, 16],
+    "horn-chain": [20, 50, 100],
+}
+
+# Resolver names of the command line -> resolver module
+RESOLVERS = {
+    "default": "resolver",
+    "new": "resolver_new",
+    "given-clause": "resolver_given",
+    "cdcl": "resolver_cdcl",
+    "portfolio": "portfolio",
+}
+
+# Measurements compared with the baseline
+METRICS = ["time", "peak_memory", "clause_pairs_examined", "clauses_generated"]
+
+# Clause-to-variable ratio of random 3-CNF at the satisfiability phase transition
+PHASE_TRANSITION_RATIO = 4.26
+
+# Seconds a run may exceed its budget before it is terminated
+KILL_GRACE = 30
+
+
+def family(name):
+    """Register a problem family generator under the given name"""
+    def register(generator):
+        FAMILIES[name] = generator
+        return generator
+    return register
+
+
+@family("pigeonhole")
+def pigeonhole(size):
+    """size + 1 pigeons in size holes, with at-most-one constraints as negated conjunctions"""
+    sentences = ["|".join(f"P{i}H{j}" for j in range(size)) for i in range(size + 1)]
+    for j in range(size):
+        for a in range(size + 1):
+            for b in range(a + 1, size + 1):
+                sentences.append(f"!(P{a}H{j} & P{b}H{j})")
+    return sentences, None, True
+
+
+@family("coloring")
+def coloring(size):
+    """2-coloring of a cycle of size vertices (as in datasets/kb4.txt); odd cycles have none"""
+    sentences = []
+    for v in range(size):
+        sentences.append(f"V{v}C1 | V{v}C2")
+        sentences.append(f"!(V{v}C1 & V{v}C2)")
+        w = (v + 1) % size
+        for color in (1, 2):
+            sentences.append(f"V{v}C{color} > !V{w}C{color}")
+    return sentences, None, size % 2 == 1
+
+
+@family("random-3cnf")
+def random_3cnf(size):
+    """Random 3-CNF over size variables at the phase transition, seeded by its size"""
+    rng = random.Random(size)
+    sentences = []
+    for _ in range(round(PHASE_TRANSITION_RATIO * size)):
+        variables = rng.sample(range(size), 3)
+        sentences.append(" | ".join(("!" if rng.random() < 0.5 else "") + f"X{v}" for v in variables))
+    return sentences, None, None
+
+
+@family("horn-chain")
+def horn_chain(size):
+    """Implication chain A0 > A1 > ... with side conditions; the last atom is entailed"""
+    sentences = ["A0", "B"]
+    for i in range(size):
+        sentences.append(f"A{i} & B > A{i + 1}")
+        sentences.append(f"A{i} & C{i} > D{i}")
+    return sentences, f"A{size}", True
+
+
+def instances(families=None, sizes=None):
+    """
+    Lists the (family, size) pairs to run.
+
+    Args:
+        families (list, optional): Family names (default: every family)
+        sizes (list, optional): Sizes used for every family (default: DEFAULT_SIZES)
+
+    Returns:
+        list: (family, size) pairs
+    """
+    return [(name, size) for name in (families or FAMILIES)
+            for size in (sizes or DEFAULT_SIZES[name])]
+
+
+def _run(results, name, size, resolver_name, encoding, timeout):
+    """Convert and solve one instance in a worker process and put the record on the results queue"""
+    from budget import Budget
+    from cnf_converter import formula_to_clauses, formula_to_definitional_clauses
+    from parser import parse_sentence
+
+    sys.stdout = open(os.devnull, "w")
+    convert = formula_to_definitional_clauses if encoding == "tseitin" else formula_to_clauses
+    sentences, query, _ = FAMILIES[name](size)
+    start_time = time.perf_counter()
+    clauses = []
+    for sentence in sentences:
+        clauses += convert(parse_sentence(sentence))
+    if query is not None:
+        clauses += convert(parse_sentence(query), negate=True)
+    cnf_time = time.perf_counter() - start_time
+
+    resolve = importlib.import_module(RESOLVERS[resolver_name]).resolve
+    result, time_taken, peak_memory, stats = resolve(clauses, False, budget=Budget(timeout))
+    results.put({
+        "result": result,
+        "cnf_time": cnf_time,
+        "time": time_taken,
+        "peak_memory": peak_memory,
+        "clause_pairs_examined": stats.get("clause_pairs_examined", 0),
+        "clauses_generated": stats.get("clauses_generated", 0),
+        "initial_clauses": stats.get("initial_clauses", 0),
+        "budget_exceeded": stats.get("budget_exceeded"),
+    })
+
+
+def run_benchmark(name, size, resolver_name, encoding, timeout=10.0):
+    """
+    Runs one resolver configuration on one instance in a fresh process.
+
+    Args:
+        name (str): Family name
+        size (int): Instance size
+        resolver_name (str): Resolver name (a key of RESOLVERS)
+        encoding (str): CNF encoding, 'naive' or 'tseitin'
+        timeout (float): Time budget of the proof search in seconds
+
+    Returns:
+        dict: Record with the instance and configuration, result (True when the clauses
+              are unsatisfiable, None when undecided), expected, cnf_time, the METRICS,
+              initial_clauses and status ('ok', 'wrong', 'timeout', 'killed' or 'failed')
+    """
+    _, _, expected = FAMILIES[name](size)
+    record = {"family": name, "size": size, "resolver": resolver_name, "cnf": encoding, "expected": expected}
+    results = multiprocessing.Queue()
+    # Not a daemon, since the portfolio resolver starts processes of its own
+    process = multiprocessing.Process(target=_run, args=(results, name, size, resolver_name, encoding, timeout))
+    process.start()
+    deadline = time.time() + timeout + KILL_GRACE
+    measurements = None
+    status = "killed"
+    while measurements is None and time.time() < deadline:
+        try:
+            measurements = results.get(timeout=0.1)
+        except queue.Empty:
+            if not process.is_alive():
+                # The record may still be in transit when the process has just exited
+                try:
+                    measurements = results.get(timeout=1)
+                except queue.Empty:
+                    status = "failed"
+                    break
+    if measurements is None:
+        process.terminate()
+        process.join()
+        record.update(result=None, status=status)
+        return record
+    process.join()
+
+    record.update(measurements)
+    if record["result"] is None:
+        record["status"] = "timeout"
+    elif record["expected"] is not None and record["result"] != record["expected"]:
+        record["status"] = "wrong"
+    else:
+        record["status"] = "ok"
+    return record
+
+
+def run_benchmarks(families=None, sizes=None, resolvers=None, encodings=None, timeout=10.0, progress=None):
+    """
+    Runs every resolver configuration on every instance.
+
+    Args:
+        families (list, optional): Family names (default: every family)
+        sizes (list, optional): Sizes used for every family (default: DEFAULT_SIZES)
+        resolvers (list, optional): Resolver names (default: every resolver but portfolio)
+        encodings (list, optional): CNF encodings (default: naive and tseitin)
+        timeout (float): Time budget of each proof search in seconds
+        progress (function, optional): Called with each record as soon as it is measured
+
+    Returns:
+        dict: Results document with the environment and the list of records
+    """
+    resolvers = resolvers or [name for name in RESOLVERS if name != "portfolio"]
+    encodings = encodings or ["naive", "tseitin"]
+    records = []
+    for name, size in instances(families, sizes):
+        for resolver_name in resolvers:
+            for encoding in encodings:
+                record = run_benchmark(name, size, resolver_name, encoding, timeout)
+                records.append(record)
+                if progress is not None:
+                    progress(record)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timeout": timeout,
+        "results": records,
+    }
+
+
+def record_key(record):
+    """Identifies the instance and configuration of a record"""
+    return record["family"], record["size"], record["resolver"], record["cnf"]
+
+
+def save_results(results, filename):
+    """
+    Writes benchmark results as JSON.
+
+    Args:
+        results (dict): Results returned by run_benchmarks()
+        filename (str): Path of the JSON file
+    """
+    with open(filename, "w") as file:
+        json.dump(results, file, indent=2)
+        file.write("\n")
+
+
+def load_results(filename):
+    """
+    Reads benchmark results written by save_results().
+
+    Args:
+        filename (str): Path of the JSON file
+
+    Returns:
+        dict: Results document
+    """
+    with open(filename, "r") as file:
+        return json.load(file)
+
+
+def compare_results(results, baseline, threshold=0.25, min_time=0.05):
+    """
+    Compares benchmark results with a baseline.
+
+    A measurement regresses when it exceeds the baseline by more than the threshold.
+    Times below min_time in the baseline are too noisy to compare. A run that was
+    decided in the baseline but is no longer, or whose status is no longer 'ok', is a
+    regression as well. Records missing from either side are ignored.
+
+    Args:
+        results (dict): Current results
+        baseline (dict): Baseline results
+        threshold (float): Allowed relative growth (0.25 allows 25% more)
+        min_time (float): Smallest baseline time in seconds that is compared
+
+    Returns:
+        list: (key, metric, baseline value, current value) per regression, where key is
+              (family, size, resolver, cnf)
+    """
+    previous = {record_key(record): record for record in baseline["results"]}
+    regressions = []
+    for record in results["results"]:
+        key = record_key(record)
+        old = previous.get(key)
+        if old is None:
+            continue
+        if old["status"] == "ok" and record["status"] != "ok":
+            regressions.append((key, "status", old["status"], record["status"]))
+            continue
+        if record["status"] != "ok" or old["status"] != "ok":
+            continue
+        for metric in METRICS:
+            if metric == "time" and old[metric] < min_time:
+                continue
+            if record[metric] > old[metric] * (1 + threshold):
+                regressions.append((key, metric, old[metric], record[metric]))
+    return regressions
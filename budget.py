@@ -0,0 +1,89 @@
+"""
+Budget module for propositional logic resolution prover.
+Bounds the time, clause count and memory a proof search may use.
+
+Resolvers call tick() in their hot loops. It only increments a counter, and every
+CHECK_INTERVAL ticks compares the elapsed time, the clause count and the resident memory
+with the limits, so the checks cost almost nothing. Once a limit is exceeded, the resolver
+stops and returns None ("unknown") as its result.
+"""
+
+import time
+import psutil
+
+# Number of ticks between two limit checks (a power of two)
+CHECK_INTERVAL = 1024
+
+
+class Budget:
+    """
+    Time, clause-count and memory limits of one proof search.
+
+    Attributes:
+        reason (str): Description of the exceeded limit, or None while within budget
+    """
+    def __init__(self, timeout=None, max_clauses=None, max_memory_mb=None):
+        """
+        Args:
+            timeout (float, optional): Maximum run time in seconds
+            max_clauses (int, optional): Maximum number of clauses kept by the resolver
+            max_memory_mb (float, optional): Maximum resident memory of the process in MB
+        """
+        self.timeout = timeout
+        self.max_clauses = max_clauses
+        self.max_memory_mb = max_memory_mb
+        self.deadline = None
+        self.ticks = 0
+        self.reason = None
+        self.process = None
+
+    def __getstate__(self):
+        # The process handle belongs to this process; workers create their own
+        state = self.__dict__.copy()
+        state["process"] = None
+        return state
+
+    def start(self):
+        """Start (or restart) measuring time; called by the resolver when the search starts"""
+        self.deadline = time.time() + self.timeout if self.timeout is not None else None
+        self.ticks = 0
+        self.reason = None
+        if self.max_memory_mb is not None and self.process is None:
+            # The process handle is created once, since creating it is not cheap
+            self.process = psutil.Process()
+
+    def check(self, clause_count):
+        """
+        Compares the usage with every limit.
+
+        Args:
+            clause_count (int): Current number of clauses
+
+        Returns:
+            bool: True if a limit is exceeded (see reason)
+        """
+        if self.reason is not None:
+            return True
+        if self.deadline is not None and time.time() > self.deadline:
+            self.reason = f"timeout of {self.timeout:g} seconds"
+        elif self.max_clauses is not None and clause_count > self.max_clauses:
+            self.reason = f"clause limit of {self.max_clauses}"
+        elif self.max_memory_mb is not None and \
+                self.process.memory_info().rss / (1024 * 1024) > self.max_memory_mb:
+            self.reason = f"memory limit of {self.max_memory_mb:g} MB"
+        return self.reason is not None
+
+    def tick(self, clause_count):
+        """
+        Counts one unit of work, checking the limits every CHECK_INTERVAL ticks.
+
+        Args:
+            clause_count (int): Current number of clauses
+
+        Returns:
+            bool: True if a limit is exceeded
+        """
+        self.ticks += 1
+        if self.ticks & (CHECK_INTERVAL - 1):
+            return False
+        return self.check(clause_count)
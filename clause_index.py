@@ -0,0 +1,174 @@
+"""
+Clause index module for propositional logic resolution prover.
+Maintains indexes over a clause set so that resolvers only visit relevant clauses.
+"""
+
+
+class OccurrenceIndex:
+    """
+    Maps each literal to the set of clauses containing it.
+
+    Two clauses can only produce a resolvent if one contains the negation of a literal
+    of the other, so looking up the negated literals of a clause yields exactly the
+    clauses it clashes with. The index is updated incrementally as clauses are added
+    to or removed from the clause set.
+    """
+    def __init__(self, clauses=()):
+        self.occurrences = {}
+        for clause in clauses:
+            self.add(clause)
+
+    def add(self, clause):
+        """Add a clause to the index"""
+        for literal in clause:
+            bucket = self.occurrences.get(literal)
+            if bucket is None:
+                self.occurrences[literal] = {clause}
+            else:
+                bucket.add(clause)
+
+    def remove(self, clause):
+        """Remove a clause from the index (no-op for literals it is not indexed under)"""
+        for literal in clause:
+            bucket = self.occurrences.get(literal)
+            if bucket is not None:
+                bucket.discard(clause)
+                if not bucket:
+                    del self.occurrences[literal]
+
+    def clashing(self, clause):
+        """
+        Returns the indexed clauses containing the negation of some literal of the clause.
+
+        Args:
+            clause (frozenset): Clause of encoded literals
+
+        Returns:
+            set: Clauses that can be resolved with the given clause
+        """
+        partners = set()
+        for literal in clause:
+            bucket = self.occurrences.get(-literal)
+            if bucket:
+                partners.update(bucket)
+        return partners
+
+
+def clause_signature(clause):
+    """
+    Returns a 64-bit signature of a clause, with one bit set per literal (modulo 64).
+
+    If clause C is a subset of clause D, every bit of C's signature is also set in D's,
+    so a single bitwise test rejects most non-subsumption candidates without a set operation.
+
+    Args:
+        clause (frozenset): Clause of encoded literals
+
+    Returns:
+        int: Signature bitmask
+    """
+    signature = 0
+    for literal in clause:
+        signature |= 1 << (literal % 64)
+    return signature
+
+
+class SubsumptionIndex(OccurrenceIndex):
+    """
+    Occurrence index that also answers forward and backward subsumption queries.
+
+    Forward subsumption (is a clause subsumed by an indexed clause?) uses one watched
+    literal per indexed clause: a clause D can only be a subset of C if D's watched literal
+    is in C, so only the watch lists of C's literals are visited. Backward subsumption
+    (which indexed clauses does a clause subsume?) only visits the occurrence list of the
+    clause's rarest literal. Candidates are filtered with clause signatures and sizes
+    before the actual subset test.
+
+    Attributes:
+        checks (int): Number of subsumption queries answered
+        candidates (int): Number of candidate clauses visited through the index
+        hits (int): Number of subsumptions found
+    """
+    def __init__(self, clauses=()):
+        # clause -> signature, and watched literal -> {clause: signature};
+        # the empty clause is watched under 0
+        self.signatures = {}
+        self.watched = {}
+        self.watches = {}
+        self.checks = 0
+        self.candidates = 0
+        self.hits = 0
+        super().__init__(clauses)
+
+    def __contains__(self, clause):
+        return clause in self.signatures
+
+    def add(self, clause):
+        """Add a clause to the index"""
+        if clause in self.signatures:
+            return
+        super().add(clause)
+        signature = clause_signature(clause)
+        # Watch the literal with the shortest watch list to keep lists balanced
+        watched = min(clause, key=lambda literal: len(self.watches.get(literal, ()))) if clause else 0
+        self.signatures[clause] = signature
+        self.watched[clause] = watched
+        self.watches.setdefault(watched, {})[clause] = signature
+
+    def remove(self, clause):
+        """Remove a clause from the index"""
+        if self.signatures.pop(clause, None) is None:
+            return
+        super().remove(clause)
+        watched = self.watched.pop(clause)
+        bucket = self.watches[watched]
+        del bucket[clause]
+        if not bucket:
+            del self.watches[watched]
+
+    def subsumed(self, clause):
+        """
+        Forward subsumption: checks whether some indexed clause is a subset of the clause.
+
+        Args:
+            clause (frozenset): Clause of encoded literals
+
+        Returns:
+            bool: True if the clause is subsumed by an indexed clause
+        """
+        self.checks += 1
+        # Bits that must not be set in the signature of a subset of the clause
+        mask = ~clause_signature(clause)
+        for literal in (*clause, 0):
+            bucket = self.watches.get(literal)
+            if bucket:
+                self.candidates += len(bucket)
+                for other, signature in bucket.items():
+                    if not signature & mask and other <= clause:
+                        self.hits += 1
+                        return True
+        return False
+
+    def subsumes(self, clause):
+        """
+        Backward subsumption: finds the indexed clauses the clause is a subset of.
+
+        Args:
+            clause (frozenset): Clause of encoded literals
+
+        Returns:
+            list: Indexed clauses subsumed by the clause
+        """
+        self.checks += 1
+        if not clause:
+            subsumed = list(self.signatures)
+        else:
+            signature = clause_signature(clause)
+            signatures = self.signatures
+            rarest = min(clause, key=lambda literal: len(self.occurrences.get(literal, ())))
+            bucket = self.occurrences.get(rarest, ())
+            self.candidates += len(bucket)
+            subsumed = [other for other in bucket
+                        if signature & ~signatures[other] == 0 and clause <= other]
+        self.hits += len(subsumed)
+        return subsumed
@@ -0,0 +1,152 @@
+"""
+CNF cache module for propositional logic resolution prover.
+Memoizes CNF conversion of sentences across runs.
+
+Converted clauses are stored in an SQLite database keyed by a content hash of the
+normalized sentence (its token sequence, so whitespace does not matter), the CNF
+encoding and whether the sentence is negated. An in-process LRU dictionary sits in
+front of the database. Clauses are stored with atom names rather than ids, since ids
+are assigned per process; auxiliary atoms of definitional encodings are renamed to
+fresh atoms when loaded so that they never clash with other sentences' atoms.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from parser import tokenize
+from literals import encode_literal, decode_literal, fresh_atom, is_auxiliary
+
+DEFAULT_CACHE_PATH = ".cnf_cache.db"
+
+
+def cache_key(sentence, negate=False, encoding="naive"):
+    """
+    Returns the cache key of a sentence conversion.
+
+    Args:
+        sentence (str): Propositional sentence
+        negate (bool): Whether the negation of the sentence is converted
+        encoding (str): CNF encoding ('naive' or 'tseitin')
+
+    Returns:
+        str: Hex digest identifying the conversion
+    """
+    normalized = " ".join(tokenize(sentence))
+    return hashlib.sha256(f"{encoding}:{int(negate)}:{normalized}".encode()).hexdigest()
+
+
+class CNFCache:
+    """
+    Two-level cache of converted sentences: in-process LRU over an on-disk SQLite table.
+
+    Attributes:
+        hits (int): Lookups answered from memory or disk
+        misses (int): Lookups that required a conversion
+        evictions (int): Entries evicted from the disk table
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=None, memory_entries=1024):
+        """
+        Args:
+            path (str): Path of the SQLite database file
+            max_entries (int, optional): Maximum number of entries kept on disk; the least
+                                         recently used entries are evicted beyond it
+            memory_entries (int): Maximum number of entries kept in the in-process LRU
+        """
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS cnf (key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+
+    def _remember(self, key, entry):
+        """Insert an entry in the in-process LRU, evicting the least recently used one"""
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Looks up a conversion.
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            tuple: (clauses, naive_count, auxiliary_count, tautologies), or None on a miss
+        """
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        row = self.connection.execute("SELECT value FROM cnf WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.connection.execute("UPDATE cnf SET last_used = ? WHERE key = ?", (time.time(), key))
+
+        value = json.loads(row[0])
+        # Auxiliary atoms get fresh names in this process
+        renamed = {name: fresh_atom() for name in value["auxiliary"]}
+        clauses = []
+        for clause in value["clauses"]:
+            literals = []
+            for token in clause:
+                name = token[1:] if token.startswith("!") else token
+                if name in renamed:
+                    literals.append(-renamed[name] if token.startswith("!") else renamed[name])
+                else:
+                    literals.append(encode_literal(token))
+            clauses.append(frozenset(literals))
+
+        # Entries written before tautologies were counted have none recorded
+        entry = (clauses, value["naive"], len(renamed), value.get("tautologies", 0))
+        self._remember(key, entry)
+        self.hits += 1
+        return entry
+
+    def put(self, key, clauses, naive_count=None, tautologies=0):
+        """
+        Stores a conversion.
+
+        Args:
+            key (str): Key from cache_key()
+            clauses (list): Converted clauses (frozensets of encoded literals)
+            naive_count (int, optional): Clause count of the naive conversion
+            tautologies (int): Number of tautological clauses the conversion discarded
+        """
+        auxiliary = sorted({decode_literal(abs(literal)) for clause in clauses
+                            for literal in clause if is_auxiliary(abs(literal))})
+        value = {
+            "clauses": [sorted(decode_literal(literal) for literal in clause) for clause in clauses],
+            "auxiliary": auxiliary,
+            "naive": naive_count,
+            "tautologies": tautologies,
+        }
+        self._remember(key, (clauses, naive_count, len(auxiliary), tautologies))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO cnf (key, value, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time()),
+        )
+        if self.max_entries is not None:
+            count = self.connection.execute("SELECT COUNT(*) FROM cnf").fetchone()[0]
+            if count > self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM cnf WHERE key IN (SELECT key FROM cnf ORDER BY last_used, rowid LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self.evictions += count - self.max_entries
+
+    def close(self):
+        """Write pending changes to disk and close the database"""
+        self.connection.commit()
+        self.connection.close()
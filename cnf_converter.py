@@ -2,12 +2,19 @@
 CNF Converter module for propositional logic resolution prover.
 Converts propositional logic formulas to Conjunctive Normal Form (CNF).
 
+formula_to_clauses converts a parsed formula tree directly to clauses of encoded
+literals in one traversal, and formula_to_definitional_clauses does the same with a
+definitional (Tseitin / Plaisted-Greenbaum) encoding whose size stays linear in the
+formula. to_cnf is the original token-list rewriting pipeline.
+
 * The following code is adapted from propositional-logic-theorem-prover-using-resolution-refutation
 * Original author: Chakshu Gupta (ChakshuGupta13)
 * Source: https://github.com/ChakshuGupta13/propositional-logic-theorem-prover-using-resolution-refutation
 """
 
-from parser import forward_slice, backward_slice
+from parser import forward_slice, backward_slice, Atom, Not, BinaryOp
+from literals import atom_id, fresh_atom
+from profiling import phase
 
 
 def induce_parenthesis(sentence):
@@ -372,19 +379,305 @@ def to_cnf(sentence):
     Returns:
         list: Formula in CNF
     """
-    sentence = induce_parenthesis(sentence)
-    sentence = eliminate_invalid_parenthesis(sentence)
-    sentence = eliminate_op(sentence, "=")
-    sentence = eliminate_invalid_parenthesis(sentence)
-    sentence = eliminate_op(sentence, ">")
-    sentence = eliminate_invalid_parenthesis(sentence)
-    sentence = move_not_inwards(sentence)
-    sentence = eliminate_invalid_parenthesis(sentence)
-
-    prev = []
-    while prev != sentence:
-        prev = sentence
-        sentence = distribute_or_over_and(sentence)
+    with phase("cnf conversion"):
+        sentence = induce_parenthesis(sentence)
+        sentence = eliminate_invalid_parenthesis(sentence)
+        sentence = eliminate_op(sentence, "=")
+        sentence = eliminate_invalid_parenthesis(sentence)
+        sentence = eliminate_op(sentence, ">")
         sentence = eliminate_invalid_parenthesis(sentence)
+        sentence = move_not_inwards(sentence)
+        sentence = eliminate_invalid_parenthesis(sentence)
+
+        prev = []
+        while prev != sentence:
+            prev = sentence
+            sentence = distribute_or_over_and(sentence)
+            sentence = eliminate_invalid_parenthesis(sentence)
+
+        return split_around_and(sentence)
+
+
+def _strip_negations(node, positive):
+    """
+    Removes leading negations from a node, flipping the polarity for each of them.
+    
+    Returns:
+        tuple: (node, polarity)
+    """
+    while isinstance(node, Not):
+        node = node.operand
+        positive = not positive
+    return node, positive
+
+
+def _junction(node, positive):
+    """
+    Classifies a '&', '|' or '>' node under a polarity as a conjunction or a disjunction.
+    
+    Pushing the negation inwards (De Morgan, and !(A>B) = A&!B) only changes the
+    connective and the polarities of the operands.
+    
+    Returns:
+        tuple: ('&' or '|', [(operand, polarity), ...])
+    """
+    op = node.op
+    if op == "&":
+        return ("&" if positive else "|"), [(node.left, positive), (node.right, positive)]
+    if op == "|":
+        return ("|" if positive else "&"), [(node.left, positive), (node.right, positive)]
+    # A>B is !A|B, and !(A>B) is A&!B
+    return ("|" if positive else "&"), [(node.left, not positive), (node.right, positive)]
+
+
+def _disjoin(left, right, stats):
+    """
+    Distributes OR over two conjunctions of clauses.
+    
+    Args:
+        left (list): Clauses (frozensets of encoded literals)
+        right (list): Clauses (frozensets of encoded literals)
+        stats (dict): Counter of discarded tautologies ('cnf_tautologies')
+    
+    Returns:
+        list: Pairwise unions of the clauses, without tautologies
+    """
+    result = []
+    for a in left:
+        for b in right:
+            # a and b are tautology-free, so a union is a tautology only if they clash
+            if not any(-literal in b for literal in a):
+                result.append(a | b)
+            else:
+                stats["cnf_tautologies"] += 1
+    return result
+
+
+def _formula_clauses(node, positive, stats):
+    """
+    Converts a formula tree under a polarity to a list of clauses.
+    
+    Negations are pushed to the atoms through the polarity argument (negation normal form)
+    and clauses are produced bottom-up, conjunctions concatenating clause lists and
+    disjunctions distributing over them. Chains of the same connective are flattened
+    iteratively instead of recursing once per operator.
+    
+    Args:
+        node (Atom, Not or BinaryOp): Formula tree
+        positive (bool): False to convert the negation of the formula
+        stats (dict): Counter of discarded tautologies ('cnf_tautologies')
+    
+    Returns:
+        list: Clauses (frozensets of encoded literals)
+    """
+    node, positive = _strip_negations(node, positive)
+    if isinstance(node, Atom):
+        literal = atom_id(node.name)
+        return [frozenset((literal if positive else -literal,))]
+
+    if node.op == "=":
+        # A=B is (!A|B)&(A|!B), and !(A=B) is (A|B)&(!A|!B)
+        left_true, left_false = _formula_clauses(node.left, True, stats), _formula_clauses(node.left, False, stats)
+        right_true, right_false = _formula_clauses(node.right, True, stats), _formula_clauses(node.right, False, stats)
+        if positive:
+            return _disjoin(left_false, right_true, stats) + _disjoin(left_true, right_false, stats)
+        return _disjoin(left_true, right_true, stats) + _disjoin(left_false, right_false, stats)
+
+    kind, pending = _junction(node, positive)
+    operands = []
+    while pending:
+        child, polarity = pending.pop()
+        child, polarity = _strip_negations(child, polarity)
+        if isinstance(child, BinaryOp) and child.op != "=":
+            child_kind, grandchildren = _junction(child, polarity)
+            if child_kind == kind:
+                pending += grandchildren
+                continue
+        operands.append(_formula_clauses(child, polarity, stats))
+
+    if kind == "&":
+        return [clause for clauses in operands for clause in clauses]
+    result = operands[0]
+    for clauses in operands[1:]:
+        result = _disjoin(result, clauses, stats)
+    return result
+
+
+def formula_to_clauses(formula, negate=False, stats=None):
+    """
+    Converts a parsed propositional formula to CNF clauses.
+    
+    Unlike to_cnf, this works on the formula tree and returns the clauses directly,
+    so the resolvers do not need to split and reparse a token list.
+    
+    Args:
+        formula (Atom, Not or BinaryOp): Formula tree from parser.parse_sentence
+        negate (bool): Whether to convert the negation of the formula instead
+        stats (dict, optional): Statistics updated with 'cnf_tautologies', the number of
+                                tautological clauses discarded
+    
+    Returns:
+        list: Distinct clauses as frozensets of encoded literals (tautologies removed)
+    
+    Example:
+        formula_to_clauses(parse_sentence("A | (B & C)")) -> [{A, B}, {A, C}] (encoded)
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("cnf_tautologies", 0)
+    with phase("cnf conversion"):
+        return list(dict.fromkeys(_formula_clauses(formula, not negate, stats)))
+
+
+def _add_clause(clauses, literals, stats):
+    """Appends the clause made of the given literals unless it is a tautology, which is counted"""
+    clause = frozenset(literals)
+    if not any(-literal in clause for literal in clause):
+        clauses.append(clause)
+    else:
+        stats["cnf_tautologies"] += 1
+
+
+def _define(node, positive, clauses, definitions, stats):
+    """
+    Returns a literal that implies the formula under the given polarity.
+    
+    Atoms are returned as literals. Every other subformula gets a fresh auxiliary atom x
+    and the clauses of x > subformula are appended (Plaisted-Greenbaum: only the
+    implication matching the polarity is needed). Each (node, polarity) pair is
+    defined once, so operands of '=' used in both polarities are shared.
+    
+    Args:
+        node (Atom, Not or BinaryOp): Formula tree
+        positive (bool): Polarity in which the formula occurs
+        clauses (list): Output clause list
+        definitions (dict): (node id, polarity) -> defining literal
+        stats (dict): Counters of auxiliary variables and discarded tautologies
+    
+    Returns:
+        int: Encoded literal
+    """
+    node, positive = _strip_negations(node, positive)
+    if isinstance(node, Atom):
+        literal = atom_id(node.name)
+        return literal if positive else -literal
+
+    key = (id(node), positive)
+    if key in definitions:
+        return definitions[key]
+
+    disjunctions = _definition(node, positive, clauses, definitions, stats)
+    x = fresh_atom()
+    stats["cnf_auxiliary_variables"] += 1
+    for disjunction in disjunctions:
+        _add_clause(clauses, [-x] + disjunction, stats)
+    definitions[key] = x
+    return x
+
+
+def _definition(node, positive, clauses, definitions, stats):
+    """
+    Expresses a non-atomic formula under a polarity as a conjunction of disjunctions of
+    defining literals of its operands.
+    
+    Returns:
+        list: Disjunctions (lists of literals) whose conjunction implies the formula
+    """
+    if node.op == "=":
+        left_true = _define(node.left, True, clauses, definitions, stats)
+        left_false = _define(node.left, False, clauses, definitions, stats)
+        right_true = _define(node.right, True, clauses, definitions, stats)
+        right_false = _define(node.right, False, clauses, definitions, stats)
+        if positive:
+            return [[left_false, right_true], [left_true, right_false]]
+        return [[left_true, right_true], [left_false, right_false]]
+
+    kind, pending = _junction(node, positive)
+    literals = []
+    while pending:
+        child, polarity = pending.pop()
+        child, polarity = _strip_negations(child, polarity)
+        if isinstance(child, BinaryOp) and child.op != "=":
+            child_kind, grandchildren = _junction(child, polarity)
+            if child_kind == kind:
+                pending += grandchildren
+                continue
+        literals.append(_define(child, polarity, clauses, definitions, stats))
+
+    if kind == "&":
+        return [[literal] for literal in literals]
+    return [literals]
+
+
+def naive_clause_count(formula, negate=False):
+    """
+    Counts the clauses formula_to_clauses would produce before removing tautologies
+    and duplicates, without building them.
+    
+    Args:
+        formula (Atom, Not or BinaryOp): Formula tree
+        negate (bool): Whether to count for the negation of the formula
+    
+    Returns:
+        int: Number of clauses of the distributive conversion
+    """
+    memo = {}
+
+    def count(node, positive):
+        node, positive = _strip_negations(node, positive)
+        if isinstance(node, Atom):
+            return 1
+        key = (id(node), positive)
+        if key not in memo:
+            if node.op == "=":
+                left_true, left_false = count(node.left, True), count(node.left, False)
+                right_true, right_false = count(node.right, True), count(node.right, False)
+                if positive:
+                    memo[key] = left_false * right_true + left_true * right_false
+                else:
+                    memo[key] = left_true * right_true + left_false * right_false
+            else:
+                kind, operands = _junction(node, positive)
+                counts = [count(child, polarity) for child, polarity in operands]
+                memo[key] = counts[0] + counts[1] if kind == "&" else counts[0] * counts[1]
+        return memo[key]
+
+    return count(formula, not negate)
+
+
+def formula_to_definitional_clauses(formula, negate=False, stats=None):
+    """
+    Converts a parsed propositional formula to CNF clauses with a definitional encoding.
+    
+    Non-atomic subformulas are named by fresh auxiliary atoms (see _define), so the
+    number of clauses is linear in the size of the formula instead of exponential in
+    the nesting of '|' over '&' and of '='. The result is equisatisfiable with the
+    formula, which is all resolution refutation needs. The top-level conjunction and
+    disjunction are emitted directly without an auxiliary atom.
+    
+    Args:
+        formula (Atom, Not or BinaryOp): Formula tree from parser.parse_sentence
+        negate (bool): Whether to convert the negation of the formula instead
+        stats (dict, optional): Statistics updated with 'cnf_auxiliary_variables' and
+                                'cnf_tautologies'
+    
+    Returns:
+        list: Distinct clauses as frozensets of encoded literals (tautologies removed)
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("cnf_auxiliary_variables", 0)
+    stats.setdefault("cnf_tautologies", 0)
+    clauses = []
+    definitions = {}
+
+    with phase("cnf conversion"):
+        node, positive = _strip_negations(formula, not negate)
+        if isinstance(node, Atom):
+            literal = atom_id(node.name)
+            clauses.append(frozenset((literal if positive else -literal,)))
+        else:
+            for disjunction in _definition(node, positive, clauses, definitions, stats):
+                _add_clause(clauses, disjunction, stats)
 
-    return split_around_and(sentence)
+        return list(dict.fromkeys(clauses))
@@ -0,0 +1,159 @@
+"""
+Compiled knowledge base module for propositional logic resolution prover.
+Stores a converted clause set in a compact binary file that is memory-mapped on load.
+
+File layout (little-endian):
+    header      magic b"RRKB", version, atom count, clause count, literal count (uint32 each)
+    atom table  atom count name lengths (uint32), one flag byte per atom (1 for auxiliary
+                atoms of definitional encodings), then the UTF-8 names back to back
+    offsets     clause count + 1 int32 offsets into the literal array
+    literals    int32 literals, numbered by position in the atom table (starting at 1)
+
+Loading maps the file, interns the atom table once and slices the literal array per
+clause, so no sentence is tokenized, parsed or converted again.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from literals import atom_id, atom_name, fresh_atom, is_auxiliary
+
+MAGIC = b"RRKB"
+VERSION = 1
+HEADER = struct.Struct("<4sIIII")
+
+
+def _int32_bytes(values):
+    """Serialize integers as little-endian int32"""
+    data = array("i", values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _int32_view(buffer, offset, count):
+    """Returns count little-endian int32 values of a buffer starting at offset"""
+    view = memoryview(buffer)[offset:offset + 4 * count].cast("i")
+    if sys.byteorder == "big":
+        data = array("i", view)
+        data.byteswap()
+        return data
+    return view
+
+
+def is_compiled(filename):
+    """
+    Checks whether a file is a compiled knowledge base.
+
+    Args:
+        filename (str): Path to the file
+
+    Returns:
+        bool: True if the file starts with the compiled format's magic bytes
+    """
+    try:
+        with open(filename, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_compiled(clauses, filename):
+    """
+    Writes a clause set to a compiled knowledge base file.
+
+    Args:
+        clauses (list): Clauses (frozensets of encoded literals)
+        filename (str): Path of the output file
+    """
+    # Renumber atoms densely in order of first occurrence
+    local_ids = {}
+    atoms = []
+    offsets = [0]
+    literals = []
+    for clause in clauses:
+        for literal in sorted(clause, key=abs):
+            atom = abs(literal)
+            local = local_ids.get(atom)
+            if local is None:
+                local = local_ids[atom] = len(atoms) + 1
+                atoms.append(atom)
+            literals.append(local if literal > 0 else -local)
+        offsets.append(len(literals))
+
+    names = [atom_name(atom).encode("utf-8") for atom in atoms]
+    with open(filename, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(atoms), len(clauses), len(literals)))
+        file.write(struct.pack(f"<{len(names)}I", *map(len, names)))
+        file.write(bytes(1 if is_auxiliary(atom) else 0 for atom in atoms))
+        file.write(b"".join(names))
+        file.write(_int32_bytes(offsets))
+        file.write(_int32_bytes(literals))
+
+
+def load_compiled(filename):
+    """
+    Loads a compiled knowledge base by memory-mapping it.
+
+    Auxiliary atoms are given fresh ids, so that they cannot clash with atoms of other
+    sentences converted in this process.
+
+    Args:
+        filename (str): Path of the compiled file
+
+    Returns:
+        list: Clauses (frozensets of encoded literals)
+
+    Raises:
+        ValueError: If the file is not a compiled knowledge base of a supported version,
+                    or is truncated or corrupt
+    """
+    with open(filename, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        if len(buffer) < HEADER.size:
+            raise ValueError(f"{filename} is not a compiled knowledge base")
+        magic, version, atom_count, clause_count, literal_count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a compiled knowledge base")
+        if version != VERSION:
+            raise ValueError(f"Unsupported compiled knowledge base version {version} in {filename}")
+
+        # Every section must fit in the file before it is unpacked or viewed
+        position = HEADER.size
+        if position + 5 * atom_count > len(buffer):
+            raise ValueError(f"Truncated compiled knowledge base {filename}")
+        lengths = struct.unpack_from(f"<{atom_count}I", buffer, position)
+        position += 4 * atom_count
+        flags = buffer[position:position + atom_count]
+        position += atom_count
+        if position + sum(lengths) + 4 * (clause_count + 1) + 4 * literal_count > len(buffer):
+            raise ValueError(f"Truncated compiled knowledge base {filename}")
+
+        # Translation from file atom numbers to process atom ids (index 0 is unused)
+        translation = [0]
+        for length, auxiliary in zip(lengths, flags):
+            name = buffer[position:position + length].decode("utf-8")
+            position += length
+            translation.append(fresh_atom() if auxiliary else atom_id(name))
+
+        offsets = literals = None
+        try:
+            offsets = _int32_view(buffer, position, clause_count + 1)
+            position += 4 * (clause_count + 1)
+            literals = _int32_view(buffer, position, literal_count)
+            if offsets[0] != 0 or offsets[-1] != literal_count or \
+                    any(offsets[i] > offsets[i + 1] for i in range(clause_count)):
+                raise ValueError(f"Invalid clause offsets in {filename}")
+            if any(literal == 0 or abs(literal) > atom_count for literal in literals):
+                raise ValueError(f"Invalid literal in {filename}")
+
+            clauses = []
+            for i in range(clause_count):
+                clauses.append(frozenset(translation[literal] if literal > 0 else -translation[-literal]
+                                         for literal in literals[offsets[i]:offsets[i + 1]]))
+        finally:
+            # Views into the map must be released before it is closed, also on errors
+            for view in (literals, offsets):
+                if isinstance(view, memoryview):
+                    view.release()
+    return clauses
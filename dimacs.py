@@ -0,0 +1,155 @@
+"""
+DIMACS module for propositional logic resolution prover.
+Reads and writes clause sets in the DIMACS CNF format used by SAT benchmarks and solvers.
+
+A DIMACS file has optional comment lines starting with 'c', a header 'p cnf <variables>
+<clauses>', and clauses as whitespace-separated non-zero integers terminated by 0
+(a clause may span several lines). Variable n is read as the atom named 'n', unless a
+'c atom <n> <name>' comment before the clauses names it, as written by write_dimacs().
+"""
+
+from literals import atom_id, atom_name
+
+
+def is_dimacs(filename):
+    """
+    Checks whether a file is in DIMACS CNF format, i.e. its first non-comment line is a 'p cnf' header.
+
+    Args:
+        filename (str): Path to the file
+
+    Returns:
+        bool: True for DIMACS files
+    """
+    try:
+        with open(filename, "r") as file:
+            for line in file:
+                line = line.strip()
+                if not line or line == "c" or line.startswith("c "):
+                    continue
+                return line.split()[:2] == ["p", "cnf"]
+    except (OSError, UnicodeDecodeError):
+        pass
+    return False
+
+
+def read_dimacs(filename, stats=None, named=True):
+    """
+    Streams the clauses of a DIMACS CNF file.
+
+    Lines are parsed one at a time, so no token list of the whole file is built.
+    Tautological clauses are skipped and repeated literals are merged.
+
+    Args:
+        filename (str): Path to the DIMACS file
+        stats (dict, optional): Updated with the header counts (dimacs_variables,
+                                dimacs_clauses) and dimacs_tautologies
+        named (bool): Whether 'c atom' comments name the variables (when False, variable
+                      n is always read as the atom named 'n')
+
+    Yields:
+        frozenset: Clause of encoded literals
+
+    Raises:
+        ValueError: If the file is malformed
+    """
+    names = {}
+    variables = {}
+    literals = []
+    header = None
+    tautologies = 0
+
+    def literal(value):
+        variable = abs(value)
+        atom = variables.get(variable)
+        if atom is None:
+            atom = variables[variable] = atom_id(names.get(variable, str(variable)))
+        return atom if value > 0 else -atom
+
+    with open(filename, "r") as file:
+        for number, line in enumerate(file, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == "c":
+                if named and len(fields) == 4 and fields[1] == "atom" and header is None:
+                    names[int(fields[2])] = fields[3]
+                continue
+            if fields[0] == "%":
+                # End marker used by SATLIB benchmark files
+                break
+            if fields[0] == "p":
+                if header is not None or len(fields) != 4 or fields[1] != "cnf":
+                    raise ValueError(f"Invalid header on line {number} of {filename}")
+                header = (int(fields[2]), int(fields[3]))
+                if stats is not None:
+                    stats["dimacs_variables"], stats["dimacs_clauses"] = header
+                continue
+            if header is None:
+                raise ValueError(f"Clause before 'p cnf' header on line {number} of {filename}")
+            try:
+                values = [int(field) for field in fields]
+            except ValueError:
+                raise ValueError(f"Invalid literal on line {number} of {filename}") from None
+            for value in values:
+                if value:
+                    literals.append(literal(value))
+                    continue
+                clause = frozenset(literals)
+                literals = []
+                if any(-lit in clause for lit in clause):
+                    tautologies += 1
+                    continue
+                yield clause
+
+    if literals:
+        # The last clause may omit its terminating 0
+        clause = frozenset(literals)
+        if any(-lit in clause for lit in clause):
+            tautologies += 1
+        else:
+            yield clause
+    if stats is not None:
+        stats["dimacs_tautologies"] = tautologies
+
+
+def variable_numbers(clauses):
+    """
+    Numbers the atoms of clauses 1..n in order of first occurrence.
+
+    Args:
+        clauses (list): Clauses (frozensets of encoded literals)
+
+    Returns:
+        dict: Atom id -> DIMACS variable
+    """
+    variables = {}
+    for clause in clauses:
+        for lit in clause:
+            if abs(lit) not in variables:
+                variables[abs(lit)] = len(variables) + 1
+    return variables
+
+
+def write_dimacs(clauses, file, variables=None):
+    """
+    Writes clauses in DIMACS CNF format.
+
+    Atoms are numbered 1..n in order of first occurrence, and 'c atom <n> <name>'
+    comments record their names.
+
+    Args:
+        clauses (list): Clauses (frozensets of encoded literals)
+        file (file): Text file object to write to
+        variables (dict, optional): Atom id -> DIMACS variable, for files that must share
+                                    their numbering with others (default: variable_numbers())
+    """
+    if variables is None:
+        variables = variable_numbers(clauses)
+
+    for atom, variable in variables.items():
+        file.write(f"c atom {variable} {atom_name(atom)}\n")
+    file.write(f"p cnf {len(variables)} {len(clauses)}\n")
+    for clause in clauses:
+        numbers = sorted((variables[lit] if lit > 0 else -variables[-lit] for lit in clause), key=abs)
+        file.write(" ".join(map(str, numbers)) + " 0\n")
@@ -0,0 +1,146 @@
+"""
+Literal encoding module for propositional logic resolution prover.
+Interns atom names as integer ids so that literals can be handled as signed integers.
+
+A positive literal A is encoded as the id of A, and its negation !A as minus that id
+(DIMACS style), so negating a literal is a sign flip instead of string manipulation.
+Id 0 is never assigned because it has no sign.
+"""
+
+# Maps atom name -> id, and id -> atom name (index 0 is unused)
+_atom_ids = {}
+_atom_names = [None]
+# Ids of atoms introduced by definitional CNF encodings rather than by the input
+_auxiliary = set()
+
+
+def atom_id(name):
+    """
+    Returns the id of an atom, interning the atom if it has not been seen before.
+
+    Args:
+        name (str): Atom name (without negation)
+
+    Returns:
+        int: Positive id of the atom
+    """
+    atom = _atom_ids.get(name)
+    if atom is None:
+        atom = len(_atom_names)
+        _atom_ids[name] = atom
+        _atom_names.append(name)
+    return atom
+
+
+def atom_name(atom):
+    """
+    Returns the name of an interned atom.
+
+    Args:
+        atom (int): Positive id of the atom
+
+    Returns:
+        str: Atom name
+    """
+    return _atom_names[atom]
+
+
+def encode_literal(token):
+    """
+    Encodes a literal string as a signed integer.
+
+    Args:
+        token (str): Literal such as 'A' or '!A'
+
+    Returns:
+        int: Encoded literal
+
+    Example:
+        >>> encode_literal("!Girl") == -encode_literal("Girl")
+        True
+    """
+    if token.startswith("!"):
+        return -atom_id(token[1:])
+    return atom_id(token)
+
+
+def decode_literal(literal):
+    """
+    Decodes a signed integer literal back to its string form.
+
+    Args:
+        literal (int): Encoded literal
+
+    Returns:
+        str: Literal such as 'A' or '!A'
+    """
+    if literal < 0:
+        return "!" + _atom_names[-literal]
+    return _atom_names[literal]
+
+
+def atom_table():
+    """
+    Returns a copy of the atom table, so that it can be shipped to another process.
+
+    Returns:
+        list: Atom names indexed by id (index 0 is None)
+    """
+    return list(_atom_names)
+
+
+def load_atom_table(names, auxiliary=()):
+    """
+    Replaces the atom table with the given one (e.g. in a worker process).
+
+    Args:
+        names (list): Atom names indexed by id, as returned by atom_table()
+        auxiliary (iterable): Ids of auxiliary atoms, as returned by auxiliary_atoms()
+    """
+    _atom_names[:] = names
+    _atom_ids.clear()
+    for atom in range(1, len(names)):
+        _atom_ids[names[atom]] = atom
+    _auxiliary.clear()
+    _auxiliary.update(auxiliary)
+
+
+def auxiliary_atoms():
+    """
+    Returns the ids of the auxiliary atoms, so that they can be shipped to another process.
+
+    Returns:
+        list: Ids of atoms introduced by fresh_atom
+    """
+    return sorted(_auxiliary)
+
+
+def fresh_atom(prefix="_aux"):
+    """
+    Interns a new auxiliary atom whose name does not collide with any known atom.
+
+    Args:
+        prefix (str): Prefix of the generated name
+
+    Returns:
+        int: Positive id of the new atom
+    """
+    number = len(_atom_names)
+    while f"{prefix}{number}" in _atom_ids:
+        number += 1
+    atom = atom_id(f"{prefix}{number}")
+    _auxiliary.add(atom)
+    return atom
+
+
+def is_auxiliary(atom):
+    """
+    Checks whether an atom was introduced by fresh_atom.
+
+    Args:
+        atom (int): Positive id of the atom
+
+    Returns:
+        bool: True for auxiliary atoms
+    """
+    return atom in _auxiliary
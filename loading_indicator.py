@@ -1,30 +1,40 @@
 import sys
 from itertools import cycle
 import threading
-import time
 
 class LoadingIndicator:
     """
     A simple loading indicator to show that the program is still running.
+    
+    Setting LoadingIndicator.enabled to False turns every indicator off, for output
+    that is not meant for a terminal.
     """
+    enabled = True
+    
     def __init__(self, description="Processing"):
         self.description = description
         self.is_running = False
         self.spinner = cycle(['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏'])
         self.spinner_thread = None
+        self.stopped = threading.Event()
         
     def _spin(self):
         """Internal method to update the spinner"""
         while self.is_running:
             sys.stdout.write(f"\r{self.description} {next(self.spinner)} ")
             sys.stdout.flush()
-            time.sleep(0.1)
+            # Wake up immediately when stopped instead of finishing the sleep
+            if self.stopped.wait(0.1):
+                break
         sys.stdout.write("\r" + " " * (len(self.description) + 10) + "\r")
         sys.stdout.flush()
         
     def start(self):
         """Start the loading indicator"""
+        if not LoadingIndicator.enabled:
+            return
         self.is_running = True
+        self.stopped.clear()
         self.spinner_thread = threading.Thread(target=self._spin)
         self.spinner_thread.daemon = True
         self.spinner_thread.start()
@@ -32,5 +42,6 @@ class LoadingIndicator:
     def stop(self):
         """Stop the loading indicator"""
         self.is_running = False
+        self.stopped.set()
         if self.spinner_thread is not None:
             self.spinner_thread.join()
@@ -4,18 +4,59 @@ Handles command-line argument parsing and orchestrates the resolution process.
 """
 
 import argparse
+import hashlib
+import json
+import os
 import sys
+import time
 
+import colorama
 from colorama import Fore, Style
-from parser import segment_sentence
-from cnf_converter import to_cnf
+from loading_indicator import LoadingIndicator
+from parser import parse_sentence
+from cnf_converter import formula_to_clauses, formula_to_definitional_clauses, naive_clause_count
+from cnf_cache import CNFCache, cache_key, DEFAULT_CACHE_PATH
+from compiled_kb import is_compiled, write_compiled, load_compiled
+from dimacs import is_dimacs, read_dimacs, write_dimacs, variable_numbers
+from batch import prepare_knowledge_base, answer_queries, aggregate_stats
+from budget import Budget
+from memory_monitor import MemoryMonitor, POLICIES, DEFAULT_INTERVAL
+import benchmark
+import cProfile
+import profiling
+from profiling import phase
+from proof import Derivation, TraceWriter, read_tracecheck
+from resolver import format_clause
+from literals import decode_literal
+
+# Exit code when a budget ran out before the question was decided
+EXIT_UNKNOWN = 3
+
+def add_conversion_arguments(parser):
+    """
+    Adds the CNF conversion options shared by the prover and its subcommands.
+    
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend
+    """
+    parser.add_argument('--cnf', choices=['naive', 'tseitin'], default='naive',
+                        help='CNF conversion: distributive, or definitional with auxiliary atoms '
+                             '(default: %(default)s)')
+    parser.add_argument('--cnf-cache', nargs='?', const=DEFAULT_CACHE_PATH, metavar='PATH',
+                        help=f'cache CNF conversions on disk across runs (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cnf-cache-size', type=int, metavar='N',
+                        help='maximum number of cached conversions; least recently used ones are evicted')
 
 def parse_arguments():
     """
     Parses command-line arguments.
     
     Returns:
-        tuple: (kb_file, query_file, verbose, no_query, resolver_type)
+        argparse.Namespace: Parsed arguments (kb_file, query_file, verbose, no_query,
+                            resolver, heuristic, strategy, preprocess, cnf,
+                            cnf_cache, cnf_cache_size, batch, saturation_rounds, jobs, parallel,
+                            timeout, max_clauses, max_memory_mb, memory_sampling, memory_interval,
+                            profile, format, proof, proof_file, proof_format, trace)
     """
     parser = argparse.ArgumentParser(
         description='Propositional Logic Resolution Prover',
@@ -25,23 +66,105 @@ Examples:
   python main.py kb.txt query.txt                # Run resolution with default resolver
   python main.py kb.txt query.txt -v             # Run resolution with verbose output
   python main.py kb.txt query.txt --resolver new # Use the new resolver implementation
+  python main.py kb.txt query.txt --resolver given-clause --heuristic fifo
+                                                 # Use the given-clause resolver with FIFO selection
+  python main.py kb.txt query.txt --resolver cdcl # Decide with the CDCL solver (prints a model if satisfiable)
+  python main.py kb.txt query.txt --resolver portfolio
+                                                 # Race several resolvers and keep the first answer
+  python main.py kb.txt query.txt --strategy sos # Only resolve clauses descending from the negated query
+  python main.py kb.txt query.txt --preprocess   # Simplify clauses with unit propagation first
+  python main.py kb.txt query.txt --parallel 4   # Generate resolvents with 4 worker processes
+  python main.py kb.txt query.txt --timeout 10   # Give up after 10 seconds (exit code 3: unknown)
+  python main.py kb.txt query.txt --memory-sampling tracemalloc
+                                                 # Measure the exact peak of Python allocations
+  python main.py kb.txt query.txt --format json # Print one JSON record (JSON Lines with --batch)
+  python main.py kb.txt query.txt --proof       # Print only the clauses of the refutation
+  python main.py kb.txt query.txt --trace steps.txt # Write every resolution step to a file
+  python main.py kb.txt query.txt --proof-file proof.trace # Write a checkable proof and its formula
+  python main.py check proof.trace.cnf proof.trace # Check a TraceCheck proof against its formula
+  python main.py kb.txt query.txt --profile run.pstats
+                                                 # Print time per phase and write cProfile statistics
+  python main.py kb.txt query.txt --cnf tseitin  # Use definitional CNF with auxiliary atoms
+  python main.py kb.txt query.txt --cnf-cache    # Reuse CNF conversions from previous runs
   python main.py kb.txt --no-query               # Run only knowledge base check without query
+  python main.py kb.txt queries.txt --batch      # Answer each line of queries.txt as a query
+  python main.py kb.txt queries.txt --batch --jobs 4
+                                                 # Answer the queries with 4 worker processes
+  python main.py compile kb.txt -o kb.kbc        # Convert once to a binary knowledge base
+  python main.py kb.kbc query.txt                # Compiled knowledge bases are detected automatically
+  python main.py export kb.txt --query query.txt # Write the refutation problem in DIMACS format
+  python main.py bench.cnf --no-query --resolver cdcl
+                                                 # DIMACS knowledge bases are detected automatically
+  python main.py benchmark --baseline baseline.json
+                                                 # Run generated benchmarks and report regressions
   
 File format:
   - Each line in the files should contain a propositional logic formula
   - Supported operators: ! (not), & (and), | (or), > (implies), = (if and only if)
   - Lines starting with # in kb_file are treated as comments and ignored
-  - The first line in the query file is used as the query
+  - The first line in the query file is used as the query (every line with --batch)
+
+Exit codes:
+  0 entailed (or satisfiable with --no-query), 1 not entailed (or not satisfiable),
+  3 unknown because --timeout, --max-clauses or --max-memory-mb was exceeded
         """
     )
-    parser.add_argument('kb_file', help='Path to the knowledge base file')
+    parser.add_argument('kb_file', help='Path to the knowledge base file (text, compiled or DIMACS)')
     parser.add_argument('query_file', nargs='?', help='Path to the query file')
     parser.add_argument('-v', '--verbose', action='store_true', 
                         help='print resolution steps')
     parser.add_argument('--no-query', action='store_true',
                         help='run only knowledge base satisfiability check without query')
-    parser.add_argument('--resolver', choices=['new'], default='default',
-                        help='use the new(improved) resolver implementation')
+    parser.add_argument('--resolver', choices=['default', 'new', 'given-clause', 'cdcl', 'portfolio'], default='default',
+                        help='resolver implementation to use (default: %(default)s)')
+    parser.add_argument('--heuristic', choices=['shortest', 'fifo', 'ratio'], default='shortest',
+                        help='clause selection heuristic for the given-clause resolver (default: %(default)s)')
+    parser.add_argument('--strategy', choices=['all', 'sos'], default='all',
+                        help='resolution strategy: resolve all clause pairs, or use the set of support '
+                             'of the negated query (default: %(default)s)')
+    parser.add_argument('--preprocess', action='store_true',
+                        help='apply unit propagation and pure literal elimination before resolution')
+    parser.add_argument('--parallel', type=int, default=1, metavar='N',
+                        help='number of worker processes generating resolvents of a single proof search '
+                             '(default and new resolvers; default: %(default)s)')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='give up with an unknown result after this many seconds (per query in batch mode)')
+    parser.add_argument('--max-clauses', type=int, metavar='N',
+                        help='give up with an unknown result once the resolver keeps more than N clauses')
+    parser.add_argument('--max-memory-mb', type=float, metavar='MB',
+                        help='give up with an unknown result once the process uses more than MB of memory')
+    parser.add_argument('--memory-sampling', choices=POLICIES, default='rss',
+                        help='memory measurement: resident memory of the process, or Python allocations '
+                             'traced by tracemalloc with their exact peak (slower) (default: %(default)s)')
+    parser.add_argument('--memory-interval', type=int, default=DEFAULT_INTERVAL, metavar='N',
+                        help='number of clauses added between two memory samples (default: %(default)s)')
+    parser.add_argument('--format', choices=['text', 'json'], default='text',
+                        help='output format: colored text, or one JSON record per run (per query with '
+                             '--batch) on stdout, with messages on stderr (default: %(default)s)')
+    parser.add_argument('--proof', action='store_true',
+                        help='once the empty clause is found, print only the clauses its derivation '
+                             'uses (default and new resolvers)')
+    parser.add_argument('--proof-file', metavar='FILE',
+                        help='write the refutation to FILE, and the clauses it starts from to FILE.cnf '
+                             'in DIMACS format (default and new resolvers)')
+    parser.add_argument('--proof-format', choices=['tracecheck', 'drat'], default='tracecheck',
+                        help='format of --proof-file: TraceCheck resolution trace, or DRAT clause '
+                             'additions (default: %(default)s)')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write every resolution step to FILE, buffered and without colors '
+                             '(default and new resolvers)')
+    parser.add_argument('--profile', nargs='?', const='', metavar='PSTATS_FILE',
+                        help='print the time spent in each phase (parsing, CNF conversion, resolvent '
+                             'generation, ...); with a file, also write cProfile statistics to it')
+    add_conversion_arguments(parser)
+    parser.add_argument('--batch', action='store_true',
+                        help='answer every line of query_file as a separate query against a shared, '
+                             'prepared knowledge base')
+    parser.add_argument('--saturation-rounds', type=int, default=1, metavar='N',
+                        help='rounds of knowledge-base-only resolution when preparing the knowledge base '
+                             'in batch mode (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='number of worker processes answering queries in batch mode (default: %(default)s)')
     
     args = parser.parse_args()
     
@@ -53,7 +176,143 @@ File format:
     if not args.no_query and not args.query_file:
         parser.error("Either query_file or --no-query must be provided")
     
-    return args.kb_file, args.query_file, args.verbose, args.no_query, args.resolver
+    # The set of support is the negated query, so it needs one
+    if args.no_query and args.strategy == 'sos':
+        parser.error("--strategy sos requires a query_file")
+    
+    if args.no_query and args.batch:
+        parser.error("--batch requires a query_file")
+    
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.jobs > 1 and not args.batch:
+        parser.error("--jobs requires --batch")
+    
+    if args.format == 'json' and args.verbose:
+        parser.error("--format json cannot be combined with --verbose")
+    
+    for option, value in (('--proof', args.proof), ('--proof-file', args.proof_file), ('--trace', args.trace)):
+        if value and args.resolver not in ('default', 'new'):
+            parser.error(f"{option} is only supported by the default and new resolvers")
+        if value and args.batch:
+            parser.error(f"{option} cannot be combined with --batch")
+    
+    # Simplified clauses are not clauses of the formula the proof is checked against
+    if args.proof_file and args.preprocess:
+        parser.error("--proof-file cannot be combined with --preprocess")
+    
+    if args.memory_interval < 1:
+        parser.error("--memory-interval must be at least 1")
+    
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+    if args.parallel > 1 and args.resolver not in ('default', 'new'):
+        parser.error("--parallel is only supported by the default and new resolvers")
+    
+    return args
+
+def parse_compile_arguments(argv):
+    """
+    Parses command-line arguments of the compile subcommand.
+    
+    Args:
+        argv (list): Arguments following 'compile'
+    
+    Returns:
+        argparse.Namespace: Parsed arguments (kb_file, output, cnf, cnf_cache, cnf_cache_size)
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py compile',
+        description='Convert a knowledge base to CNF once and write it in the compiled binary format'
+    )
+    parser.add_argument('kb_file', help='Path to the text knowledge base file')
+    parser.add_argument('-o', '--output', help='Path of the compiled file (default: kb_file with a .kbc suffix)')
+    add_conversion_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    if args.output is None:
+        args.output = os.path.splitext(args.kb_file)[0] + '.kbc'
+    return args
+
+def parse_export_arguments(argv):
+    """
+    Parses command-line arguments of the export subcommand.
+    
+    Args:
+        argv (list): Arguments following 'export'
+    
+    Returns:
+        argparse.Namespace: Parsed arguments (kb_file, output, query, cnf, cnf_cache, cnf_cache_size)
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py export',
+        description='Convert a knowledge base to CNF and write it in DIMACS format'
+    )
+    parser.add_argument('kb_file', help='Path to the knowledge base file (text, compiled or DIMACS)')
+    parser.add_argument('-o', '--output', help='Path of the DIMACS file (default: kb_file with a .cnf suffix)')
+    parser.add_argument('--query', metavar='QUERY_FILE',
+                        help='also write the negated query, so that the file is unsatisfiable iff the query is entailed')
+    add_conversion_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    if args.output is None:
+        args.output = os.path.splitext(args.kb_file)[0] + '.cnf'
+    return args
+
+def parse_check_arguments(argv):
+    """
+    Parses command-line arguments of the check subcommand.
+    
+    Args:
+        argv (list): Arguments following 'check'
+    
+    Returns:
+        argparse.Namespace: Parsed arguments (formula, proof_file)
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py check',
+        description='Check a TraceCheck resolution proof written with --proof-file against its formula'
+    )
+    parser.add_argument('formula', help='Path to the DIMACS formula (written next to the proof as FILE.cnf)')
+    parser.add_argument('proof_file', help='Path to the TraceCheck proof')
+    return parser.parse_args(argv)
+
+def parse_benchmark_arguments(argv):
+    """
+    Parses command-line arguments of the benchmark subcommand.
+    
+    Args:
+        argv (list): Arguments following 'benchmark'
+    
+    Returns:
+        argparse.Namespace: Parsed arguments (output, baseline, threshold, families, sizes,
+                            resolvers, cnf, timeout)
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py benchmark',
+        description='Run resolvers on generated problem families and compare with a baseline'
+    )
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help='path of the JSON results file (default: %(default)s)')
+    parser.add_argument('--baseline', metavar='RESULTS_FILE',
+                        help='results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative growth of a measurement reported as a regression (default: %(default)s)')
+    parser.add_argument('--families', nargs='+', choices=list(benchmark.FAMILIES),
+                        help='problem families to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, metavar='N',
+                        help='instance sizes used for every family (default: a few per family)')
+    parser.add_argument('--resolvers', nargs='+', choices=list(benchmark.RESOLVERS),
+                        help='resolvers to run (default: all but portfolio)')
+    parser.add_argument('--cnf', nargs='+', choices=['naive', 'tseitin'],
+                        help='CNF encodings to run (default: both)')
+    parser.add_argument('--timeout', type=float, default=5.0, metavar='SECONDS',
+                        help='time budget of each run (default: %(default)s)')
+    
+    args = parser.parse_args(argv)
+    if args.threshold < 0:
+        parser.error("--threshold must not be negative")
+    return args
 
 def read_from_file(filename):
     """
@@ -84,6 +343,73 @@ def read_from_file(filename):
         sys.exit(1)
     return sentences
 
+def convert_sentence(sentence, negate=False, encoding='naive', cnf_stats=None, cache=None):
+    """
+    Parses a propositional sentence and converts it to CNF.
+    
+    With a cache, the conversion is looked up by the normalized sentence first and
+    stored after a miss.
+    
+    Args:
+        sentence (str): Propositional sentence
+        negate (bool): Whether to convert the negation of the sentence instead
+        encoding (str): 'naive' for distributive conversion, 'tseitin' for definitional
+        cnf_stats (dict, optional): Conversion statistics to update (clause counts,
+                                    auxiliary variables and discarded tautologies)
+        cache (CNFCache, optional): Cache of previous conversions
+    
+    Returns:
+        list: Sentence in CNF as a list of clauses (frozensets of encoded literals)
+    """
+    if cache is not None:
+        key = cache_key(sentence, negate, encoding)
+        entry = cache.get(key)
+        if entry is not None:
+            clauses, naive_count, auxiliary_count, tautologies = entry
+            if cnf_stats is not None:
+                cnf_stats['cnf_tautologies'] = cnf_stats.get('cnf_tautologies', 0) + tautologies
+                if encoding == 'tseitin':
+                    cnf_stats['cnf_naive_clauses'] = cnf_stats.get('cnf_naive_clauses', 0) + naive_count
+                    cnf_stats['cnf_auxiliary_variables'] = cnf_stats.get('cnf_auxiliary_variables', 0) + auxiliary_count
+                cnf_stats['cnf_clauses'] = cnf_stats.get('cnf_clauses', 0) + len(clauses)
+            return list(clauses)
+    
+    try:
+        formula = parse_sentence(sentence)
+    except ValueError as e:
+        print(f"Error parsing sentence '{sentence}': {e}")
+        sys.exit(1)
+    naive_count = None
+    # Counters of this sentence alone, so that the cache can record its tautologies
+    sentence_stats = {}
+    if encoding == 'tseitin':
+        clauses = formula_to_definitional_clauses(formula, negate, sentence_stats)
+        naive_count = naive_clause_count(formula, negate)
+        sentence_stats['cnf_naive_clauses'] = naive_count
+    else:
+        clauses = formula_to_clauses(formula, negate, sentence_stats)
+    if cache is not None:
+        cache.put(key, clauses, naive_count, sentence_stats['cnf_tautologies'])
+    if cnf_stats is not None:
+        for name, value in sentence_stats.items():
+            cnf_stats[name] = cnf_stats.get(name, 0) + value
+        cnf_stats['cnf_clauses'] = cnf_stats.get('cnf_clauses', 0) + len(clauses)
+    return clauses
+
+def add_cnf_stats(stats, cnf_stats):
+    """
+    Adds the conversion statistics to the resolution statistics.
+    
+    Tautologies discarded while converting to CNF count towards tautologies_discarded,
+    alongside those the resolver discarded.
+    
+    Args:
+        stats (dict): Resolution statistics to update
+        cnf_stats (dict): Conversion statistics
+    """
+    stats.update(cnf_stats)
+    stats['tautologies_discarded'] = stats.get('tautologies_discarded', 0) + cnf_stats.get('cnf_tautologies', 0)
+
 def display_metrics(time_taken, peak_memory, stats):
     """
     Display performance metrics in a formatted way.
@@ -101,18 +427,507 @@ def display_metrics(time_taken, peak_memory, stats):
     print(f"  {Fore.YELLOW}Initial clauses:{Style.RESET_ALL} {stats.get('initial_clauses', 0)}")
     print(f"  {Fore.YELLOW}Final clause count:{Style.RESET_ALL} {stats.get('final_clause_count', 0)}")
     print(f"  {Fore.YELLOW}Clause pairs examined:{Style.RESET_ALL} {stats.get('clause_pairs_examined', 0)}")
+    print(f"  {Fore.YELLOW}Tautologies discarded:{Style.RESET_ALL} {stats.get('tautologies_discarded', 0)}")
+    if 'budget_exceeded' in stats:
+        print(f"  {Fore.YELLOW}Stopped by:{Style.RESET_ALL} {stats['budget_exceeded']}")
+    
+    if 'memory_samples' in stats:
+        print(f"\n{Fore.CYAN}Memory statistics ({stats['memory_policy']}):{Style.RESET_ALL}")
+        print(f"  {Fore.YELLOW}Samples:{Style.RESET_ALL} {len(stats['memory_samples'])}")
+        print(f"  {Fore.YELLOW}Growth:{Style.RESET_ALL} {stats['memory_growth']:.2f} MB ({stats['memory_growth_rate']:.2f} MB/s)")
+        print(f"  {Fore.YELLOW}Bytes per clause:{Style.RESET_ALL} {stats['memory_bytes_per_clause']:.0f}")
+    
+    if 'conflicts' in stats:
+        print(f"\n{Fore.CYAN}CDCL statistics:{Style.RESET_ALL}")
+        print(f"  {Fore.YELLOW}Decisions:{Style.RESET_ALL} {stats['decisions']}")
+        print(f"  {Fore.YELLOW}Propagations:{Style.RESET_ALL} {stats['propagations']}")
+        print(f"  {Fore.YELLOW}Conflicts:{Style.RESET_ALL} {stats['conflicts']}")
+        print(f"  {Fore.YELLOW}Learned clauses:{Style.RESET_ALL} {stats['learned_clauses']}")
+        print(f"  {Fore.YELLOW}Restarts:{Style.RESET_ALL} {stats['restarts']}")
+    
+    if 'portfolio_winner' in stats:
+        print(f"\n{Fore.CYAN}Portfolio:{Style.RESET_ALL}")
+        print(f"  {Fore.YELLOW}Winner:{Style.RESET_ALL} {stats['portfolio_winner']}")
+        for name, status, seconds in stats['portfolio_runs']:
+            print(f"  {Fore.YELLOW}{name}:{Style.RESET_ALL} {status} after {seconds:.4f} seconds")
+    
+    if 'parallel_workers' in stats:
+        print(f"\n{Fore.CYAN}Parallel statistics:{Style.RESET_ALL}")
+        print(f"  {Fore.YELLOW}Workers:{Style.RESET_ALL} {stats['parallel_workers']}")
+        print(f"  {Fore.YELLOW}Resolvent generation time:{Style.RESET_ALL} {stats['parallel_round_time']:.4f} seconds")
+        print(f"  {Fore.YELLOW}Summed worker CPU time:{Style.RESET_ALL} {stats['parallel_worker_time']:.4f} seconds")
+        print(f"  {Fore.YELLOW}Worker utilisation:{Style.RESET_ALL} {stats['parallel_utilisation']:.1%}")
+    
+    if 'cnf_naive_clauses' in stats:
+        print(f"\n{Fore.CYAN}CNF conversion statistics:{Style.RESET_ALL}")
+        print(f"  {Fore.YELLOW}Auxiliary variables:{Style.RESET_ALL} {stats['cnf_auxiliary_variables']}")
+        print(f"  {Fore.YELLOW}Clauses:{Style.RESET_ALL} {stats['cnf_clauses']}")
+        print(f"  {Fore.YELLOW}Clauses with naive conversion:{Style.RESET_ALL} {stats['cnf_naive_clauses']}")
+    
+    if 'cnf_cache_hits' in stats:
+        print(f"\n{Fore.CYAN}CNF cache statistics:{Style.RESET_ALL}")
+        print(f"  {Fore.YELLOW}Hits:{Style.RESET_ALL} {stats['cnf_cache_hits']}")
+        print(f"  {Fore.YELLOW}Misses:{Style.RESET_ALL} {stats['cnf_cache_misses']}")
+        print(f"  {Fore.YELLOW}Evictions:{Style.RESET_ALL} {stats['cnf_cache_evictions']}")
+    
+    if 'preprocess_clauses_removed' in stats:
+        print(f"\n{Fore.CYAN}Preprocessing statistics:{Style.RESET_ALL}")
+        print(f"  {Fore.YELLOW}Units propagated:{Style.RESET_ALL} {stats['preprocess_units_propagated']}")
+        print(f"  {Fore.YELLOW}Pure literals eliminated:{Style.RESET_ALL} {stats['preprocess_pure_literals']}")
+        print(f"  {Fore.YELLOW}Clauses removed:{Style.RESET_ALL} {stats['preprocess_clauses_removed']}")
+        print(f"  {Fore.YELLOW}Literals removed:{Style.RESET_ALL} {stats['preprocess_literals_removed']}")
     
     # Calculate clauses per second if time is non-zero
     if time_taken > 0:
         clauses_per_second = stats.get('clauses_generated', 0) / time_taken
         print(f"  {Fore.YELLOW}Clauses per second:{Style.RESET_ALL} {clauses_per_second:.2f}")
 
+def load_knowledge_base(kb_file, encoding='naive', cnf_stats=None, cache=None):
+    """
+    Loads a knowledge base from a text file, a compiled file or a DIMACS CNF file.
+    
+    Args:
+        kb_file (str): Path to the knowledge base file
+        encoding (str): CNF encoding for text files ('naive' or 'tseitin'); compiled
+                        files keep the encoding they were compiled with
+        cnf_stats (dict, optional): Conversion statistics to update
+        cache (CNFCache, optional): Cache of previous conversions
+    
+    Returns:
+        list: Clauses of the knowledge base (frozensets of encoded literals)
+    """
+    try:
+        if is_compiled(kb_file):
+            return load_compiled(kb_file)
+        if is_dimacs(kb_file):
+            return list(read_dimacs(kb_file))
+    except ValueError as e:
+        print(f"Error reading file {kb_file}: {e}")
+        sys.exit(1)
+    
+    knowledge_base = []
+    for sentence in read_from_file(kb_file):
+        knowledge_base += convert_sentence(sentence, encoding=encoding, cnf_stats=cnf_stats, cache=cache)
+    return knowledge_base
+
+def compile_knowledge_base(argv):
+    """
+    Runs the compile subcommand.
+    
+    Args:
+        argv (list): Arguments following 'compile'
+    
+    Returns:
+        int: 0 for successful execution, 1 for errors
+    """
+    args = parse_compile_arguments(argv)
+    cnf_stats = {}
+    cache = CNFCache(args.cnf_cache, args.cnf_cache_size) if args.cnf_cache else None
+    knowledge_base = load_knowledge_base(args.kb_file, args.cnf, cnf_stats, cache)
+    close_cache(cache, cnf_stats)
+    try:
+        write_compiled(knowledge_base, args.output)
+    except OSError as e:
+        print(f"Error writing file {args.output}: {e}")
+        return 1
+    print(f"Compiled {len(knowledge_base)} clauses to {args.output}")
+    return 0
+
+def export_knowledge_base(argv):
+    """
+    Runs the export subcommand.
+    
+    Args:
+        argv (list): Arguments following 'export'
+    
+    Returns:
+        int: 0 for successful execution, 1 for errors
+    """
+    args = parse_export_arguments(argv)
+    cnf_stats = {}
+    cache = CNFCache(args.cnf_cache, args.cnf_cache_size) if args.cnf_cache else None
+    clauses = load_knowledge_base(args.kb_file, args.cnf, cnf_stats, cache)
+    if args.query:
+        query_sentences = read_from_file(args.query)
+        if not query_sentences:
+            print("Error: No query found in the query file.")
+            close_cache(cache, cnf_stats)
+            return 1
+        clauses += convert_sentence(query_sentences[0], negate=True, encoding=args.cnf, cache=cache)
+    close_cache(cache, cnf_stats)
+    try:
+        with open(args.output, 'w') as file:
+            write_dimacs(clauses, file)
+    except OSError as e:
+        print(f"Error writing file {args.output}: {e}")
+        return 1
+    print(f"Exported {len(clauses)} clauses to {args.output}")
+    return 0
+
+def check_proof_command(argv):
+    """
+    Runs the check subcommand.
+    
+    Args:
+        argv (list): Arguments following 'check'
+    
+    Returns:
+        int: 0 if the proof is a valid refutation of the formula, 1 otherwise
+    """
+    args = parse_check_arguments(argv)
+    try:
+        # Both files number atoms the same way, so names are not needed
+        formula = set(read_dimacs(args.formula, named=False))
+        proof = read_tracecheck(args.proof_file)
+        proof.check(formula)
+    except OSError as e:
+        print(f"Error reading file: {e}")
+        return 1
+    except ValueError as e:
+        print(f"{Fore.RED}Proof rejected: {e}{Style.RESET_ALL}")
+        return 1
+    derived = sum(1 for step in range(1, len(proof) + 1) if proof.first[step])
+    print(f"{Fore.GREEN}Proof verified: {len(proof) - derived} input clauses, "
+          f"{derived} resolution steps.{Style.RESET_ALL}")
+    return 0
+
+def write_proof(args, proof, clauses):
+    """
+    Checks a refutation and writes it to --proof-file, with the clauses given to the
+    resolver as the formula in FILE.cnf.
+    
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+        proof (Proof): Refutation found by the resolver
+        clauses (list): Clauses given to the resolver
+    
+    Returns:
+        bool: True if the proof was written
+    """
+    try:
+        proof.check(set(clauses))
+    except ValueError as e:
+        print(f"Error: invalid proof: {e}")
+        return False
+    variables = variable_numbers(clauses)
+    formula_file = args.proof_file + '.cnf'
+    try:
+        with open(formula_file, 'w') as file:
+            write_dimacs(clauses, file, variables)
+        with open(args.proof_file, 'w') as file:
+            if args.proof_format == 'drat':
+                proof.write_drat(file, variables)
+            else:
+                proof.write_tracecheck(file, variables)
+    except OSError as e:
+        print(f"Error writing file: {e}")
+        return False
+    print(f"Wrote checked {args.proof_format} proof ({len(proof)} steps) to {args.proof_file} "
+          f"and its formula to {formula_file}")
+    return True
+
+def close_cache(cache, cnf_stats):
+    """
+    Closes the CNF cache and records its hit and miss counts.
+    
+    Args:
+        cache (CNFCache, optional): Cache used during conversion
+        cnf_stats (dict): Conversion statistics to update
+    """
+    if cache is None:
+        return
+    cache.close()
+    cnf_stats['cnf_cache_hits'] = cache.hits
+    cnf_stats['cnf_cache_misses'] = cache.misses
+    cnf_stats['cnf_cache_evictions'] = cache.evictions
+
+def display_benchmark_record(record):
+    """
+    Display the measurements of one benchmark run on one line.
+    
+    Args:
+        record (dict): Record returned by benchmark.run_benchmark()
+    """
+    colors = {'ok': Fore.GREEN, 'timeout': Fore.YELLOW}
+    name = f"{record['family']} {record['size']} {record['resolver']} {record['cnf']}"
+    status = f"{colors.get(record['status'], Fore.RED)}{record['status']:<8}{Style.RESET_ALL}"
+    if 'time' not in record:
+        print(f"  {Fore.YELLOW}{name:<40}{Style.RESET_ALL} {status}")
+        return
+    print(f"  {Fore.YELLOW}{name:<40}{Style.RESET_ALL} {status} {record['time']:8.4f} s {record['peak_memory']:8.2f} MB "
+          f"{record['clause_pairs_examined']:>10} pairs {record['clauses_generated']:>10} generated")
+
+def run_benchmark_command(argv):
+    """
+    Runs the benchmark subcommand.
+    
+    Args:
+        argv (list): Arguments following 'benchmark'
+    
+    Returns:
+        int: 0 for successful execution, 1 if a run gave a wrong answer, a measurement
+             regressed, or a file could not be read or written
+    """
+    args = parse_benchmark_arguments(argv)
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = benchmark.load_results(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"Error reading baseline {args.baseline}: {e}")
+            return 1
+    
+    print(f"\n{Fore.CYAN}Benchmark runs:{Style.RESET_ALL}")
+    results = benchmark.run_benchmarks(args.families, args.sizes, args.resolvers, args.cnf, args.timeout,
+                                       progress=display_benchmark_record)
+    try:
+        benchmark.save_results(results, args.output)
+    except OSError as e:
+        print(f"Error writing file {args.output}: {e}")
+        return 1
+    print(f"\nWrote {len(results['results'])} results to {args.output}")
+    
+    wrong = [record for record in results['results'] if record['status'] == 'wrong']
+    if wrong:
+        print(f"\n{Fore.RED}{len(wrong)} run(s) gave a wrong answer.{Style.RESET_ALL}")
+    if baseline is None:
+        return 1 if wrong else 0
+    
+    regressions = benchmark.compare_results(results, baseline, args.threshold)
+    print(f"\n{Fore.CYAN}Comparison with {args.baseline} (threshold {args.threshold:.0%}):{Style.RESET_ALL}")
+    if not regressions:
+        print(f"  {Fore.GREEN}No regressions.{Style.RESET_ALL}")
+    for key, metric, old, new in regressions:
+        # Times and memory are floats, counters are integers
+        change = " -> ".join(f"{value:.4f}" if isinstance(value, float) else str(value) for value in (old, new))
+        if metric != 'status' and old:
+            change += f" ({new / old - 1:+.0%})"
+        print(f"  {Fore.YELLOW}{' '.join(map(str, key))} {metric}:{Style.RESET_ALL} {Fore.RED}{change}{Style.RESET_ALL}")
+    return 1 if wrong or regressions else 0
+
+def display_profile(profiler, elapsed):
+    """
+    Display the time spent in each phase, parts indented below their phase, and the counters.
+    
+    Args:
+        profiler (PhaseProfiler): Profiler active during the run
+        elapsed (float): Wall time of the run in seconds
+    """
+    print(f"\n{Fore.CYAN}Profile:{Style.RESET_ALL}")
+    print(f"  {'Phase':<44} {'Time (s)':>10} {'Share':>7} {'Calls':>10}")
+    for path, seconds, calls, depth in profiler.report():
+        name = "  " * depth + path.rsplit("/", 1)[-1]
+        share = seconds / elapsed if elapsed > 0 else 0.0
+        print(f"  {Fore.YELLOW}{name:<44}{Style.RESET_ALL} {seconds:>10.4f} {share:>7.1%} {calls:>10}")
+    print(f"  {Fore.YELLOW}{'Total':<44}{Style.RESET_ALL} {elapsed:>10.4f}")
+    for name, value in profiler.counters.items():
+        print(f"  {Fore.YELLOW}{name.capitalize()}:{Style.RESET_ALL} {value}")
+
+def file_sha256(filename):
+    """
+    Computes the SHA-256 digest of a file.
+    
+    Args:
+        filename (str): Path to the file
+    
+    Returns:
+        str: Hexadecimal digest, or None if the file cannot be read
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(filename, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 16), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def run_record(args, result, time_taken, peak_memory, stats, exit_code, query=None):
+    """
+    Builds the JSON record of a run (or of one query in batch mode).
+    
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+        result (bool): Resolver result (True when a refutation was found, None if unknown)
+        time_taken (float): Resolution time in seconds
+        peak_memory (float): Peak memory usage in MB
+        stats (dict): Resolution statistics
+        exit_code (int): Exit code the result corresponds to
+        query (str, optional): Query sentence
+    
+    Returns:
+        dict: Record with the inputs and their hashes, the resolver configuration,
+              result, exit_code, time, peak_memory_mb and every statistic
+    """
+    if result is None:
+        outcome = 'unknown'
+    elif args.no_query:
+        outcome = 'unsatisfiable' if result else 'satisfiable'
+    else:
+        outcome = 'entailed' if result else 'not entailed'
+    excluded = ('kb_file', 'query_file', 'verbose', 'format', 'profile')
+    return {
+        'kb_file': args.kb_file,
+        'kb_sha256': file_sha256(args.kb_file),
+        'query_file': args.query_file,
+        'query_sha256': file_sha256(args.query_file) if args.query_file else None,
+        'query': query,
+        'config': {key: value for key, value in vars(args).items() if key not in excluded},
+        'result': outcome,
+        'exit_code': exit_code,
+        'time': time_taken,
+        'peak_memory_mb': peak_memory,
+        'stats': stats,
+    }
+
+def emit_record(record, stream):
+    """
+    Writes a record as one line of JSON and flushes it, so that records can be consumed
+    while a batch is running.
+    
+    Args:
+        record (dict): Record to write
+        stream (file): Text stream to write to
+    """
+    stream.write(json.dumps(record, default=str) + "\n")
+    stream.flush()
+
+def display_proof(proof):
+    """
+    Display the refutation found by the resolver, one numbered clause per line.
+    
+    Args:
+        proof (Proof): Refutation extracted from the recorded derivation
+    """
+    derived = sum(1 for step in range(1, len(proof) + 1) if proof.first[step])
+    print(f"\n{Fore.CYAN}Proof ({len(proof) - derived} input clauses, {derived} resolution steps):{Style.RESET_ALL}")
+    width = len(str(len(proof)))
+    for step in range(1, len(proof) + 1):
+        if not proof.first[step]:
+            origin = "input"
+        else:
+            origin = (f"resolve {proof.first[step]} and {proof.second[step]} "
+                      f"on {decode_literal(abs(proof.pivot(step)))}")
+        print(f"  {Fore.YELLOW}{step:>{width}}.{Style.RESET_ALL} "
+              f"{Fore.MAGENTA}{format_clause(proof.clauses[step])}{Style.RESET_ALL} {origin}")
+
+def display_model(model):
+    """
+    Display a satisfying assignment found by the solver.
+    
+    Args:
+        model (dict): Atom name -> truth value
+    """
+    true_atoms = sorted(atom for atom, value in model.items() if value)
+    false_atoms = sorted(atom for atom, value in model.items() if not value)
+    print(f"\n{Fore.CYAN}Model:{Style.RESET_ALL}")
+    print(f"  {Fore.YELLOW}True:{Style.RESET_ALL} {', '.join(true_atoms) if true_atoms else '-'}")
+    print(f"  {Fore.YELLOW}False:{Style.RESET_ALL} {', '.join(false_atoms) if false_atoms else '-'}")
+
+def run_batch(resolve, knowledge_base, query_sentences, args, resolver_options, cnf_stats, cache, json_output=None):
+    """
+    Answers every query against a knowledge base prepared once, printing one line per query.
+    
+    With --jobs N the queries are answered by N worker processes; results are still
+    printed in input order. With a JSON output stream, a record is written to it for each
+    query as soon as it is answered, followed by a summary record.
+    
+    Args:
+        resolve (function): Resolve function of the selected resolver
+        knowledge_base (list): Clauses of the knowledge base
+        query_sentences (list): Query sentences
+        args (argparse.Namespace): Parsed command-line arguments
+        resolver_options (dict): Extra keyword arguments of the resolver
+        cnf_stats (dict): Conversion statistics to update
+        cache (CNFCache, optional): Cache of previous conversions
+        json_output (file, optional): Stream receiving JSON Lines records
+    
+    Returns:
+        int: 0 if every query is entailed, EXIT_UNKNOWN if some query ran out of budget,
+             1 otherwise
+    """
+    with phase("knowledge base preparation"):
+        prepared, consistent, prepare_stats = prepare_knowledge_base(knowledge_base, args.saturation_rounds)
+    print(f"\n{Fore.CYAN}Knowledge base preparation:{Style.RESET_ALL}")
+    print(f"  {Fore.YELLOW}Clauses:{Style.RESET_ALL} {prepare_stats['kb_initial_clauses']} -> {prepare_stats['kb_prepared_clauses']}")
+    print(f"  {Fore.YELLOW}Literals removed by units:{Style.RESET_ALL} {prepare_stats['kb_literals_removed']}")
+    print(f"  {Fore.YELLOW}Subsumed clauses removed:{Style.RESET_ALL} {prepare_stats['kb_subsumed_clauses']}")
+    print(f"  {Fore.YELLOW}Resolvents added:{Style.RESET_ALL} {prepare_stats['kb_resolvents_added']}")
+    print(f"  {Fore.YELLOW}Preparation time:{Style.RESET_ALL} {prepare_stats['kb_preparation_time']:.4f} seconds")
+    if not consistent:
+        print(f"  {Fore.RED}Knowledge base is not satisfiable: every query is entailed.{Style.RESET_ALL}")
+    
+    # Convert every query first, so that worker processes receive a complete atom table
+    negated_queries = []
+    conversion_times = []
+    for sentence in query_sentences:
+        start_time = time.time()
+        with phase("query conversion"):
+            negated_queries.append(convert_sentence(sentence, negate=True, encoding=args.cnf, cnf_stats=cnf_stats, cache=cache))
+        conversion_times.append(time.time() - start_time)
+    close_cache(cache, cnf_stats)
+    
+    print(f"\n{Fore.CYAN}Queries:{Style.RESET_ALL}")
+    entailed = 0
+    unknown = 0
+    total_time = 0.0
+    query_stats = []
+    start_time = time.time()
+    answers = answer_queries(resolve, prepared, consistent, negated_queries, args.jobs, args.verbose, resolver_options)
+    for number, (sentence, (result, time_taken, stats)) in enumerate(zip(query_sentences, answers), 1):
+        time_taken += conversion_times[number - 1]
+        total_time += time_taken
+        query_stats.append(stats)
+        if result is None:
+            unknown += 1
+            outcome = f"{Fore.YELLOW}unknown ({stats['budget_exceeded']}){Style.RESET_ALL}"
+        elif result:
+            entailed += 1
+            outcome = f"{Fore.GREEN}entailed{Style.RESET_ALL}"
+        else:
+            outcome = f"{Fore.RED}not entailed{Style.RESET_ALL}"
+        print(f"  {Fore.YELLOW}{number}.{Style.RESET_ALL} {sentence}: {outcome} "
+              f"({time_taken:.4f} seconds, {stats.get('clauses_generated', 0)} clauses generated)")
+        if json_output is not None:
+            exit_code = EXIT_UNKNOWN if result is None else (0 if result else 1)
+            record = run_record(args, result, time_taken, None, stats, exit_code, query=sentence)
+            record['query_number'] = number
+            emit_record(record, json_output)
+    wall_time = time.time() - start_time + sum(conversion_times)
+    totals = aggregate_stats(query_stats)
+    exit_code = EXIT_UNKNOWN if unknown else (0 if entailed == len(query_sentences) else 1)
+    if json_output is not None:
+        emit_record({
+            'summary': True,
+            'queries': len(query_sentences),
+            'entailed': entailed,
+            'unknown': unknown,
+            'exit_code': exit_code,
+            'total_query_time': total_time,
+            'wall_time': wall_time,
+            'preparation': prepare_stats,
+            'totals': totals,
+        }, json_output)
+    
+    print(f"\n{Fore.CYAN}Batch summary:{Style.RESET_ALL}")
+    print(f"  {Fore.YELLOW}Queries entailed:{Style.RESET_ALL} {entailed}/{len(query_sentences)}")
+    if unknown:
+        print(f"  {Fore.YELLOW}Queries unknown:{Style.RESET_ALL} {unknown}/{len(query_sentences)}")
+    print(f"  {Fore.YELLOW}Total query time:{Style.RESET_ALL} {total_time:.4f} seconds")
+    print(f"  {Fore.YELLOW}Wall time ({args.jobs} {'job' if args.jobs == 1 else 'jobs'}):{Style.RESET_ALL} {wall_time:.4f} seconds")
+    print(f"  {Fore.YELLOW}Clauses generated:{Style.RESET_ALL} {totals.get('clauses_generated', 0)}")
+    print(f"  {Fore.YELLOW}Clause pairs examined:{Style.RESET_ALL} {totals.get('clause_pairs_examined', 0)}")
+    if 'conflicts' in totals:
+        print(f"  {Fore.YELLOW}Conflicts:{Style.RESET_ALL} {totals['conflicts']}")
+    return exit_code
+
 def get_resolver(resolver_type):
     """
     Dynamically import the appropriate resolver module based on user selection.
     
     Args:
-        resolver_type (str): The type of resolver to use ('default' or 'new')
+        resolver_type (str): The type of resolver to use ('default', 'new', 'given-clause', 'cdcl'
+                             or 'portfolio')
     
     Returns:
         function: The resolve function from the appropriate module
@@ -120,8 +935,14 @@ def get_resolver(resolver_type):
     try:
         if resolver_type == 'default':
             from resolver import resolve
-        else:  # resolver_type == 'new'
+        elif resolver_type == 'new':
             from resolver_new import resolve
+        elif resolver_type == 'given-clause':
+            from resolver_given import resolve
+        elif resolver_type == 'cdcl':
+            from resolver_cdcl import resolve
+        else:  # resolver_type == 'portfolio'
+            from portfolio import resolve
         return resolve
     except ImportError as e:
         print(f"Error importing resolver module: {e}")
@@ -133,39 +954,163 @@ def main():
     Main function to run the propositional logic resolution prover.
     
     Returns:
-        int: 0 for successful execution, 1 for errors
+        int: 0 if the query is entailed (or the knowledge base satisfiable), 1 if not or
+             on errors, EXIT_UNKNOWN if a budget ran out first
+    """
+    if len(sys.argv) > 1 and sys.argv[1] == 'compile':
+        return compile_knowledge_base(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'export':
+        return export_knowledge_base(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        return run_benchmark_command(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'check':
+        return check_proof_command(sys.argv[2:])
+    
+    args = parse_arguments()
+    if args.format == 'text':
+        return run(args)
+    
+    json_output = sys.stdout
+    # Human-readable messages, errors included, go to stderr without color codes
+    sys.stdout = colorama.AnsiToWin32(sys.stderr, strip=True).stream
+    LoadingIndicator.enabled = False
+    try:
+        return run(args, json_output)
+    finally:
+        sys.stdout = json_output
+        LoadingIndicator.enabled = True
+
+def run(args, json_output=None):
+    """
+    Runs prove(), profiled if requested on the command line.
+    
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+        json_output (file, optional): Stream receiving JSON records instead of the text report
+    
+    Returns:
+        int: Exit code returned by prove()
     """
-    kb_file, query_file, verbose, no_query, resolver_type = parse_arguments()
+    if args.profile is None:
+        return prove(args, json_output)
+    
+    profiler = profiling.enable()
+    cprofile = cProfile.Profile() if args.profile else None
+    if cprofile is not None:
+        cprofile.enable()
+    try:
+        return prove(args, json_output)
+    finally:
+        if cprofile is not None:
+            cprofile.disable()
+        profiling.disable()
+        display_profile(profiler, profiler.elapsed())
+        if cprofile is not None:
+            try:
+                cprofile.dump_stats(args.profile)
+                print(f"\nWrote cProfile statistics to {args.profile} (view with: python -m pstats {args.profile})")
+            except OSError as e:
+                print(f"Error writing file {args.profile}: {e}")
+
+def prove(args, json_output=None):
+    """
+    Answers the query (or checks the knowledge base) given on the command line.
+    
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+        json_output (file, optional): Stream receiving JSON records instead of the text report
+    
+    Returns:
+        int: 0 if the query is entailed (or the knowledge base satisfiable), 1 if not or
+             on errors, EXIT_UNKNOWN if a budget ran out first
+    """
+    resolver_type = args.resolver
     
     # Get the appropriate resolver
     resolve = get_resolver(resolver_type)
     print(f"Using {resolver_type} resolver implementation")
     
-    kb_sentences = read_from_file(kb_file)
+    # Options only understood by some resolvers
+    resolver_options = {}
+    if args.preprocess:
+        resolver_options['preprocess'] = True
+    if resolver_type == 'given-clause':
+        resolver_options['heuristic'] = args.heuristic
+    if args.parallel > 1:
+        resolver_options['parallel'] = args.parallel
+    if args.timeout is not None or args.max_clauses is not None or args.max_memory_mb is not None:
+        resolver_options['budget'] = Budget(args.timeout, args.max_clauses, args.max_memory_mb)
+    if args.memory_sampling != 'rss' or args.memory_interval != DEFAULT_INTERVAL:
+        resolver_options['memory'] = MemoryMonitor(args.memory_sampling, args.memory_interval)
+    if args.proof or args.proof_file:
+        resolver_options['proof'] = Derivation()
+    if not args.trace:
+        return answer(args, resolve, resolver_options, json_output)
+    
+    try:
+        trace_file = open(args.trace, 'w', encoding='utf-8')
+    except OSError as e:
+        print(f"Error writing file {args.trace}: {e}")
+        return 1
+    with trace_file:
+        resolver_options['trace'] = TraceWriter(trace_file)
+        return answer(args, resolve, resolver_options, json_output)
+
+def answer(args, resolve, resolver_options, json_output=None):
+    """
+    Loads the inputs and runs the resolver on them, reporting the answer.
+    
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+        resolve (function): Resolve function of the chosen resolver
+        resolver_options (dict): Extra keyword arguments of the resolver
+        json_output (file, optional): Stream receiving JSON records instead of the text report
+    
+    Returns:
+        int: Exit code, as returned by prove()
+    """
+    kb_file, query_file, verbose, no_query = args.kb_file, args.query_file, args.verbose, args.no_query
     
     # Process the knowledge base
-    knowledge_base = []
-    for sentence in kb_sentences:
-        sentence = to_cnf(segment_sentence(sentence))
-        knowledge_base += sentence.copy()
-        knowledge_base.append("&")
+    cnf_stats = {}
+    cache = CNFCache(args.cnf_cache, args.cnf_cache_size) if args.cnf_cache else None
+    with phase("knowledge base loading"):
+        knowledge_base = load_knowledge_base(kb_file, args.cnf, cnf_stats, cache)
     
     if no_query:
+        close_cache(cache, cnf_stats)
         # Just check if the knowledge base is consistent (not self-contradictory)
         # To check consistency, we see if we can derive a contradiction
         if not knowledge_base:
+            if json_output is not None:
+                emit_record(run_record(args, False, 0.0, 0.0, dict(cnf_stats), 0), json_output)
             print(f"\n{Fore.GREEN}Knowledge base is satisfiable.{Style.RESET_ALL}")
             return 0
         
-        knowledge_base.pop()  # Remove the last "&"
-        result, time_taken, peak_memory, stats = resolve(knowledge_base.copy(), verbose)
+        with phase("resolution"):
+            result, time_taken, peak_memory, stats = resolve(knowledge_base.copy(), verbose, **resolver_options)
+        add_cnf_stats(stats, cnf_stats)
+        refutation = resolver_options['proof'].refutation() if result and 'proof' in resolver_options else None
+        if refutation is not None and args.proof_file and not write_proof(args, refutation, knowledge_base):
+            return 1
         
+        if json_output is not None:
+            exit_code = EXIT_UNKNOWN if result is None else (1 if result else 0)
+            emit_record(run_record(args, result, time_taken, peak_memory, stats, exit_code), json_output)
+            return exit_code
         display_metrics(time_taken, peak_memory, stats)
         
+        if result is None:
+            print(f"\n{Fore.YELLOW}Unknown: stopped by the {stats['budget_exceeded']} before deciding satisfiability.{Style.RESET_ALL}")
+            return EXIT_UNKNOWN
         if not result:
+            if 'model' in stats:
+                display_model(stats['model'])
             print(f"\n{Fore.GREEN}Knowledge base is satisfiable.{Style.RESET_ALL}")
             return 0
         else:
+            if args.proof:
+                display_proof(refutation)
             print(f"\n{Fore.RED}Knowledge base is not satisfiable (self-contradictory).{Style.RESET_ALL}")
             return 1
     else:
@@ -173,21 +1118,49 @@ def main():
         query_sentences = read_from_file(query_file)
         if not query_sentences:
             print("Error: No query found in the query file.")
+            close_cache(cache, cnf_stats)
             return 1
+        
+        if args.batch:
+            return run_batch(resolve, knowledge_base, query_sentences, args, resolver_options, cnf_stats, cache,
+                             json_output)
             
         # Process the query
-        query = query_sentences[0]
-        query = to_cnf(segment_sentence("!("+query+")"))
+        query_sentence = query_sentences[0]
+        with phase("query conversion"):
+            query = convert_sentence(query_sentence, negate=True, encoding=args.cnf, cnf_stats=cnf_stats, cache=cache)
+        close_cache(cache, cnf_stats)
     
         # Do the resolution refutation procedure
-        result, time_taken, peak_memory, stats = resolve(knowledge_base.copy() + query.copy(), verbose)
+        with phase("resolution"):
+            if args.strategy == 'sos':
+                # Pass the negated query separately as the set of support
+                result, time_taken, peak_memory, stats = resolve(knowledge_base.copy(), verbose, support=query.copy(), **resolver_options)
+            else:
+                result, time_taken, peak_memory, stats = resolve(knowledge_base.copy() + query.copy(), verbose, **resolver_options)
+        add_cnf_stats(stats, cnf_stats)
+        refutation = resolver_options['proof'].refutation() if result and 'proof' in resolver_options else None
+        if refutation is not None and args.proof_file and not write_proof(args, refutation, knowledge_base + query):
+            return 1
         
+        if json_output is not None:
+            exit_code = EXIT_UNKNOWN if result is None else (0 if result else 1)
+            emit_record(run_record(args, result, time_taken, peak_memory, stats, exit_code, query=query_sentence),
+                        json_output)
+            return exit_code
         display_metrics(time_taken, peak_memory, stats)
         
+        if result is None:
+            print(f"\n{Fore.YELLOW}Unknown: stopped by the {stats['budget_exceeded']} before deciding entailment.{Style.RESET_ALL}")
+            return EXIT_UNKNOWN
         if result:
+            if args.proof:
+                display_proof(refutation)
             print(f"\n{Fore.GREEN}Knowledge base entails the query.{Style.RESET_ALL}")
             return 0
         else:
+            if 'model' in stats:
+                display_model(stats['model'])
             print(f"\n{Fore.RED}Knowledge base does not entail the query.{Style.RESET_ALL}")
             return 1
 
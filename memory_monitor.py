@@ -0,0 +1,151 @@
+"""
+Memory monitor module for propositional logic resolution prover.
+Tracks peak memory, memory per clause and memory growth during a proof search.
+
+Resolvers report their clause count to sample() whenever it grows. A sample is only
+taken when the count has grown by the sampling interval since the last one, so the
+check in the hot loop is a single comparison, and memory is measured at evenly spaced
+points of the search rather than at the start of saturation rounds. Two measurement
+policies are available:
+    - 'rss': resident set size of the process, read through a cached psutil handle
+             (cheap, but only as precise as the sampling interval)
+    - 'tracemalloc': bytes allocated by Python, with the exact peak between samples
+                     (precise, but slows allocation-heavy code down noticeably)
+At most MAX_SAMPLES samples are kept: when the list is full, every other sample is
+dropped and the interval is doubled, so long searches keep an evenly spaced history.
+"""
+
+import time
+import tracemalloc
+import psutil
+
+# Measurement policies
+POLICIES = ("rss", "tracemalloc")
+
+# Default number of clauses added between two samples
+DEFAULT_INTERVAL = 1000
+
+# Maximum number of samples kept
+MAX_SAMPLES = 256
+
+BYTES_PER_MB = 1024 * 1024
+
+
+class MemoryMonitor:
+    """
+    Memory usage of one proof search, sampled on a clause-count schedule.
+
+    Attributes:
+        peak (float): Highest memory usage seen, in MB
+        samples (list): (seconds since start, clause count, MB) per sample
+    """
+    def __init__(self, policy="rss", interval=DEFAULT_INTERVAL):
+        """
+        Args:
+            policy (str): 'rss' or 'tracemalloc' (see module docstring)
+            interval (int): Number of clauses added between two samples
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown memory sampling policy: {policy}")
+        self.policy = policy
+        self.configured_interval = max(1, interval)
+        self.interval = self.configured_interval
+        self.process = None
+        self.start_time = None
+        self.baseline = 0.0
+        self.peak = 0.0
+        self.peak_clauses = 0
+        self.next_sample = 0
+        self.samples = []
+        self.started_tracing = False
+
+    def __getstate__(self):
+        # The process handle belongs to this process; workers create their own
+        state = self.__dict__.copy()
+        state["process"] = None
+        return state
+
+    def _measure(self):
+        """Current memory usage in MB (traced peak since the last measurement for tracemalloc)"""
+        if self.policy == "tracemalloc":
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            return peak / BYTES_PER_MB
+        return self.process.memory_info().rss / BYTES_PER_MB
+
+    def start(self, clause_count=0):
+        """
+        Starts (or restarts) monitoring; called by the resolver when the search starts.
+
+        Args:
+            clause_count (int): Initial number of clauses
+        """
+        if self.policy == "tracemalloc":
+            self.started_tracing = not tracemalloc.is_tracing()
+            if self.started_tracing:
+                tracemalloc.start()
+        elif self.process is None:
+            # The process handle is created once, since creating it is not cheap
+            self.process = psutil.Process()
+        self.start_time = time.perf_counter()
+        # A monitor reused across searches starts over from the configured interval,
+        # not the one doubled while thinning out the previous search's samples
+        self.interval = self.configured_interval
+        self.samples = []
+        self.peak = 0.0
+        self.peak_clauses = 0
+        self.baseline = self._measure()
+        self._record(clause_count, self.baseline)
+
+    def _record(self, clause_count, memory):
+        """Store a sample and schedule the next one"""
+        if memory > self.peak:
+            self.peak = memory
+            self.peak_clauses = clause_count
+        self.samples.append((time.perf_counter() - self.start_time, clause_count, memory))
+        if len(self.samples) > MAX_SAMPLES:
+            # Keep the first and last sample and every other one in between
+            self.samples = self.samples[:-1:2] + self.samples[-1:]
+            self.interval *= 2
+        self.next_sample = clause_count + self.interval
+
+    def sample(self, clause_count):
+        """
+        Reports the current clause count, measuring memory if a sample is due.
+
+        Args:
+            clause_count (int): Current number of clauses
+        """
+        if clause_count >= self.next_sample:
+            self._record(clause_count, self._measure())
+
+    def stop(self, clause_count, stats):
+        """
+        Takes a final sample, ends monitoring and adds the memory statistics of the search.
+
+        The statistics are memory_policy, memory_samples (the sample list), memory_growth
+        (MB from the first to the last sample), memory_growth_rate (MB per second) and
+        memory_bytes_per_clause (growth up to the peak over the clause count at the peak).
+
+        Args:
+            clause_count (int): Final number of clauses
+            stats (dict): Resolution statistics to update
+
+        Returns:
+            float: Peak memory usage in MB
+        """
+        self._record(clause_count, self._measure())
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+        first_time, _, first_memory = self.samples[0]
+        last_time, _, last_memory = self.samples[-1]
+        elapsed = last_time - first_time
+        stats["memory_policy"] = self.policy
+        stats["memory_samples"] = list(self.samples)
+        stats["memory_growth"] = last_memory - first_memory
+        stats["memory_growth_rate"] = stats["memory_growth"] / elapsed if elapsed > 0 else 0.0
+        stats["memory_bytes_per_clause"] = (
+            (self.peak - self.baseline) * BYTES_PER_MB / self.peak_clauses if self.peak_clauses else 0.0)
+        return self.peak
@@ -0,0 +1,289 @@
+"""
+Parallel resolution module for propositional logic resolution prover.
+Generates the resolvents of one saturation round in several worker processes.
+
+Each worker keeps a mirror of the clause set, indexed like the parent's, and the parent
+only sends changes to it: clauses are numbered, and added or removed clauses are shipped
+as packed int32 arrays rather than pickled sets. A round splits the clause pairs between
+the workers by clause number. Workers filter the resolvents they derive against their
+mirror (already present, or forward-subsumed) and report the clauses they backward-subsume,
+so the parent only merges and deduplicates the results. A worker that derives the empty
+clause sets a shared event, which makes the others abandon the round.
+"""
+
+import multiprocessing
+import time
+from array import array
+
+# Number of clause pairs a worker examines between checks of the stop event
+STOP_CHECK_INTERVAL = 256
+
+
+def pack_clauses(clauses):
+    """
+    Packs clauses into a flat int32 array of (length, literals...) records.
+
+    Args:
+        clauses (iterable): Clauses (iterables of encoded literals)
+
+    Returns:
+        bytes: Packed clauses
+    """
+    packed = array("i")
+    for clause in clauses:
+        packed.append(len(clause))
+        packed.extend(clause)
+    return packed.tobytes()
+
+
+def unpack_clauses(data):
+    """
+    Unpacks clauses packed by pack_clauses().
+
+    Args:
+        data (bytes): Packed clauses
+
+    Returns:
+        list: Clauses (frozensets of encoded literals)
+    """
+    packed = array("i")
+    packed.frombytes(data)
+    clauses = []
+    i = 0
+    while i < len(packed):
+        length = packed[i]
+        clauses.append(frozenset(packed[i + 1:i + 1 + length]))
+        i += 1 + length
+    return clauses
+
+
+def _worker_loop(connection, stop, number, workers, subsumption, set_of_support):
+    """
+    Serves rounds for the parent until it sends None.
+
+    Messages from the parent are (added_ids, added_clauses, supported_ids, removed_ids,
+    worklist_ids, deadline). Replies are (resolvents, parents, subsumed_ids, counters, found_empty),
+    where resolvents are packed and parents holds (id1, id2, eliminated pair) per resolvent.
+    """
+    from clause_index import OccurrenceIndex, SubsumptionIndex
+    from resolver import resolve_clause_pair
+
+    index = SubsumptionIndex() if subsumption else OccurrenceIndex()
+    clauses = {}
+    ids = {}
+    supported = set()
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        added_ids, added_clauses, supported_ids, removed_ids, worklist, deadline = message
+        for clause_id in removed_ids:
+            clause = clauses.pop(clause_id)
+            del ids[clause]
+            index.remove(clause)
+            supported.discard(clause_id)
+        for clause_id, clause in zip(added_ids, unpack_clauses(added_clauses)):
+            clauses[clause_id] = clause
+            ids[clause] = clause_id
+            index.add(clause)
+        supported.update(supported_ids)
+
+        # CPU time rather than wall time, which would also count time waiting for a core
+        start_time = time.process_time()
+        checks = (index.checks, index.candidates, index.hits) if subsumption else (0, 0, 0)
+        counters = {"clause_pairs_examined": 0, "clauses_generated": 0, "tautologies_discarded": 0}
+        resolvents = {}
+        subsumed_ids = set()
+        found_empty = False
+
+        if worklist is None:
+            # Level saturation: every pair once, as (lower id, higher id), owned by the lower id
+            tasks = [clause_id for clause_id in clauses if clause_id % workers == number]
+        else:
+            tasks = worklist
+
+        for id1 in tasks:
+            c1 = clauses[id1]
+            for c2 in index.clashing(c1):
+                id2 = ids[c2]
+                if worklist is None:
+                    if id2 <= id1:
+                        continue
+                    # Set of support: never resolve two clauses outside the support
+                    if set_of_support and id1 not in supported and id2 not in supported:
+                        continue
+                counters["clause_pairs_examined"] += 1
+                if counters["clause_pairs_examined"] % STOP_CHECK_INTERVAL == 0:
+                    if deadline is not None and time.time() > deadline:
+                        stop.set()
+                    if stop.is_set():
+                        break
+                for resolvent, eliminated in resolve_clause_pair(c1, c2, counters):
+                    counters["clauses_generated"] += 1
+                    if resolvent in ids or resolvent in resolvents:
+                        continue
+                    if subsumption:
+                        if index.subsumed(resolvent):
+                            continue
+                        subsumed_ids.update(ids[clause] for clause in index.subsumes(resolvent))
+                    resolvents[resolvent] = (id1, id2, eliminated)
+                    if not resolvent:
+                        found_empty = True
+                        stop.set()
+                        break
+                if found_empty:
+                    break
+            if found_empty or stop.is_set():
+                break
+
+        if subsumption:
+            counters["subsumption_checks"] = index.checks - checks[0]
+            counters["subsumption_candidates"] = index.candidates - checks[1]
+            counters["subsumption_index_hits"] = index.hits - checks[2]
+        counters["worker_time"] = time.process_time() - start_time
+        connection.send((pack_clauses(resolvents), list(resolvents.values()), subsumed_ids, counters, found_empty))
+    connection.close()
+
+
+class ResolventPool:
+    """
+    Worker processes generating the resolvents of a clause set in parallel.
+
+    The parent registers clause additions and removals with add() and remove(); they are
+    sent to the workers with the next round.
+
+    Attributes:
+        stats (dict): Counters summed over all workers and rounds, plus parallel_round_time
+                      (wall time of the rounds) and parallel_worker_time (summed worker CPU time)
+    """
+    def __init__(self, workers, subsumption=False, set_of_support=False):
+        """
+        Args:
+            workers (int): Number of worker processes
+            subsumption (bool): Whether workers filter resolvents by subsumption, and report
+                                the clauses they subsume
+            set_of_support (bool): Whether level saturation skips pairs of two clauses
+                                   outside the support (see add())
+        """
+        self.workers = workers
+        self.stop = multiprocessing.Event()
+        self.connections = []
+        self.processes = []
+        for number in range(workers):
+            parent_end, worker_end = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker_loop,
+                                              args=(worker_end, self.stop, number, workers, subsumption, set_of_support),
+                                              daemon=True)
+            process.start()
+            worker_end.close()
+            self.connections.append(parent_end)
+            self.processes.append(process)
+        self.ids = {}
+        self.clauses = {}
+        self.next_id = 0
+        # Clauses numbered from here on have not been sent to the workers yet
+        self.unsent_id = 0
+        self.added = []
+        self.supported = []
+        self.removed = []
+        self.stats = {"parallel_round_time": 0.0, "parallel_worker_time": 0.0}
+
+    def add(self, clause, supported=False):
+        """Register a clause added to the clause set"""
+        if clause in self.ids:
+            return
+        clause_id = self.next_id
+        self.next_id += 1
+        self.ids[clause] = clause_id
+        self.clauses[clause_id] = clause
+        self.added.append(clause_id)
+        if supported:
+            self.supported.append(clause_id)
+
+    def remove(self, clause):
+        """Register a clause removed from the clause set"""
+        clause_id = self.ids.pop(clause, None)
+        if clause_id is None:
+            return
+        del self.clauses[clause_id]
+        self.removed.append(clause_id)
+
+    def run_round(self, worklist=None, deadline=None):
+        """
+        Generates resolvents in all workers.
+
+        Args:
+            worklist (iterable, optional): Clauses to resolve with every clashing clause
+                                           (resolver_new); by default every clause pair is
+                                           examined once (resolver)
+            deadline (float, optional): Time (as returned by time.time()) at which the
+                                        workers abandon the round
+
+        Returns:
+            tuple: (resolvents, subsumed, found_empty)
+                - resolvents (dict): New resolvent -> (parent 1, parent 2, eliminated literals)
+                - subsumed (set): Registered clauses subsumed by some resolvent
+                - found_empty (bool): Whether the empty clause was derived
+        """
+        start_time = time.perf_counter()
+        self.stop.clear()
+        added = [clause_id for clause_id in self.added if clause_id in self.clauses]
+        packed = pack_clauses(self.clauses[clause_id] for clause_id in added)
+        supported = [clause_id for clause_id in self.supported if clause_id in self.clauses]
+        removed = [clause_id for clause_id in self.removed if clause_id < self.unsent_id]
+        shares = [None] * self.workers
+        if worklist is not None:
+            worklist_ids = [self.ids[clause] for clause in worklist]
+            shares = [worklist_ids[number::self.workers] for number in range(self.workers)]
+        for connection, share in zip(self.connections, shares):
+            connection.send((added, packed, supported, removed, share, deadline))
+        self.added, self.supported, self.removed = [], [], []
+        self.unsent_id = self.next_id
+
+        resolvents = {}
+        subsumed = set()
+        found_empty = False
+        for connection in self.connections:
+            data, parents, subsumed_ids, counters, worker_found_empty = connection.recv()
+            for resolvent, (id1, id2, eliminated) in zip(unpack_clauses(data), parents):
+                if resolvent not in resolvents:
+                    resolvents[resolvent] = (self.clauses[id1], self.clauses[id2], eliminated)
+            subsumed.update(self.clauses[clause_id] for clause_id in subsumed_ids)
+            found_empty = found_empty or worker_found_empty
+            self.stats["parallel_worker_time"] += counters.pop("worker_time")
+            for key, value in counters.items():
+                self.stats[key] = self.stats.get(key, 0) + value
+        self.stats["parallel_round_time"] += time.perf_counter() - start_time
+        return resolvents, subsumed, found_empty
+
+    def close(self):
+        """Stop the worker processes"""
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+
+def record_parallel_stats(stats, pool):
+    """
+    Adds the counters of a resolvent pool to the resolution statistics.
+
+    Args:
+        stats (dict): Resolution statistics to update
+        pool (ResolventPool): Pool used for the proof search
+    """
+    for key, value in pool.stats.items():
+        stats[key] = stats.get(key, 0) + value
+    stats["parallel_workers"] = pool.workers
+    round_time = pool.stats["parallel_round_time"]
+    # Fraction of the generation wall time the workers spent busy. This is not a speedup:
+    # that would need the time of the same work on one core, which is never measured
+    capacity = round_time * pool.workers
+    stats["parallel_utilisation"] = pool.stats["parallel_worker_time"] / capacity if capacity > 0 else 0.0
@@ -2,18 +2,83 @@
 Parser module for propositional logic resolution prover.
 Handles tokenization and parsing of propositional logic formulas.
 
+Formulas are parsed in a single pass into a compact abstract syntax tree (Atom, Not and
+BinaryOp nodes). The token-list helpers (segment_sentence, forward_slice, backward_slice)
+are kept for the token-based CNF converter.
+
 * The following code is adapted from propositional-logic-theorem-prover-using-resolution-refutation
 * Original author: Chakshu Gupta (ChakshuGupta13)
 * Source: https://github.com/ChakshuGupta13/propositional-logic-theorem-prover-using-resolution-refutation
 """
 
 
+import re
+from profiling import phase
+
 OPERATORS = ["!", "&", "|", ">", "=", "(", ")"]
 
+# Binding strength of binary operators; all of them are left-associative,
+# e.g. A > B > C is read as (A > B) > C
+PRECEDENCE = {"&": 4, "|": 3, ">": 2, "=": 1}
+
+# An operator, or a maximal run of characters that are neither operators nor whitespace
+TOKEN_PATTERN = re.compile(r"[!&|>=()]|[^!&|>=()\s]+")
+
+
+class Atom:
+    """Propositional variable"""
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+class Not:
+    """Negation of a formula"""
+    __slots__ = ("operand",)
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def __repr__(self):
+        return f"!{self.operand!r}"
+
+
+class BinaryOp:
+    """Binary connective (one of '&', '|', '>', '=') applied to two formulas"""
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return f"({self.left!r}{self.op}{self.right!r})"
+
+
+def tokenize(sentence):
+    """
+    Splits a propositional logic sentence into operator and literal tokens in one pass.
+    
+    Args:
+        sentence (str): A string representing a propositional logic formula
+    
+    Returns:
+        list: A list of tokens (operators and literals)
+    """
+    return TOKEN_PATTERN.findall(sentence)
+
+
 def segment_sentence(sentence):
     """
     Tokenizes a propositional logic sentence into a list of tokens.
     
+    Compatibility wrapper around tokenize() for the token-based CNF converter.
+    
     Args:
         sentence (str): A string representing a propositional logic formula
     
@@ -24,25 +89,102 @@ def segment_sentence(sentence):
         >>> segment_sentence("A & (B | !C)")
         ['A', '&', '(', 'B', '|', '!', 'C', ')']
     """
-    segmented_sentence = []
+    with phase("parse"):
+        return tokenize(sentence)
 
-    i = 0
-    L = len(sentence)
 
-    while i < L:
-        if sentence[i] in OPERATORS:
-            segmented_sentence.append(sentence[i])
-            i += 1
-        elif sentence[i] == " ":
-            i += 1
-        else:
-            literal = ""
-            while i < L and not sentence[i] in OPERATORS and sentence[i] != " ":
-                literal += sentence[i]
-                i += 1
-            segmented_sentence.append(literal)
+def parse_sentence(sentence):
+    """
+    Parses a propositional logic sentence into an abstract syntax tree.
+    
+    Uses precedence climbing, so operator precedence (! > & > | > > > =) and
+    associativity are resolved in a single left-to-right pass over the tokens.
+    
+    Args:
+        sentence (str): A string representing a propositional logic formula
+    
+    Returns:
+        Atom, Not or BinaryOp: Root node of the formula
+    
+    Raises:
+        ValueError: If the sentence is not a well-formed formula
+    
+    Example:
+        >>> parse_sentence("A & B | !C")
+        ((A&B)|!C)
+    """
+    with phase("parse"):
+        tokens = tokenize(sentence)
+        node, i = _parse_binary(tokens, 0, 1)
+    if i != len(tokens):
+        raise ValueError(f"Unexpected token '{tokens[i]}' in sentence: {sentence}")
+    return node
+
+
+def _parse_binary(tokens, i, min_precedence):
+    """
+    Parses a sequence of operands joined by operators binding at least as tightly as min_precedence.
+    
+    Returns:
+        tuple: (node, index of the first token after the parsed formula)
+    """
+    left, i = _parse_unary(tokens, i)
+    while i < len(tokens) and PRECEDENCE.get(tokens[i], 0) >= min_precedence:
+        op = tokens[i]
+        # Left associativity: the right operand may only contain tighter operators
+        right, i = _parse_binary(tokens, i + 1, PRECEDENCE[op] + 1)
+        left = BinaryOp(op, left, right)
+    return left, i
 
-    return segmented_sentence
+
+def _parse_unary(tokens, i):
+    """
+    Parses an atom, a negation or a parenthesized formula.
+    
+    Returns:
+        tuple: (node, index of the first token after the parsed formula)
+    """
+    if i >= len(tokens):
+        raise ValueError("Unexpected end of sentence")
+    token = tokens[i]
+    if token == "!":
+        operand, i = _parse_unary(tokens, i + 1)
+        return Not(operand), i
+    if token == "(":
+        node, i = _parse_binary(tokens, i + 1, 1)
+        if i >= len(tokens) or tokens[i] != ")":
+            raise ValueError("Missing closing parenthesis")
+        return node, i + 1
+    if token in OPERATORS:
+        raise ValueError(f"Unexpected token '{token}'")
+    return Atom(token), i + 1
+
+
+def ast_to_tokens(node):
+    """
+    Converts an abstract syntax tree back to a fully parenthesized token list.
+    
+    Args:
+        node (Atom, Not or BinaryOp): Root node of the formula
+    
+    Returns:
+        list: A list of tokens (operators and literals)
+    """
+    tokens = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            tokens.append(node)
+        elif isinstance(node, Atom):
+            tokens.append(node.name)
+        elif isinstance(node, Not):
+            tokens.append("!")
+            stack.append(node.operand)
+        else:
+            # Pushed in reverse order, so they are emitted as ( left op right )
+            stack += [")", node.right, node.op, node.left, "("]
+    return tokens
 
 
 def forward_slice(sentence, index):
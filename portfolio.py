@@ -0,0 +1,164 @@
+"""
+Portfolio module for propositional logic resolution prover.
+Races several resolver configurations in separate processes and keeps the first definitive answer.
+
+Which resolver is fastest varies widely between inputs, so instead of picking one up
+front, every configuration runs concurrently on the same clauses. As soon as one of them
+answers definitively, the others are terminated. A refutation is always definitive; a
+failure to refute is only definitive for configurations that are complete on the given
+input (the set-of-support strategy is not, when the knowledge base is inconsistent).
+"""
+
+import importlib
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from literals import atom_table, auxiliary_atoms, load_atom_table
+from loading_indicator import LoadingIndicator
+from resolver import get_memory_usage
+
+# (name, resolver module, extra keyword arguments) of the raced configurations
+CONFIGURATIONS = [
+    ("cdcl", "resolver_cdcl", {}),
+    ("given-clause (ratio)", "resolver_given", {"heuristic": "ratio"}),
+    ("given-clause (shortest)", "resolver_given", {"heuristic": "shortest"}),
+    ("new", "resolver_new", {}),
+    ("default", "resolver", {}),
+]
+
+# Configurations that decide satisfiability even under the set-of-support strategy
+COMPLETE_WITH_SUPPORT = {"resolver_cdcl"}
+
+# Seconds between checks that the configurations still running are alive
+POLL_INTERVAL = 0.1
+
+
+def _run_configuration(results, number, module_name, options, names, auxiliary, sentence, support, preprocess,
+                       budget, memory):
+    """Run one configuration in a worker process and put its answer on the results queue"""
+    load_atom_table(names, auxiliary)
+    sys.stdout = open(os.devnull, "w")
+    try:
+        resolve = importlib.import_module(module_name).resolve
+        result, time_taken, peak_memory, stats = resolve(sentence, False, support=support,
+                                                         preprocess=preprocess, budget=budget, memory=memory,
+                                                         **options)
+        results.put((number, result, time_taken, peak_memory, stats, None))
+    except Exception as e:
+        results.put((number, None, 0.0, 0.0, {}, f"{type(e).__name__}: {e}"))
+
+
+def resolve(sentence, mode, support=None, preprocess=False, budget=None, memory=None, configurations=None):
+    """
+    Races resolver configurations on the same input and returns the first definitive answer.
+
+    Args:
+        sentence (list): Clauses of the knowledge base and negated query
+        mode (bool): Whether to print the progress of the race
+        support (list, optional): Negated query, used as set of support by every configuration
+        preprocess (bool): Whether configurations simplify the clauses first
+        budget (Budget, optional): Limits applied to each configuration separately
+        memory (MemoryMonitor, optional): Memory sampling policy of each configuration
+        configurations (list, optional): (name, module, options) triples to race
+                                         (default: CONFIGURATIONS)
+
+    Returns:
+        tuple: (result, time_taken, peak_memory, stats)
+            - result (bool): True if the clauses are unsatisfiable (meaning entailment),
+                             None if no configuration answered within the budget
+            - time_taken (float): Time until the first definitive answer in seconds
+            - peak_memory (float): Peak memory usage of the winning configuration in MB
+            - stats (dict): Statistics of the winning configuration, plus portfolio_winner
+                            and portfolio_runs ((name, status, seconds) per configuration)
+    """
+    configurations = configurations or CONFIGURATIONS
+    start_time = time.time()
+
+    loading = None
+    if not mode:
+        loading = LoadingIndicator("Racing resolver configurations")
+        loading.start()
+
+    results = multiprocessing.Queue()
+    names, auxiliary = atom_table(), auxiliary_atoms()
+    processes = []
+    for number, (name, module_name, options) in enumerate(configurations):
+        process = multiprocessing.Process(
+            target=_run_configuration,
+            args=(results, number, module_name, options, names, auxiliary, list(sentence),
+                  list(support) if support is not None else None, preprocess, budget, memory),
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+        if mode:
+            print(f"Started {name}")
+
+    runs = [None] * len(configurations)
+    winner = None
+    fallback = None
+    pending = len(configurations)
+    while pending and winner is None:
+        try:
+            message = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            # A configuration killed by the system (out of memory, crash) never answers
+            dead = [number for number, process in enumerate(processes)
+                    if runs[number] is None and not process.is_alive()]
+            if not dead:
+                continue
+            try:
+                # The answer may still be in transit when the process has just exited
+                message = results.get(timeout=1)
+            except queue.Empty:
+                elapsed = time.time() - start_time
+                for number in dead:
+                    runs[number] = (configurations[number][0],
+                                    f"failed (exit code {processes[number].exitcode})", elapsed)
+                    pending -= 1
+                    if mode:
+                        print(f"{configurations[number][0]}: {runs[number][1]} after {elapsed:.4f} seconds")
+                continue
+        number, result, time_taken, peak_memory, stats, error = message
+        if runs[number] is not None:
+            continue
+        pending -= 1
+        name, module_name, _ = configurations[number]
+        elapsed = time.time() - start_time
+        if error is not None:
+            runs[number] = (name, f"failed ({error})", elapsed)
+        elif result is not None and (result or support is None or module_name in COMPLETE_WITH_SUPPORT):
+            runs[number] = (name, "won", elapsed)
+            winner = (number, result, peak_memory, stats)
+        else:
+            # Not refuted under set of support, or out of budget: only an answer if
+            # nothing better arrives
+            status = "finished (not definitive)" if result is not None else "out of budget"
+            runs[number] = (name, status, elapsed)
+            if fallback is None or fallback[1] is None:
+                fallback = (number, result, peak_memory, stats)
+        if mode:
+            print(f"{name}: {runs[number][1]} after {elapsed:.4f} seconds")
+
+    time_taken = time.time() - start_time
+    for number, process in enumerate(processes):
+        if runs[number] is None:
+            process.terminate()
+            runs[number] = (configurations[number][0], "terminated", time_taken)
+    for process in processes:
+        process.join()
+
+    if loading:
+        loading.stop()
+
+    chosen = winner or fallback
+    if chosen is None:
+        raise RuntimeError("Every portfolio configuration failed: " +
+                           "; ".join(f"{name}: {status}" for name, status, _ in runs))
+    number, result, peak_memory, stats = chosen
+    stats = dict(stats)
+    stats["portfolio_winner"] = configurations[number][0]
+    stats["portfolio_runs"] = runs
+    return result, time_taken, max(peak_memory, get_memory_usage()), stats
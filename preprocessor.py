@@ -0,0 +1,108 @@
+"""
+Preprocessing module for propositional logic resolution prover.
+Simplifies a clause set before resolution with unit propagation and pure literal elimination.
+
+Both simplifications preserve satisfiability, so the refutation result is unchanged
+while the clause set handed to the quadratic resolution phase gets smaller.
+"""
+
+from clause_index import OccurrenceIndex
+
+EMPTY_CLAUSE = frozenset()
+
+
+def simplify(clause_set, support_set=None, fixed=None):
+    """
+    Performs unit propagation to a fixpoint, then removes clauses containing pure literals.
+
+    Unit propagation assigns the literal of every unit clause: clauses containing it are
+    satisfied and removed, and its negation is removed from the other clauses (which may
+    create new units). A literal is pure if its negation occurs in no clause; clauses
+    containing pure literals can be satisfied independently and are removed.
+
+    Under the set-of-support strategy, a clause shortened by a unit from the support set
+    joins the support set, since it is the resolvent of a support clause.
+
+    Args:
+        clause_set (set): Set of clauses (frozensets of encoded literals)
+        support_set (set, optional): Subset of clause_set forming the set of support
+        fixed (list, optional): Receives the literals made true by unit propagation and
+                                pure literal elimination, whose atoms leave the clause set
+
+    Returns:
+        tuple: (clause_set, support_set, stats)
+            - clause_set (set): Simplified clause set, {frozenset()} if a contradiction was found
+            - support_set (set): Simplified set of support, or None if none was given
+            - stats (dict): Counts of eliminated units, pure literals, clauses and literals
+    """
+    stats = {
+        "preprocess_units_propagated": 0,
+        "preprocess_pure_literals": 0,
+        "preprocess_clauses_removed": 0,
+        "preprocess_literals_removed": 0,
+    }
+    initial_count = len(clause_set)
+    clauses = set(clause_set)
+    supported = set(support_set) if support_set is not None else None
+    index = OccurrenceIndex(clauses)
+
+    def remove(clause):
+        clauses.discard(clause)
+        index.remove(clause)
+        if supported is not None:
+            supported.discard(clause)
+
+    def contradiction():
+        stats["preprocess_clauses_removed"] = initial_count
+        return {EMPTY_CLAUSE}, ({EMPTY_CLAUSE} if supported is not None else None), stats
+
+    if EMPTY_CLAUSE in clauses:
+        return contradiction()
+
+    # Unit propagation
+    units = [clause for clause in clauses if len(clause) == 1]
+    while units:
+        unit = units.pop()
+        if unit not in clauses:
+            continue
+        (literal,) = unit
+        from_support = supported is not None and unit in supported
+        stats["preprocess_units_propagated"] += 1
+        if fixed is not None:
+            fixed.append(literal)
+
+        # Clauses containing the literal (including the unit itself) are satisfied
+        for clause in list(index.occurrences.get(literal, ())):
+            remove(clause)
+
+        # The negated literal is false, so remove it from every clause containing it
+        for clause in list(index.occurrences.get(-literal, ())):
+            reduced = clause - {-literal}
+            was_supported = supported is not None and clause in supported
+            remove(clause)
+            stats["preprocess_literals_removed"] += 1
+
+            if not reduced:
+                return contradiction()
+            if supported is not None and (from_support or was_supported):
+                supported.add(reduced)
+            if reduced not in clauses:
+                clauses.add(reduced)
+                index.add(reduced)
+                if len(reduced) == 1:
+                    units.append(reduced)
+
+    # Pure literal elimination, repeated since removing clauses can make more literals pure
+    while True:
+        pure = [literal for literal in index.occurrences if -literal not in index.occurrences]
+        if not pure:
+            break
+        stats["preprocess_pure_literals"] += len(pure)
+        if fixed is not None:
+            fixed.extend(pure)
+        for literal in pure:
+            for clause in list(index.occurrences.get(literal, ())):
+                remove(clause)
+
+    stats["preprocess_clauses_removed"] = initial_count - len(clauses)
+    return clauses, supported, stats
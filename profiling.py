@@ -0,0 +1,219 @@
+"""
+Profiling module for propositional logic resolution prover.
+Named phase timers and counters for the parser, the CNF converters and the resolvers.
+
+Instrumented code reports to the active profiler, which by default is a NullProfiler
+whose methods do nothing: phase() returns a shared context manager with empty enter
+and exit methods, and timed() returns hot-loop functions unchanged, so that they are
+only wrapped in timing code while profiling.
+enable() installs a PhaseProfiler that accumulates the time and number of calls of each
+phase. Phases nest: a phase entered while another is open is recorded as a part of it,
+under the path 'outer/inner', so the same code is attributed to whichever phase called
+it. Only the calling process is profiled, not worker processes.
+"""
+
+import time
+
+
+class _NullPhase:
+    """Context manager that does nothing"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class Timer:
+    """
+    Accumulated time of one phase.
+
+    Attributes:
+        seconds (float): Time spent in the phase
+        calls (int): Number of measurements
+    """
+    __slots__ = ("seconds", "calls")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+
+
+class NullProfiler:
+    """Profiler that records nothing, active unless profiling is enabled"""
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def timed(self, function, name):
+        return function
+
+    def count(self, name, amount=1):
+        pass
+
+
+class _Phase:
+    """Context manager timing one call of a phase"""
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.timer = None
+        self.start = None
+
+    def __enter__(self):
+        self.timer = self.profiler.timer(self.name)
+        self.profiler.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timer.seconds += time.perf_counter() - self.start
+        self.timer.calls += 1
+        self.profiler.stack.pop()
+        return False
+
+
+class PhaseProfiler:
+    """
+    Accumulated time per phase and named counters.
+
+    Attributes:
+        timers (dict): Phase path ('outer/inner') -> Timer
+        counters (dict): Counter name -> value
+    """
+    enabled = True
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+        self.stack = []
+        self.start_time = time.perf_counter()
+
+    def phase(self, name):
+        """
+        Times a phase with a with statement.
+
+        Args:
+            name (str): Phase name
+
+        Returns:
+            context manager: Adds the time spent in its body to the phase, as a part of
+                             the phases open when it is entered
+        """
+        return _Phase(self, name)
+
+    def timer(self, name):
+        """
+        Returns the timer of a phase that is a part of the phases open now.
+
+        Args:
+            name (str): Phase name
+
+        Returns:
+            Timer: Timer of the phase
+        """
+        path = "/".join(self.stack + [name])
+        timer = self.timers.get(path)
+        if timer is None:
+            timer = self.timers[path] = Timer()
+        return timer
+
+    def timed(self, function, name):
+        """
+        Wraps a function so that every call is timed as a phase, for functions called
+        in hot loops, where entering a phase per call would cost too much.
+
+        Args:
+            function (function): Function to time
+            name (str): Phase name, a part of the phases open now
+
+        Returns:
+            function: Function with the same arguments and result
+        """
+        timer = self.timer(name)
+        clock = time.perf_counter
+
+        def timed_function(*args):
+            start = clock()
+            try:
+                return function(*args)
+            finally:
+                timer.seconds += clock() - start
+                timer.calls += 1
+        return timed_function
+
+    def count(self, name, amount=1):
+        """
+        Increments a counter.
+
+        Args:
+            name (str): Counter name
+            amount (int): Increment
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def elapsed(self):
+        """Seconds since the profiler was enabled"""
+        return time.perf_counter() - self.start_time
+
+    def report(self):
+        """
+        Lists the phases with their parts below them.
+
+        Returns:
+            list: (path, seconds, calls, depth) per phase, where depth is the nesting
+                  level; phases are ordered by time, parts after their phase
+        """
+        def rows(prefix, depth):
+            paths = [path for path, timer in self.timers.items()
+                     if path.startswith(prefix) and path.count("/") == depth and timer.calls]
+            for path in sorted(paths, key=lambda path: -self.timers[path].seconds):
+                timer = self.timers[path]
+                yield path, timer.seconds, timer.calls, depth
+                yield from rows(path + "/", depth + 1)
+        return list(rows("", 0))
+
+
+_profiler = NullProfiler()
+
+
+def enable():
+    """
+    Installs a new PhaseProfiler as the active profiler.
+
+    Returns:
+        PhaseProfiler: The active profiler
+    """
+    global _profiler
+    _profiler = PhaseProfiler()
+    return _profiler
+
+
+def disable():
+    """Restores the NullProfiler"""
+    global _profiler
+    _profiler = NullProfiler()
+
+
+def current():
+    """Returns the active profiler"""
+    return _profiler
+
+
+def phase(name):
+    """Times a phase with the active profiler (see PhaseProfiler.phase)"""
+    return _profiler.phase(name)
+
+
+def timed(function, name):
+    """Times every call of a function with the active profiler (see PhaseProfiler.timed)"""
+    return _profiler.timed(function, name)
+
+
+def count(name, amount=1):
+    """Increments a counter of the active profiler (see PhaseProfiler.count)"""
+    _profiler.count(name, amount)
@@ -0,0 +1,350 @@
+"""
+Proof module for propositional logic resolution prover.
+Records how resolvents were derived and writes resolution traces.
+
+Printing every resolution step as it happens makes verbose runs I/O-bound. Instead,
+resolvers hand each step to a TraceWriter, which only stores references to the clauses
+and formats them a buffer at a time, to the terminal or to a file. Independently of
+tracing, a Derivation numbers the clauses and keeps the parent ids of each derived one
+in int arrays, from which the refutation, the clauses the empty clause actually depends
+on, is extracted as a Proof once the search is over. A Proof can check itself and be
+written in the TraceCheck or DRAT format, so that a refutation can be verified without
+rerunning the search, by the built-in checker or by independent tools.
+"""
+
+from array import array
+from colorama import Fore, Style
+from literals import atom_id
+from resolver import format_clause, format_eliminated
+from profiling import phase
+
+# Number of resolution steps buffered before a trace is written out
+TRACE_BUFFER_SIZE = 512
+
+EMPTY_CLAUSE = frozenset()
+
+
+class Derivation:
+    """
+    Parent pointers of derived clauses, recorded during the search.
+
+    Every clause seen is numbered in order of first occurrence, and the parents of clause
+    id i are first[i] and second[i] (0 for the clauses the search started from), stored
+    in int arrays rather than as a tuple per clause.
+
+    Attributes:
+        ids (dict): Clause -> id
+        clauses (list): Clause of each id (index 0 is unused)
+        first (array): Id of the parent containing the eliminated literal, per id
+        second (array): Id of the parent containing its negation, per id
+    """
+    def __init__(self):
+        self.ids = {}
+        self.clauses = [None]
+        self.first = array("i", [0])
+        self.second = array("i", [0])
+
+    def _append(self, clause, first, second):
+        clause_id = self.ids[clause] = len(self.clauses)
+        self.clauses.append(clause)
+        self.first.append(first)
+        self.second.append(second)
+        return clause_id
+
+    def add(self, resolvent, parent1, parent2):
+        """
+        Records a resolution step; only the first derivation of a clause is kept.
+
+        Args:
+            resolvent (frozenset): Derived clause
+            parent1 (frozenset): Parent containing the eliminated literal
+            parent2 (frozenset): Parent containing its negation
+        """
+        if resolvent in self.ids:
+            return
+        ids = self.ids
+        first = ids.get(parent1) or self._append(parent1, 0, 0)
+        second = ids.get(parent2) or self._append(parent2, 0, 0)
+        self._append(resolvent, first, second)
+
+    def refutation(self, clause=EMPTY_CLAUSE):
+        """
+        Extracts the steps the given clause depends on.
+
+        Args:
+            clause (frozenset): Derived clause (default: the empty clause)
+
+        Returns:
+            Proof: Steps of the derivation of the clause, renumbered from 1
+        """
+        proof = Proof()
+        root = self.ids.get(clause)
+        if root is None:
+            # Present from the start, for instance derived by preprocessing
+            proof.append(clause, 0, 0)
+            return proof
+        # Step number of each id in the proof, 0 while not yet added
+        position = array("i", bytes(4 * len(self.clauses)))
+        # Iterative post-order walk, since refutations can be far deeper than the
+        # recursion limit; a negative id marks a clause whose parents are done
+        stack = [root]
+        while stack:
+            clause_id = stack.pop()
+            if clause_id < 0:
+                clause_id = -clause_id
+                if not position[clause_id]:
+                    position[clause_id] = proof.append(self.clauses[clause_id], position[self.first[clause_id]],
+                                                       position[self.second[clause_id]])
+            elif not position[clause_id]:
+                if self.first[clause_id]:
+                    stack.extend((-clause_id, self.second[clause_id], self.first[clause_id]))
+                else:
+                    position[clause_id] = proof.append(self.clauses[clause_id], 0, 0)
+        return proof
+
+
+class Proof:
+    """
+    Resolution refutation whose steps are numbered 1..n, every clause after its parents.
+
+    Step i is an input clause when first[i] is 0, and otherwise the resolvent of steps
+    first[i] and second[i] on the only literal of the first whose negation is in the second.
+
+    Attributes:
+        clauses (list): Clause of each step (index 0 is unused)
+        first (array): First parent of each step, 0 for input clauses
+        second (array): Second parent of each step, 0 for input clauses
+    """
+    def __init__(self):
+        self.clauses = [None]
+        self.first = array("i", [0])
+        self.second = array("i", [0])
+
+    def __len__(self):
+        return len(self.clauses) - 1
+
+    def append(self, clause, first, second):
+        """
+        Adds a step.
+
+        Args:
+            clause (frozenset): Clause of the step
+            first (int): First parent step, 0 for an input clause
+            second (int): Second parent step, 0 for an input clause
+
+        Returns:
+            int: Number of the step
+        """
+        self.clauses.append(clause)
+        self.first.append(first)
+        self.second.append(second)
+        return len(self.clauses) - 1
+
+    def inputs(self):
+        """Returns the input clauses of the proof, in step order"""
+        return [self.clauses[step] for step in range(1, len(self.clauses)) if not self.first[step]]
+
+    def pivot(self, step):
+        """
+        Returns the literal eliminated by a resolution step.
+
+        Args:
+            step (int): Number of a resolution step
+
+        Returns:
+            int: Literal of the first parent whose negation is in the second, None if there is none
+        """
+        second = self.clauses[self.second[step]]
+        for literal in self.clauses[self.first[step]]:
+            if -literal in second:
+                return literal
+        return None
+
+    def check(self, formula=None):
+        """
+        Checks that every step is a resolvent of its parents and that the last step is
+        the empty clause, in one pass over the steps.
+
+        Args:
+            formula (set, optional): Clauses every input clause must belong to
+
+        Raises:
+            ValueError: Describing the first invalid step
+        """
+        if len(self) == 0 or self.clauses[-1]:
+            raise ValueError("The proof does not end with the empty clause")
+        for step in range(1, len(self.clauses)):
+            clause, first, second = self.clauses[step], self.first[step], self.second[step]
+            if not first:
+                if formula is not None and clause not in formula:
+                    raise ValueError(f"Input clause {step} is not a clause of the formula")
+                continue
+            if not (0 < first < step and 0 < second < step):
+                raise ValueError(f"Step {step} does not refer to two earlier steps")
+            parent1, parent2 = self.clauses[first], self.clauses[second]
+            clashes = [literal for literal in parent1 if -literal in parent2]
+            if len(clashes) != 1:
+                raise ValueError(f"Steps {first} and {second} clash on {len(clashes)} literals, not 1 (step {step})")
+            literal = clashes[0]
+            if clause != (parent1 - {literal}) | (parent2 - {-literal}):
+                raise ValueError(f"Step {step} is not the resolvent of steps {first} and {second}")
+
+    def write_tracecheck(self, file, variables):
+        """
+        Writes the proof as a TraceCheck resolution trace, one '<step> <literals> 0
+        <parent steps> 0' line per step, with no parents for input clauses.
+
+        Args:
+            file (file): Text file object to write to
+            variables (dict): Atom id -> DIMACS variable, shared with the formula file
+        """
+        for step in range(1, len(self.clauses)):
+            literals = _dimacs_literals(self.clauses[step], variables)
+            parents = f" {self.first[step]} {self.second[step]}" if self.first[step] else ""
+            file.write(f"{step}{literals} 0{parents} 0\n")
+
+    def write_drat(self, file, variables):
+        """
+        Writes the derived clauses as a DRAT proof (without deletions), one '<literals> 0'
+        line per clause, ending with the empty clause. DRAT checkers read it together with
+        the formula, of which every derived clause is a reverse unit propagation consequence.
+
+        Args:
+            file (file): Text file object to write to
+            variables (dict): Atom id -> DIMACS variable, shared with the formula file
+        """
+        for step in range(1, len(self.clauses)):
+            if self.first[step]:
+                file.write((_dimacs_literals(self.clauses[step], variables) + " 0").lstrip() + "\n")
+
+
+def _dimacs_literals(clause, variables):
+    """Format a clause as space-prefixed DIMACS literals"""
+    numbers = sorted((variables[literal] if literal > 0 else -variables[-literal] for literal in clause), key=abs)
+    return "".join(f" {number}" for number in numbers)
+
+
+def read_tracecheck(filename):
+    """
+    Reads a TraceCheck resolution trace as written by Proof.write_tracecheck().
+
+    Variable n is read as the atom named 'n', as by read_dimacs(filename, named=False).
+    Steps may be numbered arbitrarily, but must follow their parents, and every derived
+    clause must have exactly two parents.
+
+    Args:
+        filename (str): Path to the trace
+
+    Returns:
+        Proof: Steps of the trace
+
+    Raises:
+        ValueError: If the file is malformed
+    """
+    proof = Proof()
+    steps = {}
+    with open(filename, "r") as file:
+        for number, line in enumerate(file, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            try:
+                values = [int(field) for field in fields]
+            except ValueError:
+                raise ValueError(f"Invalid number on line {number} of {filename}") from None
+            if len(values) < 3 or values[-1] != 0 or 0 not in values[1:-1]:
+                raise ValueError(f"Invalid step on line {number} of {filename}")
+            separator = values.index(0, 1)
+            literals, parents = values[1:separator], values[separator + 1:-1]
+            if values[0] in steps:
+                raise ValueError(f"Step {values[0]} is defined twice (line {number} of {filename})")
+            if len(parents) not in (0, 2):
+                raise ValueError(f"Step {values[0]} does not have two parents (line {number} of {filename})")
+            try:
+                first, second = (steps[parent] for parent in parents) if parents else (0, 0)
+            except KeyError:
+                raise ValueError(f"Step {values[0]} refers to a step not defined before it "
+                                 f"(line {number} of {filename})") from None
+            clause = frozenset(atom_id(str(value)) if value > 0 else -atom_id(str(-value)) for value in literals)
+            steps[values[0]] = proof.append(clause, first, second)
+    return proof
+
+
+class TraceWriter:
+    """
+    Buffered writer of resolution steps.
+
+    Attributes:
+        steps (int): Number of steps written so far
+    """
+    def __init__(self, stream, color=False, buffer_size=TRACE_BUFFER_SIZE):
+        """
+        Args:
+            stream (file): Text stream the trace is written to
+            color (bool): Whether to color the trace with ANSI codes (for terminals)
+            buffer_size (int): Number of steps buffered before they are written
+        """
+        self.stream = stream
+        self.color = color
+        self.buffer_size = max(1, buffer_size)
+        self.buffer = []
+        self.steps = 0
+
+    def _paint(self, color, text):
+        return f"{color}{text}{Style.RESET_ALL}" if self.color else text
+
+    def header(self, clauses):
+        """
+        Writes the initial clauses, which open the trace.
+
+        Args:
+            clauses (iterable): Clauses of the knowledge base and negated query
+        """
+        formatted = ", ".join(self._paint(Fore.MAGENTA, format_clause(clause)) for clause in clauses)
+        self.stream.write(f"{self._paint(Fore.CYAN, 'KB ∪ ¬Q:')}\n  {{{formatted}}}\n\n"
+                          f"{self._paint(Fore.CYAN, 'Resolution steps:')}\n")
+
+    def step(self, parent1, parent2, resolvent, eliminated, subsumed=None):
+        """
+        Buffers one resolution step, writing the buffer out when it is full.
+
+        Args:
+            parent1 (frozenset): First parent
+            parent2 (frozenset): Second parent
+            resolvent (frozenset): Derived clause
+            eliminated (tuple): Pair of complementary literals eliminated
+            subsumed (iterable, optional): Clauses subsumed by the resolvent
+        """
+        self.buffer.append((parent1, parent2, resolvent, eliminated, subsumed))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def message(self, text, color=Fore.GREEN):
+        """
+        Writes a line after the buffered steps.
+
+        Args:
+            text (str): Line to write
+            color (str): Color of the line
+        """
+        self.flush()
+        self.stream.write(self._paint(color, text) + "\n")
+        self.stream.flush()
+
+    def flush(self):
+        """Formats and writes the buffered steps"""
+        with phase("verbose output"):
+            lines = []
+            for parent1, parent2, resolvent, eliminated, subsumed in self.buffer:
+                self.steps += 1
+                lines.append(f"  {self._paint(Fore.YELLOW, f'Step {self.steps}:')} Resolving "
+                             f"{self._paint(Fore.MAGENTA, format_clause(parent1))} and "
+                             f"{self._paint(Fore.MAGENTA, format_clause(parent2))}\n"
+                             f"    {self._paint(Fore.BLUE, 'Derived:')} {self._paint(Fore.GREEN, format_clause(resolvent))}\n"
+                             f"    {self._paint(Fore.RED, f'(Eliminated: {format_eliminated(eliminated)})')}\n")
+                if subsumed:
+                    clauses = ", ".join(format_clause(clause) for clause in subsumed)
+                    lines.append(f"    {self._paint(Fore.CYAN, f'(Clauses subsumed: {clauses})')}\n")
+            self.buffer.clear()
+            self.stream.write("".join(lines))
+            self.stream.flush()
@@ -4,43 +4,56 @@ Implements resolution refutation procedure for propositional logic formulas.
 """
 
 import colorama
-from colorama import Fore, Style
-from parser import forward_slice
+from literals import atom_id, decode_literal
 from loading_indicator import LoadingIndicator
+from clause_index import OccurrenceIndex
+from preprocessor import simplify
+from parallel_resolution import ResolventPool, record_parallel_stats
+from memory_monitor import MemoryMonitor
+import profiling
+from profiling import phase
 import time
 import psutil
 import os
+import sys
 
 colorama.init(autoreset=True)
 
+# psutil handle of this process, created by get_memory_usage() on first use
+_process = None
+
 def clause_to_frozenset(sentence):
     """
-    Creates a frozenset from list of operators and literals in a clause.
+    Creates a frozenset of encoded literals from list of operators and literals in a clause.
     
     Args:
         sentence (list): Propositional formula in CNF
     
     Returns:
-        frozenset: immutable set of literals in the clause
+        frozenset: immutable set of integer-encoded literals in the clause, or None if
+                   the clause is a tautology (contains a literal and its negation)
     
     Note:
         The sentence should be in CNF and of the form ['(', 'A', '|', 'B', '|',...,'|', 'Z', ')']
-        where literals like A, B, ..., Z can be negated.
+        where literals like A, B, ..., Z can be negated. Literals are encoded with
+        literals.encode_literal, so !A is represented as the negation of A's id.
 
     Example:
-        ['(', 'A', '|', '!B', ')'] -> frozenset({'A', '!B'})
+        ['(', 'A', '|', '!', 'B', ')'] -> frozenset({1, -2}) (with A=1 and B=2)
     """
     m = set()
-    j = 1 if sentence[0] == "(" else 0
-    L = len(sentence) - 1 if sentence[0] == "(" else len(sentence)
-    while j < L:
-        literal, j = forward_slice(sentence, j)
-        if literal[0] == "!":
-            m.add("!" + str(literal[1]))
-        else:
-            m.add(str(literal[0]))
-        # [NOTE] 'j' is incremented by 2 to escape '|' and reach next literal.
-        j += 2
+    negated = False
+    for token in sentence:
+        if token == "!":
+            negated = not negated
+        elif token not in ("(", ")", "|"):
+            literal = atom_id(token)
+            m.add(-literal if negated else literal)
+            negated = False
+    # A clause containing both A and !A is always true and can be discarded
+    for literal in m:
+        if -literal in m:
+            return None
     return frozenset(m)
 
 
@@ -54,35 +67,103 @@ def format_clause(clause):
     Returns:
         str: Formatted string representation of the clause
     """
-    return "[" + ", ".join(sorted(clause)) + "]"
+    return "[" + ", ".join(sorted(decode_literal(literal) for literal in clause)) + "]"
+
+
+def format_eliminated(eliminated):
+    """
+    Formats the pair of complementary literals eliminated by a resolution step.
+    
+    Args:
+        eliminated (tuple): Pair of encoded literals (literal, negated literal)
+    
+    Returns:
+        str: Formatted string such as 'Girl/!Girl'
+    """
+    return f"{decode_literal(eliminated[0])}/{decode_literal(eliminated[1])}"
 
 
-def resolve_clause_pair(clause1, clause2):
+def resolve_clause_pair(clause1, clause2, stats=None):
     """
     Resolves two clauses and returns a set of resulting resolvents along with the eliminated literals.
     
+    If the clauses clash on two or more literals, resolving on any of them leaves the other
+    complementary pair in the resolvent, which is therefore a tautology. Such pairs are
+    short-circuited and produce no resolvent. Since input clauses are tautology-free, a
+    single clash always yields a non-tautological resolvent.
+    
     Args:
         clause1 (frozenset): First clause
         clause2 (frozenset): Second clause
+        stats (dict, optional): Statistics to count discarded tautologies in
     
     Returns:
-        list: List of tuples (resolvent_clause, eliminated_pair) where eliminated_pair is a string
-              representing the complementary literals that were eliminated
+        list: List of tuples (resolvent_clause, eliminated_pair) where eliminated_pair is a tuple
+              of the complementary encoded literals that were eliminated
     """
-    resolvents = []
+    clash = None
 
     for literal in clause1:
-        # Compute the negation of the literal
-        neg_literal = literal[1:] if literal.startswith("!") else "!" + literal
-        
-        if neg_literal in clause2:
-            # Create new clause by removing the complementary literals and combining the rest
-            new_clause = frozenset(clause1.difference({literal}).union(clause2.difference({neg_literal})))
-            # Track which complementary literals were eliminated
-            eliminated_pair = f"{literal}/{neg_literal}"
-            resolvents.append((new_clause, eliminated_pair))
+        # Negation of an encoded literal is a sign flip
+        if -literal in clause2:
+            if clash is not None:
+                if stats is not None:
+                    stats["tautologies_discarded"] = stats.get("tautologies_discarded", 0) + 1
+                return []
+            clash = literal
+
+    if clash is None:
+        return []
+
+    # Create new clause by removing the complementary literals and combining the rest
+    new_clause = (clause1 - {clash}) | (clause2 - {-clash})
+    return [(new_clause, (clash, -clash))]
+
+
+def sentence_to_clause_set(sentence, stats=None):
+    """
+    Splits a CNF sentence around '&' and converts each clause to frozenset form.
+    
+    The sentence may also already be a list of clauses (frozensets of encoded literals,
+    as produced by cnf_converter.formula_to_clauses), which are used as they are.
+    Tautological clauses are discarded.
+    
+    Args:
+        sentence (list): Propositional formula in CNF, as a token list or a list of clauses
+        stats (dict, optional): Statistics to count discarded tautologies in
+    
+    Returns:
+        set: Set of frozensets, where each frozenset represents a clause
+    """
+    with phase("clause conversion"):
+        if sentence and isinstance(sentence[0], frozenset):
+            return set(sentence)
+
+        clause_set = set()
+        clause = []
+        tautologies = 0
+        for literal in sentence:
+            if literal == "&":
+                converted = clause_to_frozenset(clause)
+                if converted is None:
+                    tautologies += 1
+                else:
+                    clause_set.add(converted)
+                clause.clear()
+            else:
+                clause.append(literal)
+
+        # Add the last clause (an empty sentence has no clauses at all)
+        if clause:
+            converted = clause_to_frozenset(clause)
+            if converted is None:
+                tautologies += 1
+            else:
+                clause_set.add(converted)
 
-    return resolvents
+        if stats is not None:
+            stats["tautologies_discarded"] = stats.get("tautologies_discarded", 0) + tautologies
+        return clause_set
 
 
 def get_memory_usage():
@@ -92,35 +173,59 @@ def get_memory_usage():
     Returns:
         float: Memory usage in MB
     """
-    process = psutil.Process(os.getpid())
-    memory_info = process.memory_info()
+    global _process
+    # The process handle is created once, since creating it is not cheap
+    if _process is None or _process.pid != os.getpid():
+        _process = psutil.Process()
+    memory_info = _process.memory_info()
     # Convert to MB
     return memory_info.rss / (1024 * 1024)
 
 
-def resolve(sentence, mode):
+def resolve(sentence, mode, support=None, preprocess=False, parallel=1, budget=None, memory=None, trace=None,
+            proof=None):
     """
     Resolves the given sentence using the resolution principle.
     
     Args:
-        sentence (list): Propositional formula in CNF
+        sentence (list): Propositional formula in CNF (token list or list of clauses)
         mode (bool): Whether to print resolution steps
+        support (list, optional): Negated query in CNF. When given, the set-of-support
+                                  strategy is used: every resolution step needs a parent
+                                  that is a support clause or was derived from one
+        preprocess (bool): Whether to simplify the clauses with unit propagation and pure
+                           literal elimination before resolution
+        parallel (int): Number of worker processes generating the resolvents of each round
+                        (1 generates them in this process)
+        budget (Budget, optional): Time, clause-count and memory limits of the search
+        memory (MemoryMonitor, optional): Memory sampling policy (default: resident
+                                          memory every DEFAULT_INTERVAL clauses)
+        trace (TraceWriter, optional): Writer of the resolution steps (default: the
+                                       terminal in verbose mode, none otherwise)
+        proof (Derivation, optional): Records the parents of every kept resolvent, from
+                                      which the refutation can be reconstructed
     
     Returns:
         tuple: (result, time_taken, peak_memory, stats)
-            - result (bool): True if the KB entails the query, False otherwise
+            - result (bool): True if the KB entails the query, False otherwise, None if
+                             the budget was exceeded first (stats['budget_exceeded'] says why)
             - time_taken (float): Time taken for resolution in seconds
             - peak_memory (float): Peak memory usage during resolution in MB
             - stats (dict): Additional statistics about the resolution process
     """
     start_time = time.time()
-    initial_memory = get_memory_usage()
-    peak_memory = initial_memory
-    
-    # Memory check frequency control - check every N iterations
-    memory_check_frequency = 1000
-    iteration_counter = 0
+    if memory is None:
+        memory = MemoryMonitor()
+    memory.start()
+    if budget is not None:
+        budget.start()
+    # Unchanged unless profiling
+    resolve_pair = profiling.timed(resolve_clause_pair, "resolvent generation")
     
+    if mode and trace is None:
+        from proof import TraceWriter
+        trace = TraceWriter(sys.stdout, color=True)
+
     # Initialize loading indicator if not in verbose mode
     loading = None
     if not mode:
@@ -130,100 +235,162 @@ def resolve(sentence, mode):
     # Statistics tracking
     stats = {
         "clauses_generated": 0,
-        "clause_pairs_examined": 0
+        "clause_pairs_examined": 0,
+        "tautologies_discarded": 0
     }
     
-    # Convert to clause format
-    clause = []
     # clause_set is a set of frozensets, where each frozenset represent a clause
-    clause_set = set()
+    clause_set = sentence_to_clause_set(sentence, stats)
 
-    # Process the sentence into clauses in frozenset form
-    for literal in sentence:
-        if literal == "&":
-            clause_set.add(clause_to_frozenset(clause))
-            clause.clear()
-        else:
-            clause.append(literal)
+    # Clauses in the set of support (None when the strategy is not used)
+    supported = None
+    if support is not None:
+        supported = sentence_to_clause_set(support, stats)
+        clause_set |= supported
+        stats["support_clauses"] = len(supported)
 
-    # Add the last clause
-    clause_set.add(clause_to_frozenset(clause))
+    stats["initial_clauses"] = len(clause_set)
+    if preprocess:
+        with phase("preprocessing"):
+            clause_set, supported, preprocess_stats = simplify(clause_set, supported)
+        stats.update(preprocess_stats)
 
-    if mode:
-        print(f"{Fore.CYAN}KB ∪ ¬Q:{Style.RESET_ALL}")
-        formatted_clauses = [f"{Fore.MAGENTA}[{', '.join(clause)}]{Style.RESET_ALL}" for clause in clause_set]
-        print(f"  {{{', '.join(formatted_clauses)}}}")
-        print(f"\n{Fore.CYAN}Resolution steps:{Style.RESET_ALL}")
+    if trace is not None:
+        trace.header(clause_set)
 
-    stats["initial_clauses"] = len(clause_set)
-    step_counter = 0
     prev_length = 0
 
+    # Preprocessing may already have derived the empty clause
+    if frozenset() in clause_set:
+        if trace is not None:
+            trace.message("Empty clause found during preprocessing! Contradiction achieved.")
+        time_taken = time.time() - start_time
+        if loading:
+            loading.stop()
+        stats["final_clause_count"] = len(clause_set)
+        return True, time_taken, memory.stop(len(clause_set), stats), stats
+
+    # Occurrence index so that each clause is only paired with clauses it clashes with
+    index = OccurrenceIndex(clause_set)
+    
+    # Worker processes mirroring the clause set, when resolvents are generated in parallel
+    pool = None
+    if parallel > 1:
+        pool = ResolventPool(parallel, set_of_support=supported is not None)
+        for clause in clause_set:
+            pool.add(clause, supported is not None and clause in supported)
+
     while prev_length != len(clause_set):
         prev_length = len(clause_set)
         new_resolvents = set()
+        profiling.count("saturation rounds")
         
-        # Check memory usage only at the start of each main iteration
-        if iteration_counter % memory_check_frequency == 0:
-            current_memory = get_memory_usage()
-            peak_memory = max(peak_memory, current_memory)
-        
-        iteration_counter += 1
-        
-        clause_list = list(clause_set)
+        if pool is not None:
+            with phase("parallel rounds"):
+                resolvents, _, found_empty = pool.run_round(deadline=budget.deadline if budget is not None else None)
+            new_resolvents = set(resolvents)
+            if trace is not None or proof is not None:
+                for resolvent, (c1, c2, eliminated) in resolvents.items():
+                    if proof is not None:
+                        proof.add(resolvent, c1, c2)
+                    if trace is not None:
+                        trace.step(c1, c2, resolvent, eliminated)
+            if found_empty:
+                if trace is not None:
+                    trace.message("Empty clause found! Contradiction achieved.")
+                time_taken = time.time() - start_time
+                if loading:
+                    loading.stop()
+                pool.close()
+                record_parallel_stats(stats, pool)
+                stats["final_clause_count"] = len(clause_set) + len(new_resolvents)
+                peak_memory = memory.stop(stats["final_clause_count"], stats)
+                return True, time_taken, peak_memory, stats
+            clause_list = []
+        else:
+            clause_list = list(clause_set)
+        position = {clause: i for i, clause in enumerate(clause_list)}
         for i in range(len(clause_list)):
-            for j in range(i+1, len(clause_list)):
-                c1, c2 = clause_list[i], clause_list[j]
+            c1 = clause_list[i]
+            # Only visit each clashing pair once, as (earlier clause, later clause)
+            for c2 in index.clashing(c1):
+                if position[c2] <= i:
+                    continue
+                # Set of support: never resolve two clauses outside the support
+                if supported is not None and c1 not in supported and c2 not in supported:
+                    continue
+                if budget is not None and budget.tick(len(clause_set) + len(new_resolvents)):
+                    break
                 stats["clause_pairs_examined"] += 1
-                resolvent_pairs = resolve_clause_pair(c1, c2)
+                resolvent_pairs = resolve_pair(c1, c2, stats)
                 
                 # Process each resolvent
                 for resolvent, eliminated in resolvent_pairs:
                     stats['clauses_generated'] += 1
                     if resolvent not in clause_set:
-                        if mode:
-                            step_counter += 1
-                            print(f"  {Fore.YELLOW}Step {step_counter}:{Style.RESET_ALL} Resolving {Fore.MAGENTA}{format_clause(c1)}{Style.RESET_ALL} and {Fore.MAGENTA}{format_clause(c2)}{Style.RESET_ALL}")
-                            print(f"    {Fore.BLUE}Derived:{Style.RESET_ALL} {Fore.GREEN}{format_clause(resolvent)}{Style.RESET_ALL}")
-                            print(f"    {Fore.RED}(Eliminated: {eliminated}){Style.RESET_ALL}")
+                        if proof is not None:
+                            proof.add(resolvent, c1, c2)
+                        if trace is not None:
+                            trace.step(c1, c2, resolvent, eliminated)
                         
                         new_resolvents.add(resolvent)
+                        memory.sample(len(clause_set) + len(new_resolvents))
                         
                         # Check for empty clause immediately
                         if len(resolvent) == 0:
-                            if mode:
-                                print(f"{Fore.GREEN}Empty clause found! Contradiction achieved.{Style.RESET_ALL}")
+                            if trace is not None:
+                                trace.message("Empty clause found! Contradiction achieved.")
                             
                             end_time = time.time()
                             time_taken = end_time - start_time
                             
-                            # Final memory check
-                            current_memory = get_memory_usage()
-                            peak_memory = max(peak_memory, current_memory)
-                            
                             # Stop loading indicator if it's running
                             if loading:
                                 loading.stop()
+                            if pool is not None:
+                                pool.close()
+                                record_parallel_stats(stats, pool)
                             
                             stats["final_clause_count"] = len(clause_set) + len(new_resolvents)
+                            peak_memory = memory.stop(stats["final_clause_count"], stats)
                             
                             return True, time_taken, peak_memory, stats
+            if budget is not None and budget.reason is not None:
+                break
+        
+        # Stop with an unknown result once the budget is exhausted
+        if budget is not None and budget.check(len(clause_set) + len(new_resolvents)):
+            break
         
         # Add new resolvents to clause set
-        clause_set.update(new_resolvents)
+        for resolvent in new_resolvents:
+            if resolvent not in clause_set:
+                clause_set.add(resolvent)
+                index.add(resolvent)
+                if supported is not None:
+                    supported.add(resolvent)
+                if pool is not None:
+                    pool.add(resolvent, supported is not None)
     
     # If we get here without finding an empty clause, the KB doesn't entail the query
+    # (unless the budget ran out first)
+    result = False
+    if budget is not None and budget.reason is not None:
+        result = None
+        stats["budget_exceeded"] = budget.reason
     end_time = time.time()
     time_taken = end_time - start_time
     
-    # Final memory check
-    current_memory = get_memory_usage()
-    peak_memory = max(peak_memory, current_memory)
-    
     # Stop loading indicator if it's running
     if loading:
         loading.stop()
+    if trace is not None:
+        trace.flush()
+    if pool is not None:
+        pool.close()
+        record_parallel_stats(stats, pool)
     
     stats["final_clause_count"] = len(clause_set)
+    peak_memory = memory.stop(len(clause_set), stats)
     
-    return False, time_taken, peak_memory, stats
\ No newline at end of file
+    return result, time_taken, peak_memory, stats
\ No newline at end of file
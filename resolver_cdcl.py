@@ -0,0 +1,487 @@
+"""
+CDCL satisfiability module for propositional logic resolution prover.
+
+This module decides the clause set with a conflict-driven clause learning (CDCL) solver
+instead of saturating it by resolution. Every learned clause is a resolvent of existing
+clauses, so deriving a conflict at decision level 0 is a resolution refutation; when the
+clauses are satisfiable a model is found without enumerating the full clause space.
+
+The solver uses the usual performance-oriented structures, kept as flat Python lists:
+    - literals encoded as 2 * variable + sign, so negation is `literal ^ 1`
+    - two watched literals per clause for unit propagation
+    - VSIDS branching with a lazily updated activity heap and phase saving
+    - first-UIP conflict analysis with local learned clause minimization
+    - Luby restarts and LBD-based learned clause database reduction
+"""
+
+import heapq
+import time
+from colorama import Fore, Style
+from loading_indicator import LoadingIndicator
+from literals import atom_name, is_auxiliary
+from preprocessor import simplify
+from resolver import sentence_to_clause_set, format_clause
+from memory_monitor import MemoryMonitor
+
+# Conflicts per unit of the Luby restart sequence
+RESTART_BASE = 100
+# VSIDS activity decay factor, applied after each conflict
+VAR_DECAY = 0.95
+# Number of learned clauses kept before the first database reduction
+LEARNED_LIMIT = 2000
+
+
+def luby(i):
+    """
+    Returns the i-th element (starting at 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ...
+
+    Args:
+        i (int): Index in the sequence
+
+    Returns:
+        int: Element of the sequence
+    """
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        power -= 1
+        i %= size
+    return 1 << power
+
+
+class CDCLSolver:
+    """
+    Conflict-driven clause learning SAT solver over integer-encoded clauses.
+
+    Variables are numbered 0..n-1 internally; the atom ids of the input clauses are
+    mapped to them on construction. Clauses are lists of literal codes whose first two
+    positions are the watched literals; the implied literal of a reason clause is at
+    position 0.
+    """
+    def __init__(self, clauses, mode=False):
+        self.mode = mode
+        self.atoms = sorted({abs(literal) for clause in clauses for literal in clause})
+        variable_of = {atom: v for v, atom in enumerate(self.atoms)}
+        n = len(self.atoms)
+
+        self.value = [None] * (2 * n)      # per literal: True, False or None (unassigned)
+        self.level = [0] * n
+        self.reason = [None] * n           # index of the clause that implied the variable
+        self.polarity = [1] * n            # saved phase: 1 assigns the negative literal
+        self.activity = [0.0] * n
+        self.var_inc = 1.0
+        self.heap = [(0.0, v) for v in range(n)]
+        self.watches = [[] for _ in range(2 * n)]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+
+        self.clauses = []
+        self.learned = []                  # indices of learned clauses
+        self.lbd = {}                      # learned clause index -> literal block distance
+        self.unsat = False
+        self.stats = {
+            "decisions": 0,
+            "propagations": 0,
+            "conflicts": 0,
+            "learned_clauses": 0,
+            "restarts": 0,
+            "resolution_steps": 0,
+            "deleted_clauses": 0,
+        }
+
+        for clause in clauses:
+            encoded = [2 * variable_of[abs(literal)] + (literal < 0) for literal in clause]
+            self.add_clause(encoded)
+
+    def add_clause(self, clause, learned=False):
+        """
+        Add a clause (list of literal codes) and watch its first two literals.
+
+        Unit clauses are enqueued directly; an empty or conflicting unit clause at level 0
+        makes the formula unsatisfiable.
+
+        Returns:
+            int: Index of the clause, or None for unit and empty clauses
+        """
+        if not clause:
+            self.unsat = True
+            return None
+        if len(clause) == 1:
+            literal = clause[0]
+            if self.value[literal] is False:
+                self.unsat = True
+            elif self.value[literal] is None:
+                self.enqueue(literal, None)
+            return None
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        if learned:
+            self.learned.append(index)
+        return index
+
+    def enqueue(self, literal, reason):
+        """Assign a literal to true at the current decision level"""
+        v = literal >> 1
+        self.value[literal] = True
+        self.value[literal ^ 1] = False
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Unit propagation with two watched literals.
+
+        Returns:
+            int: Index of a conflicting clause, or None if no conflict occurred
+        """
+        value = self.value
+        clauses = self.clauses
+        watches = self.watches
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_literal = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.stats["propagations"] += 1
+            watch_list = watches[false_literal]
+            i = j = 0
+            end = len(watch_list)
+            while i < end:
+                index = watch_list[i]
+                i += 1
+                clause = clauses[index]
+                if clause is None:
+                    # Deleted learned clause, drop it from the watch list
+                    continue
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                if value[first] is True:
+                    watch_list[j] = index
+                    j += 1
+                    continue
+                # Look for a new literal to watch instead of the false one
+                for k in range(2, len(clause)):
+                    if value[clause[k]] is not False:
+                        clause[1], clause[k] = clause[k], false_literal
+                        watches[clause[1]].append(index)
+                        break
+                else:
+                    watch_list[j] = index
+                    j += 1
+                    if value[first] is False:
+                        # Conflict: keep the remaining watches and stop
+                        while i < end:
+                            watch_list[j] = watch_list[i]
+                            i += 1
+                            j += 1
+                        del watch_list[j:]
+                        self.qhead = len(trail)
+                        return index
+                    self.enqueue(first, index)
+            del watch_list[j:]
+        return None
+
+    def bump(self, v):
+        """Increase the VSIDS activity of a variable"""
+        activity = self.activity[v] + self.var_inc
+        self.activity[v] = activity
+        if activity > 1e100:
+            # Rescale every activity to avoid float overflow, and rebuild the heap
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-a, u) for u, a in enumerate(self.activity) if self.value[2 * u] is None]
+            heapq.heapify(self.heap)
+        elif self.value[2 * v] is None:
+            heapq.heappush(self.heap, (-activity, v))
+
+    def analyze(self, conflict):
+        """
+        First-UIP conflict analysis.
+
+        Args:
+            conflict (int): Index of the conflicting clause
+
+        Returns:
+            tuple: (learned clause, backtrack level); the asserting literal is at position 0
+        """
+        seen = set()
+        learned = [None]
+        current_level = len(self.trail_lim)
+        counter = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while True:
+            self.stats["resolution_steps"] += 1
+            for q in (clause if literal is None else clause[1:]):
+                v = q >> 1
+                if v not in seen and self.level[v] > 0:
+                    seen.add(v)
+                    self.bump(v)
+                    if self.level[v] >= current_level:
+                        counter += 1
+                    else:
+                        learned.append(q)
+            # Next literal of the current level on the trail that took part in the conflict
+            while (self.trail[index] >> 1) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            v = literal >> 1
+            seen.discard(v)
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clauses[self.reason[v]]
+        learned[0] = literal ^ 1
+
+        # Local minimization: drop literals implied by other literals of the learned clause
+        kept = [learned[0]]
+        for q in learned[1:]:
+            reason = self.reason[q >> 1]
+            if reason is None or any((r >> 1) not in seen and self.level[r >> 1] > 0
+                                     for r in self.clauses[reason][1:]):
+                kept.append(q)
+        learned = kept
+
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal with the highest level after the asserting literal
+        best = max(range(1, len(learned)), key=lambda k: self.level[learned[k] >> 1])
+        learned[1], learned[best] = learned[best], learned[1]
+        return learned, self.level[learned[1] >> 1]
+
+    def backtrack(self, level):
+        """Undo all assignments above the given decision level"""
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            v = literal >> 1
+            self.value[literal] = None
+            self.value[literal ^ 1] = None
+            self.reason[v] = None
+            self.polarity[v] = literal & 1
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = start
+
+    def pick_branch_literal(self):
+        """
+        Pops the unassigned variable with the highest activity.
+
+        Returns:
+            int: Decision literal using the saved phase, or None if all variables are assigned
+        """
+        heap = self.heap
+        while heap:
+            negative_activity, v = heapq.heappop(heap)
+            if self.value[2 * v] is None and -negative_activity == self.activity[v]:
+                return 2 * v + self.polarity[v]
+        # Stale entries may have hidden a variable, so fall back to a scan
+        for v in range(len(self.atoms)):
+            if self.value[2 * v] is None:
+                return 2 * v + self.polarity[v]
+        return None
+
+    def reduce_learned(self):
+        """Delete the half of the learned clauses with the highest LBD that are not reasons"""
+        locked = {self.reason[literal >> 1] for literal in self.trail}
+        candidates = sorted(self.learned, key=lambda index: self.lbd[index])
+        keep = candidates[:len(candidates) // 2]
+        for index in candidates[len(candidates) // 2:]:
+            if index in locked or self.lbd[index] <= 2:
+                keep.append(index)
+            else:
+                self.clauses[index] = None
+                del self.lbd[index]
+                self.stats["deleted_clauses"] += 1
+        self.learned = keep
+
+    def format_learned(self, clause):
+        """Formats a clause of literal codes like the resolvers' clauses"""
+        return format_clause(frozenset(-self.atoms[q >> 1] if q & 1 else self.atoms[q >> 1] for q in clause))
+
+    def solve(self, budget=None, memory=None):
+        """
+        Runs the CDCL search.
+
+        Args:
+            budget (Budget, optional): Limits checked once per conflict and decision
+            memory (MemoryMonitor, optional): Monitor sampled as learned clauses are added
+
+        Returns:
+            bool: True if the clauses are satisfiable, False otherwise, None if the
+                  budget was exceeded first
+        """
+        if self.unsat or self.propagate() is not None:
+            return False
+
+        restart_count = 0
+        conflicts_until_restart = RESTART_BASE * luby(0)
+        learned_limit = LEARNED_LIMIT
+
+        while True:
+            if budget is not None and budget.tick(len(self.clauses)):
+                return None
+            conflict = self.propagate()
+            if conflict is not None:
+                self.stats["conflicts"] += 1
+                if not self.trail_lim:
+                    # Conflict without decisions: the empty clause is derivable
+                    return False
+                learned, backtrack_level = self.analyze(conflict)
+                self.backtrack(backtrack_level)
+                self.stats["learned_clauses"] += 1
+                if self.mode:
+                    print(f"  {Fore.YELLOW}Conflict {self.stats['conflicts']}:{Style.RESET_ALL} learned {Fore.GREEN}{self.format_learned(learned)}{Style.RESET_ALL}, backjump to level {backtrack_level}")
+                index = self.add_clause(learned, learned=True)
+                if memory is not None:
+                    memory.sample(len(self.clauses))
+                if index is not None:
+                    self.lbd[index] = len({self.level[q >> 1] for q in learned})
+                    self.enqueue(learned[0], index)
+                self.var_inc /= VAR_DECAY
+                conflicts_until_restart -= 1
+                continue
+
+            if conflicts_until_restart <= 0:
+                restart_count += 1
+                self.stats["restarts"] += 1
+                conflicts_until_restart = RESTART_BASE * luby(restart_count)
+                self.backtrack(0)
+            if len(self.learned) > learned_limit:
+                self.reduce_learned()
+                learned_limit += learned_limit // 10
+
+            literal = self.pick_branch_literal()
+            if literal is None:
+                return True
+            self.stats["decisions"] += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(literal, None)
+
+    def model(self):
+        """
+        Returns the satisfying assignment found by solve().
+
+        Returns:
+            dict: Atom name -> truth value (auxiliary atoms of definitional CNF excluded)
+        """
+        return {atom_name(atom): self.value[2 * v] is True
+                for v, atom in enumerate(self.atoms) if not is_auxiliary(atom)}
+
+
+def resolve(sentence, mode, support=None, preprocess=False, budget=None, memory=None):
+    """
+    Decide the clause set with CDCL instead of resolution saturation.
+
+    Args:
+        sentence (list): List of literals and connectives in the knowledge base
+                         and negated query
+        mode (bool): Whether to print learned clauses
+        support (list, optional): Negated query in CNF; it is simply added to the clause
+                                  set since CDCL does not restrict resolution partners
+        preprocess (bool): Whether to simplify the clauses with unit propagation and pure
+                           literal elimination first
+        budget (Budget, optional): Time, clause-count and memory limits of the search
+        memory (MemoryMonitor, optional): Memory sampling policy (default: resident
+                                          memory every DEFAULT_INTERVAL clauses)
+
+    Returns:
+        tuple: (result, time_taken, peak_memory, stats)
+            - result (bool): True if the clauses are unsatisfiable (meaning entailment),
+                            False otherwise, None if the budget was exceeded first
+                            (stats['budget_exceeded'] says why)
+            - time_taken (float): Execution time in seconds
+            - peak_memory (float): Peak memory usage in MB
+            - stats (dict): Dictionary containing solver statistics, including 'model'
+                            (atom name -> truth value) when the clauses are satisfiable
+    """
+    start_time = time.time()
+    if memory is None:
+        memory = MemoryMonitor()
+    memory.start()
+    if budget is not None:
+        budget.start()
+
+    # Initialize loading indicator if not in verbose mode
+    loading = None
+    if not mode:
+        loading = LoadingIndicator("Performing CDCL search")
+        loading.start()
+
+    stats = {
+        "clauses_generated": 0,
+        "clause_pairs_examined": 0,
+        "tautologies_discarded": 0,
+    }
+
+    clause_set = sentence_to_clause_set(sentence, stats)
+    if support is not None:
+        clause_set |= sentence_to_clause_set(support, stats)
+    stats["initial_clauses"] = len(clause_set)
+
+    # Literals fixed by preprocessing, and every atom, to complete the model afterwards
+    fixed = []
+    atoms = set()
+    if preprocess:
+        atoms = {abs(literal) for clause in clause_set for literal in clause}
+        clause_set, _, preprocess_stats = simplify(clause_set, fixed=fixed)
+        stats.update(preprocess_stats)
+
+    if mode:
+        print(f"{Fore.CYAN}KB ∪ ¬Q:{Style.RESET_ALL}")
+        formatted_clauses = [f"{Fore.MAGENTA}{format_clause(clause)}{Style.RESET_ALL}" for clause in clause_set]
+        print(f"  {{{', '.join(formatted_clauses)}}}")
+        print(f"\n{Fore.CYAN}CDCL search:{Style.RESET_ALL}")
+
+    solver = CDCLSolver(clause_set, mode)
+    satisfiable = solver.solve(budget, memory)
+
+    if mode:
+        if satisfiable is None:
+            print(f"{Fore.RED}Budget exceeded: {budget.reason}.{Style.RESET_ALL}")
+        elif satisfiable:
+            print(f"{Fore.GREEN}Satisfying assignment found.{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.GREEN}Conflict at decision level 0! Contradiction achieved.{Style.RESET_ALL}")
+
+    end_time = time.time()
+    time_taken = end_time - start_time
+
+    # Stop loading indicator if it's running
+    if loading:
+        loading.stop()
+
+    stats.update(solver.stats)
+    # Learned clauses are the resolvents derived by conflict analysis
+    stats["clauses_generated"] = solver.stats["learned_clauses"]
+    stats["clause_pairs_examined"] = solver.stats["resolution_steps"]
+    stats["final_clause_count"] = len(clause_set) + len(solver.learned)
+    peak_memory = memory.stop(len(solver.clauses), stats)
+    if satisfiable is None:
+        stats["budget_exceeded"] = budget.reason
+        return None, time_taken, peak_memory, stats
+    if satisfiable:
+        model = solver.model()
+        # Atoms removed by preprocessing take their fixed value; atoms that only occurred
+        # in clauses satisfied that way may take any value
+        for literal in fixed:
+            if not is_auxiliary(abs(literal)):
+                model[atom_name(abs(literal))] = literal > 0
+        for atom in atoms:
+            if not is_auxiliary(atom):
+                model.setdefault(atom_name(atom), False)
+        stats["model"] = model
+
+    return not satisfiable, time_taken, peak_memory, stats
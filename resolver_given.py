@@ -0,0 +1,227 @@
+"""
+Given-clause resolver module for propositional logic resolution.
+
+This module implements the given-clause (Otter/DISCOUNT style) saturation loop.
+Clauses wait in a passive queue ordered by a selection heuristic; at each step the
+best passive clause (the "given" clause) is moved to the active set and resolved
+against every active clause it clashes with. Every pair of clauses is therefore
+resolved exactly once, instead of being retried on each iteration.
+"""
+
+import heapq
+import time
+from itertools import count
+from colorama import Fore, Style
+from loading_indicator import LoadingIndicator
+from clause_index import OccurrenceIndex
+from preprocessor import simplify
+from resolver import sentence_to_clause_set, format_clause, format_eliminated, resolve_clause_pair
+from memory_monitor import MemoryMonitor
+import profiling
+
+HEURISTICS = ["shortest", "fifo", "ratio"]
+
+# In 'ratio' mode, the oldest clause is picked once every (AGE_WEIGHT_RATIO + 1) selections,
+# and the shortest clause otherwise
+AGE_WEIGHT_RATIO = 4
+
+
+class PassiveQueue:
+    """
+    Priority queue of clauses waiting to be selected as given clause.
+
+    Heuristics:
+        shortest: pick the clause with the fewest literals (ties broken by age)
+        fifo: pick the oldest clause
+        ratio: interleave the shortest and the oldest clause with AGE_WEIGHT_RATIO
+    """
+    def __init__(self, heuristic="shortest"):
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown clause selection heuristic: {heuristic}")
+        self.heuristic = heuristic
+        self.age = count()
+        self.by_weight = []
+        self.by_age = []
+        # Clauses popped from one heap are left in the other and skipped lazily
+        self.selected = set()
+        self.selections = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, clause):
+        """Add a clause to the queue"""
+        age = next(self.age)
+        if self.heuristic != "fifo":
+            heapq.heappush(self.by_weight, (len(clause), age, clause))
+        if self.heuristic != "shortest":
+            heapq.heappush(self.by_age, (age, clause))
+        self.size += 1
+
+    def pop(self):
+        """Remove and return the next given clause according to the heuristic"""
+        self.selections += 1
+        if self.heuristic == "fifo":
+            clause = heapq.heappop(self.by_age)[1]
+        elif self.heuristic == "shortest":
+            clause = heapq.heappop(self.by_weight)[2]
+        else:
+            use_age = self.selections % (AGE_WEIGHT_RATIO + 1) == 0
+            heap = self.by_age if use_age else self.by_weight
+            while True:
+                entry = heapq.heappop(heap)
+                if entry[-1] not in self.selected:
+                    break
+            clause = entry[-1]
+            self.selected.add(clause)
+        self.size -= 1
+        return clause
+
+
+def resolve(sentence, mode, heuristic="shortest", support=None, preprocess=False, budget=None, memory=None):
+    """
+    Perform resolution on a set of propositional logic clauses with the given-clause algorithm.
+
+    Args:
+        sentence (list): List of literals and connectives in the knowledge base
+                         and negated query
+        mode (bool): Whether to print detailed resolution steps
+        heuristic (str): Clause selection heuristic, one of HEURISTICS
+        support (list, optional): Negated query in CNF, kept apart from the knowledge base.
+                                  When given, knowledge base clauses start in the active set
+                                  and only the support clauses are queued, so every given
+                                  clause descends from the negated query (set of support)
+        preprocess (bool): Whether to simplify the clauses with unit propagation and pure
+                           literal elimination before resolution
+        budget (Budget, optional): Time, clause-count and memory limits of the search
+        memory (MemoryMonitor, optional): Memory sampling policy (default: resident
+                                          memory every DEFAULT_INTERVAL clauses)
+
+    Returns:
+        tuple: (result, time_taken, peak_memory, stats)
+            - result (bool): True if a contradiction was found (meaning entailment),
+                            False otherwise, None if the budget was exceeded first
+                            (stats['budget_exceeded'] says why)
+            - time_taken (float): Execution time in seconds
+            - peak_memory (float): Peak memory usage in MB
+            - stats (dict): Dictionary containing resolution statistics
+    """
+    start_time = time.time()
+    if memory is None:
+        memory = MemoryMonitor()
+    memory.start()
+    if budget is not None:
+        budget.start()
+    # Unchanged unless profiling
+    resolve_pair = profiling.timed(resolve_clause_pair, "resolvent generation")
+
+    # Initialize loading indicator if not in verbose mode
+    loading = None
+    if not mode:
+        loading = LoadingIndicator("Performing resolution")
+        loading.start()
+
+    # Statistics tracking
+    stats = {
+        "clauses_generated": 0,
+        "clause_pairs_examined": 0,
+        "tautologies_discarded": 0,
+        "given_clauses_selected": 0,
+    }
+
+    clause_set = sentence_to_clause_set(sentence, stats)
+    support_set = None
+    if support is not None:
+        support_set = sentence_to_clause_set(support, stats)
+        clause_set |= support_set
+        stats["support_clauses"] = len(support_set)
+
+    stats["initial_clauses"] = len(clause_set)
+    if preprocess:
+        clause_set, support_set, preprocess_stats = simplify(clause_set, support_set)
+        stats.update(preprocess_stats)
+
+    # Active clauses, indexed by literal so that the given clause only meets its clashing partners
+    active = OccurrenceIndex()
+    active_count = 0
+    passive = PassiveQueue(heuristic)
+
+    if support_set is None:
+        for clause in clause_set:
+            passive.push(clause)
+    else:
+        for clause in clause_set - support_set:
+            active.add(clause)
+            active_count += 1
+        for clause in support_set:
+            passive.push(clause)
+
+    # Display initial clauses in verbose mode
+    if mode:
+        print(f"{Fore.CYAN}KB ∪ ¬Q:{Style.RESET_ALL}")
+        formatted_clauses = [f"{Fore.MAGENTA}{format_clause(clause)}{Style.RESET_ALL}" for clause in clause_set]
+        print(f"  {{{', '.join(formatted_clauses)}}}")
+        print(f"\n{Fore.CYAN}Resolution steps:{Style.RESET_ALL}")
+
+    step_counter = 0
+    # Preprocessing may already have derived the empty clause
+    result = frozenset() in clause_set
+    if result and mode:
+        print(f"{Fore.GREEN}Empty clause found during preprocessing! Contradiction achieved.{Style.RESET_ALL}")
+
+    while passive and not result:
+        given = passive.pop()
+        stats["given_clauses_selected"] += 1
+
+        # The given clause joins the active set (it never clashes with itself, since
+        # clauses are tautology-free)
+        active.add(given)
+        active_count += 1
+
+        for partner in active.clashing(given):
+            if budget is not None and budget.tick(len(clause_set)):
+                break
+            stats["clause_pairs_examined"] += 1
+
+            for resolvent, eliminated in resolve_pair(given, partner, stats):
+                stats["clauses_generated"] += 1
+
+                if resolvent in clause_set:
+                    continue
+                clause_set.add(resolvent)
+                passive.push(resolvent)
+                memory.sample(len(clause_set))
+
+                # Display resolution step in verbose mode
+                if mode:
+                    step_counter += 1
+                    print(f"  {Fore.YELLOW}Step {step_counter}:{Style.RESET_ALL} Resolving {Fore.MAGENTA}{format_clause(given)}{Style.RESET_ALL} and {Fore.MAGENTA}{format_clause(partner)}{Style.RESET_ALL}")
+                    print(f"    {Fore.BLUE}Derived:{Style.RESET_ALL} {Fore.GREEN}{format_clause(resolvent)}{Style.RESET_ALL}")
+                    print(f"    {Fore.RED}(Eliminated: {format_eliminated(eliminated)}){Style.RESET_ALL}")
+
+                # Check for empty clause immediately
+                if len(resolvent) == 0:
+                    if mode:
+                        print(f"{Fore.GREEN}Empty clause found! Contradiction achieved.{Style.RESET_ALL}")
+                    result = True
+                    break
+            if result:
+                break
+        if budget is not None and budget.reason is not None:
+            result = None
+            stats["budget_exceeded"] = budget.reason
+            break
+
+    end_time = time.time()
+    time_taken = end_time - start_time
+
+    # Stop loading indicator if it's running
+    if loading:
+        loading.stop()
+
+    stats["active_clauses"] = active_count
+    stats["final_clause_count"] = len(clause_set)
+    peak_memory = memory.stop(len(clause_set), stats)
+
+    return result, time_taken, peak_memory, stats
@@ -7,12 +7,18 @@ statistics tracking. It is designed to be used as an alternative to the original
 resolver implementation.
 """
 
+import sys
 import time
-from colorama import Fore, Style
 from loading_indicator import LoadingIndicator
-from resolver import clause_to_frozenset, format_clause, resolve_clause_pair, get_memory_usage
-
-def is_subsumed(new_clause, clause_set):
+from clause_index import SubsumptionIndex
+from preprocessor import simplify
+from parallel_resolution import ResolventPool, record_parallel_stats
+from resolver import sentence_to_clause_set, resolve_clause_pair
+from memory_monitor import MemoryMonitor
+import profiling
+from profiling import phase
+
+def is_subsumed(new_clause, index):
     """
     Check if a new clause is subsumed by any existing clause in the clause set.
     
@@ -23,14 +29,14 @@ def is_subsumed(new_clause, clause_set):
     
     Args:
         new_clause (frozenset): The new clause to check for subsumption
-        clause_set (set): The set of existing clauses
+        index (SubsumptionIndex): Index of the existing clauses
         
     Returns:
         bool: True if the new clause is subsumed by any existing clause, False otherwise
     """
-    return any(existing.issubset(new_clause) for existing in clause_set)
+    return index.subsumed(new_clause)
 
-def subsumes_any(new_clause, clause_set):
+def subsumes_any(new_clause, index):
     """
     Find all clauses in the clause set that are subsumed by the new clause.
     
@@ -40,14 +46,27 @@ def subsumes_any(new_clause, clause_set):
 
     Args:
         new_clause (frozenset): The new clause that may subsume others
-        clause_set (set): The set of existing clauses to check against
+        index (SubsumptionIndex): Index of the existing clauses to check against
         
     Returns:
         list: List of clauses that are subsumed by the new clause
     """
-    return [existing for existing in clause_set if new_clause.issubset(existing)]
+    return index.subsumes(new_clause)
+
+def record_subsumption_stats(stats, index):
+    """
+    Copy the subsumption counters of the index into the statistics.
+
+    Args:
+        stats (dict): Statistics of the resolution process
+        index (SubsumptionIndex): Index used for subsumption queries
+    """
+    stats["subsumption_checks"] = index.checks
+    stats["subsumption_candidates"] = index.candidates
+    stats["subsumption_index_hits"] = index.hits
 
-def resolve(sentence, mode):
+def resolve(sentence, mode, support=None, preprocess=False, parallel=1, budget=None, memory=None, trace=None,
+            proof=None):
     """
     Perform resolution on a set of propositional logic clauses.
     
@@ -55,27 +74,50 @@ def resolve(sentence, mode):
     1. Subsumption checking to eliminate redundant clauses
     2. More efficient clause management with workset approach
     3. Detailed statistics tracking
+    4. Optional set-of-support restriction to the negated query
     
     Args:
         sentence (list): List of literals and connectives in the knowledge base 
                          and negated query
         mode (bool): Whether to print detailed resolution steps
+        support (list, optional): Negated query in CNF, kept apart from the knowledge base.
+                                  When given, only the support clauses start in the worklist,
+                                  so every resolvent descends from the negated query
+        preprocess (bool): Whether to simplify the clauses with unit propagation and pure
+                           literal elimination before resolution
+        parallel (int): Number of worker processes the worklist of each round is split
+                        between (1 resolves it in this process)
+        budget (Budget, optional): Time, clause-count and memory limits of the search
+        memory (MemoryMonitor, optional): Memory sampling policy (default: resident
+                                          memory every DEFAULT_INTERVAL clauses)
+        trace (TraceWriter, optional): Writer of the resolution steps (default: the
+                                       terminal in verbose mode, none otherwise)
+        proof (Derivation, optional): Records the parents of every kept resolvent, from
+                                      which the refutation can be reconstructed
     
     Returns:
         tuple: (result, time_taken, peak_memory, stats)
             - result (bool): True if a contradiction was found (meaning entailment), 
-                            False otherwise
+                            False otherwise, None if the budget was exceeded first
+                            (stats['budget_exceeded'] says why)
             - time_taken (float): Execution time in seconds
             - peak_memory (float): Peak memory usage in MB
             - stats (dict): Dictionary containing resolution statistics
     """
     start_time = time.time()
-    initial_memory = get_memory_usage()
-    peak_memory = initial_memory
-
-    # Memory check frequency control - check every N iterations
-    memory_check_frequency = 1000
-    iteration_counter = 0
+    if memory is None:
+        memory = MemoryMonitor()
+    memory.start()
+    if budget is not None:
+        budget.start()
+    # Unchanged unless profiling
+    resolve_pair = profiling.timed(resolve_clause_pair, "resolvent generation")
+    check_subsumed = profiling.timed(is_subsumed, "subsumption")
+    find_subsumed = profiling.timed(subsumes_any, "subsumption")
+
+    if mode and trace is None:
+        from proof import TraceWriter
+        trace = TraceWriter(sys.stdout, color=True)
 
     # Initialize loading indicator if not in verbose mode
     loading = None
@@ -87,94 +129,150 @@ def resolve(sentence, mode):
     stats = {
         "clauses_generated": 0,
         "clause_pairs_examined": 0,
+        "tautologies_discarded": 0,
     }
 
     # Convert sentence to clause set
-    clause_set = set()
-    clause = []
-
-    # Process the sentence into clauses in frozenset form
-    for literal in sentence:
-        if literal == "&":
-            clause_set.add(clause_to_frozenset(clause))
-            clause.clear()
-        else:
-            clause.append(literal)
-    
-    # Add the last clause
-    clause_set.add(clause_to_frozenset(clause))
-
-    # Display initial clauses in verbose mode
-    if mode:
-        print(f"{Fore.CYAN}KB ∪ ¬Q:{Style.RESET_ALL}")
-        formatted_clauses = [f"{Fore.MAGENTA}[{', '.join(clause)}]{Style.RESET_ALL}" for clause in clause_set]
-        print(f"  {{{', '.join(formatted_clauses)}}}")
-        print(f"\n{Fore.CYAN}Resolution steps:{Style.RESET_ALL}")
+    clause_set = sentence_to_clause_set(sentence, stats)
+    support_set = None
+    if support is not None:
+        support_set = sentence_to_clause_set(support, stats)
+        clause_set |= support_set
+        stats["support_clauses"] = len(support_set)
 
     stats["initial_clauses"] = len(clause_set)
-    worklist = clause_set.copy()
-    step_counter = 0
+    if preprocess:
+        with phase("preprocessing"):
+            clause_set, support_set, preprocess_stats = simplify(clause_set, support_set)
+        stats.update(preprocess_stats)
+
+    # Display initial clauses in verbose mode
+    if trace is not None:
+        trace.header(clause_set)
+
+    # Preprocessing may already have derived the empty clause
+    if frozenset() in clause_set:
+        if trace is not None:
+            trace.message("Empty clause found during preprocessing! Contradiction achieved.")
+        time_taken = time.time() - start_time
+        if loading:
+            loading.stop()
+        stats["final_clause_count"] = len(clause_set)
+        return True, time_taken, memory.stop(len(clause_set), stats), stats
+
+    # Worklist clauses are always one of the parents, so under set of support it starts
+    # with the support clauses only
+    worklist = clause_set.copy() if support_set is None else support_set
+
+    # Occurrence and subsumption index of clause_set, kept in sync with additions and
+    # subsumption removals
+    index = SubsumptionIndex(clause_set)
+    
+    # Worker processes mirroring the clause set, when resolvents are generated in parallel
+    pool = None
+    if parallel > 1:
+        pool = ResolventPool(parallel, subsumption=True)
+        for clause in clause_set:
+            pool.add(clause)
 
     while worklist:
         new_resolvents = set()
         clauses_to_remove = set()  # Track clauses to remove due to subsumption
-
-        # Check memory usage only at the start of each main iteration
-        if iteration_counter % memory_check_frequency == 0:
-            current_memory = get_memory_usage()
-            peak_memory = max(peak_memory, current_memory)
-        
-        iteration_counter += 1
-
-        #Try to resolve each clause in the worklist with all clauses in the main clause set/KB
+        profiling.count("saturation rounds")
+
+        if pool is not None:
+            # Workers already dropped resolvents present in or subsumed by the clause set
+            with phase("parallel rounds"):
+                resolvents, clauses_to_remove, found_empty = pool.run_round(
+                    worklist, deadline=budget.deadline if budget is not None else None)
+            new_resolvents = set(resolvents)
+            if trace is not None or proof is not None:
+                for resolvent, (c1, c2, eliminated) in resolvents.items():
+                    if proof is not None:
+                        proof.add(resolvent, c1, c2)
+                    if trace is not None:
+                        trace.step(c1, c2, resolvent, eliminated)
+            if found_empty:
+                if trace is not None:
+                    trace.message("Empty clause found! Contradiction achieved.")
+                time_taken = time.time() - start_time
+                if loading:
+                    loading.stop()
+                pool.close()
+                stats["final_clause_count"] = len(clause_set) + len(new_resolvents)
+                record_subsumption_stats(stats, index)
+                record_parallel_stats(stats, pool)
+                peak_memory = memory.stop(stats["final_clause_count"], stats)
+                return True, time_taken, peak_memory, stats
+            worklist = ()
+
+        # Try to resolve each clause in the worklist with the clauses of the main clause set/KB
+        # that contain a complementary literal
         for c1 in worklist:
-            for c2 in clause_set:
+            for c2 in index.clashing(c1):
+                if budget is not None and budget.tick(len(clause_set) + len(new_resolvents)):
+                    break
                 stats["clause_pairs_examined"] += 1
-                resolvent_pairs = resolve_clause_pair(c1, c2)
+                resolvent_pairs = resolve_pair(c1, c2, stats)
 
                 # Process each resolvent
                 for resolvent, eliminated in resolvent_pairs:
                     stats["clauses_generated"] += 1
 
-                    if resolvent not in clause_set and not is_subsumed(resolvent, clause_set):
+                    if resolvent not in clause_set and not check_subsumed(resolvent, index):
                         # Collect subsumed clauses to remove later
-                        subsumed = subsumes_any(resolvent, clause_set)
+                        subsumed = find_subsumed(resolvent, index)
                         if subsumed:
                             clauses_to_remove.update(subsumed)
 
                         new_resolvents.add(resolvent)
+                        memory.sample(len(clause_set) + len(new_resolvents))
 
-                        # Display resolution step in verbose mode
-                        if mode:
-                            step_counter += 1
-                            print(f"  {Fore.YELLOW}Step {step_counter}:{Style.RESET_ALL} Resolving {Fore.MAGENTA}{format_clause(c1)}{Style.RESET_ALL} and {Fore.MAGENTA}{format_clause(c2)}{Style.RESET_ALL}")
-                            print(f"    {Fore.BLUE}Derived:{Style.RESET_ALL} {Fore.GREEN}{format_clause(resolvent)}{Style.RESET_ALL}")
-                            print(f"    {Fore.RED}(Eliminated: {eliminated}){Style.RESET_ALL}")
-                            if subsumed:
-                                print(f"    {Fore.CYAN}(Clauses subsumed: {', '.join(format_clause(s) for s in subsumed)}){Style.RESET_ALL}")
+                        if proof is not None:
+                            proof.add(resolvent, c1, c2)
+                        # Formatted later, a buffer at a time
+                        if trace is not None:
+                            trace.step(c1, c2, resolvent, eliminated, subsumed)
 
                         # Check for empty clause immediately
                         if len(resolvent) == 0:
-                            if mode:
-                                print(f"{Fore.GREEN}Empty clause found! Contradiction achieved.{Style.RESET_ALL}")
+                            if trace is not None:
+                                trace.message("Empty clause found! Contradiction achieved.")
 
                             end_time = time.time()
                             time_taken = end_time - start_time
 
-                            # Final memory check
-                            peak_memory = max(peak_memory, get_memory_usage())
-
                             # Stop loading indicator if it's running
                             if loading:
                                 loading.stop()
 
                             stats["final_clause_count"] = len(clause_set) + len(new_resolvents)
+                            record_subsumption_stats(stats, index)
+                            if pool is not None:
+                                pool.close()
+                                record_parallel_stats(stats, pool)
+                            peak_memory = memory.stop(stats["final_clause_count"], stats)
 
                             return True, time_taken, peak_memory, stats
+            if budget is not None and budget.reason is not None:
+                break
+
+        # Stop with an unknown result once the budget is exhausted
+        if budget is not None and budget.check(len(clause_set) + len(new_resolvents)):
+            break
 
         # Remove subsumed clauses and update the clause set
         clause_set.difference_update(clauses_to_remove)
         clause_set.update(new_resolvents)
+        for clause in clauses_to_remove:
+            index.remove(clause)
+        for clause in new_resolvents:
+            index.add(clause)
+        if pool is not None:
+            for clause in clauses_to_remove:
+                pool.remove(clause)
+            for clause in new_resolvents:
+                pool.add(clause)
         worklist = new_resolvents  # Only process new resolvents in the next iteration
 
         # If no new resolvents were generated, we've reached a fixed point
@@ -182,16 +280,25 @@ def resolve(sentence, mode):
             break
 
     # If we get here without finding an empty clause, the KB doesn't entail the query
+    # (unless the budget ran out first)
+    result = False
+    if budget is not None and budget.reason is not None:
+        result = None
+        stats["budget_exceeded"] = budget.reason
     end_time = time.time()
     time_taken = end_time - start_time
 
-    # Final memory check
-    peak_memory = max(peak_memory, get_memory_usage())
-
     # Stop loading indicator if it's running
     if loading:
         loading.stop()
+    if trace is not None:
+        trace.flush()
 
     stats["final_clause_count"] = len(clause_set)
+    record_subsumption_stats(stats, index)
+    if pool is not None:
+        pool.close()
+        record_parallel_stats(stats, pool)
+    peak_memory = memory.stop(len(clause_set), stats)
 
-    return False, time_taken, peak_memory, stats
+    return result, time_taken, peak_memory, stats
@@ -3,13 +3,39 @@ Test module for propositional logic resolution prover.
 Contains unit tests for the parser, CNF converter, and resolver modules.
 """
 
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 from parser import segment_sentence, forward_slice, backward_slice
+from parser import tokenize, parse_sentence, ast_to_tokens, Atom, Not, BinaryOp
 from cnf_converter import to_cnf, induce_parenthesis, around_unary_op, around_binary_op
 from cnf_converter import literal_not_protected, eliminate_invalid_parenthesis
 from cnf_converter import iff_equivalent, implies_equivalent, eliminate_op
 from cnf_converter import move_not_inwards, distribute_or_over_and, split_around_and
-from resolver import resolve
+from cnf_converter import formula_to_clauses, formula_to_definitional_clauses, naive_clause_count
+from resolver import resolve, sentence_to_clause_set, clause_to_frozenset, format_clause, resolve_clause_pair
+from literals import encode_literal, decode_literal, is_auxiliary
+from cnf_cache import CNFCache, cache_key
+from compiled_kb import is_compiled, write_compiled, load_compiled
+from dimacs import is_dimacs, read_dimacs, write_dimacs, variable_numbers
+from clause_index import OccurrenceIndex, SubsumptionIndex
+import resolver_given
+import resolver_new
+from preprocessor import simplify
+import resolver_cdcl
+from parallel_resolution import pack_clauses, unpack_clauses
+import portfolio
+from budget import Budget
+import memory_monitor
+from memory_monitor import MemoryMonitor
+import benchmark
+import profiling
+from batch import prepare_knowledge_base, answer_query, answer_queries, aggregate_stats
+from proof import Derivation, TraceWriter, read_tracecheck
 
 
 class TestParser(unittest.TestCase):
@@ -21,6 +47,32 @@ class TestParser(unittest.TestCase):
         expected = ['A', '&', '(', 'B', '|', '!', 'C', ')']
         self.assertEqual(segment_sentence(sentence), expected)
 
+    def test_tokenize(self):
+        """Test tokenizing without spaces and with multi-character atoms."""
+        self.assertEqual(tokenize("FirstGrade>Child"), ['FirstGrade', '>', 'Child'])
+        self.assertEqual(tokenize(" !A1 = B2 "), ['!', 'A1', '=', 'B2'])
+
+    def test_parse_sentence(self):
+        """Test operator precedence and associativity of the parser."""
+        self.assertEqual(repr(parse_sentence("A | B & C > D = E")), "(((A|(B&C))>D)=E)")
+        self.assertEqual(repr(parse_sentence("A > B > C")), "((A>B)>C)")
+        self.assertEqual(repr(parse_sentence("!!A & !(B | C)")), "(!!A&!(B|C))")
+
+        node = parse_sentence("!A & B")
+        self.assertIsInstance(node, BinaryOp)
+        self.assertIsInstance(node.left, Not)
+        self.assertIsInstance(node.right, Atom)
+
+    def test_parse_sentence_errors(self):
+        """Test that malformed sentences are rejected."""
+        for sentence in ["A &", "(A | B", "A B", ")", ""]:
+            with self.assertRaises(ValueError):
+                parse_sentence(sentence)
+
+    def test_ast_to_tokens(self):
+        """Test converting an AST back to a fully parenthesized token list."""
+        self.assertEqual(''.join(ast_to_tokens(parse_sentence("A & B | !C"))), '((A&B)|!C)')
+
     def test_forward_slice(self):
         """Test forward slicing."""
         sentence = ['A', '&', '(', 'B', '|', '(', '!', 'C', '&', 'D', ')', ')']
@@ -172,10 +224,238 @@ class TestCNFConverter(unittest.TestCase):
         result = split_around_and(sentence)
         self.assertEqual(''.join(result), '(A|B)&(C|D)')
 
+    def test_formula_to_clauses(self):
+        """Test converting a formula tree directly to clauses."""
+        clauses = formula_to_clauses(parse_sentence("A | (B & C)"))
+        self.assertEqual(sorted(format_clause(c) for c in clauses), ['[A, B]', '[A, C]'])
+
+        clauses = formula_to_clauses(parse_sentence("A > B"), negate=True)
+        self.assertEqual(sorted(format_clause(c) for c in clauses), ['[!B]', '[A]'])
+
+        clauses = formula_to_clauses(parse_sentence("A = B"))
+        self.assertEqual(sorted(format_clause(c) for c in clauses), ['[!A, B]', '[!B, A]'])
+
+        # Tautological clauses are never produced
+        stats = {}
+        self.assertEqual(formula_to_clauses(parse_sentence("A | !A"), stats=stats), [])
+        self.assertEqual(stats["cnf_tautologies"], 1)
+
+    def test_formula_to_clauses_matches_to_cnf(self):
+        """Test that both converters produce the same clauses."""
+        for sentence in ["Boy | Girl = Child", "Child & Female > Girl", "!(A & (B | !C)) = D"]:
+            expected = sentence_to_clause_set(to_cnf(segment_sentence(sentence)))
+            self.assertEqual(set(formula_to_clauses(parse_sentence(sentence))), expected)
+
+    def test_formula_to_definitional_clauses(self):
+        """Test that the definitional encoding stays linear and keeps entailment."""
+        # A chain of '=' doubles the distributive clause count per level
+        sentence = "A = (B = (C = (D = (E = (F = G)))))"
+        stats = {}
+        clauses = formula_to_definitional_clauses(parse_sentence(sentence), stats=stats)
+        self.assertEqual(naive_clause_count(parse_sentence(sentence)), 64)
+        self.assertLess(len(clauses), 64)
+        self.assertGreater(stats["cnf_auxiliary_variables"], 0)
+
+        kb = formula_to_definitional_clauses(parse_sentence("(A | B & C) > D"))
+        for query, entailed in (("C & B > D", True), ("C > D", False)):
+            negated_query = formula_to_definitional_clauses(parse_sentence(query), negate=True)
+            result, _, _, _ = resolver_cdcl.resolve(kb + negated_query, False)
+            self.assertEqual(result, entailed)
+
+
+class TestCNFCache(unittest.TestCase):
+    """Tests for the CNF cache module."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cnf.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_cache_key(self):
+        """Test that keys ignore whitespace but not negation or encoding."""
+        self.assertEqual(cache_key("A&(B|C)"), cache_key(" A & ( B | C ) "))
+        self.assertNotEqual(cache_key("A & B"), cache_key("A & B", negate=True))
+        self.assertNotEqual(cache_key("A & B"), cache_key("A & B", encoding="tseitin"))
+
+    def test_persistence(self):
+        """Test that conversions survive reopening and auxiliary atoms get fresh ids."""
+        key = cache_key("A | B & C", encoding="tseitin")
+        clauses = formula_to_definitional_clauses(parse_sentence("A | B & C"))
+        cache = CNFCache(self.path)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, clauses, 2)
+        cache.close()
+
+        cache = CNFCache(self.path)
+        loaded, naive_count, auxiliary_count, tautologies = cache.get(key)
+        cache.close()
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertEqual((naive_count, auxiliary_count, tautologies), (2, 1, 0))
+        self.assertEqual(len(loaded), len(clauses))
+        auxiliary = {abs(literal) for clause in loaded for literal in clause if is_auxiliary(abs(literal))}
+        original = {abs(literal) for clause in clauses for literal in clause if is_auxiliary(abs(literal))}
+        self.assertEqual(len(auxiliary), 1)
+        self.assertTrue(auxiliary.isdisjoint(original))
+
+    def test_eviction(self):
+        """Test that the least recently used entries are evicted beyond the size bound."""
+        cache = CNFCache(self.path, max_entries=2, memory_entries=1)
+        for sentence in ("A", "B", "C"):
+            cache.put(cache_key(sentence), formula_to_clauses(parse_sentence(sentence)))
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get(cache_key("A")))
+        self.assertEqual(cache.get(cache_key("B"))[0], [frozenset({encode_literal("B")})])
+        cache.close()
+
+
+class TestCompiledKB(unittest.TestCase):
+    """Tests for the compiled knowledge base module."""
+
+    def test_round_trip(self):
+        """Test that compiled clauses load back unchanged and auxiliary atoms stay auxiliary."""
+        clauses = formula_to_clauses(parse_sentence("(Girl | Boy) & !Adult > Child"))
+        clauses += formula_to_definitional_clauses(parse_sentence("A | B & C"))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kb.kbc")
+            write_compiled(clauses, path)
+            self.assertTrue(is_compiled(path))
+            loaded = load_compiled(path)
+
+        self.assertEqual(len(loaded), len(clauses))
+        # Ordinary atoms keep their ids; the auxiliary atom is renamed
+        plain = [clause for clause in clauses if not any(is_auxiliary(abs(literal)) for literal in clause)]
+        self.assertEqual([clause for clause in loaded if clause in plain], plain)
+        auxiliary = {abs(literal) for clause in loaded for literal in clause if is_auxiliary(abs(literal))}
+        self.assertEqual(len(auxiliary), 1)
+
+    def test_corrupt_file(self):
+        """Test that truncated or corrupt compiled files are rejected with a ValueError."""
+        clauses = formula_to_clauses(parse_sentence("(A | B) & (!A | C)"))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kb.kbc")
+            write_compiled(clauses, path)
+            with open(path, "rb") as file:
+                data = file.read()
+            for corrupt in (data[:30], data[:-2], data[:-4] + (99).to_bytes(4, "little")):
+                with open(path, "wb") as file:
+                    file.write(corrupt)
+                with self.assertRaises(ValueError):
+                    load_compiled(path)
+
+    def test_text_file_is_not_compiled(self):
+        """Test that text knowledge bases are not mistaken for compiled ones."""
+        self.assertFalse(is_compiled(os.path.join(os.path.dirname(__file__), "datasets", "kb1.txt")))
+
+
+class TestDimacs(unittest.TestCase):
+    """Tests for the DIMACS module."""
+
+    def test_read_dimacs(self):
+        """Test parsing of comments, multi-line clauses, tautologies and the end marker."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "problem.cnf")
+            with open(path, "w") as file:
+                file.write("c example\np cnf 3 4\n1 -2 0\n2 3\n-1 0\n1 -1 0\n3 0\n%\n0\n")
+            self.assertTrue(is_dimacs(path))
+            stats = {}
+            clauses = list(read_dimacs(path, stats))
+
+        one, two, three = encode_literal("1"), encode_literal("2"), encode_literal("3")
+        self.assertEqual(clauses, [frozenset({one, -two}), frozenset({two, three, -one}), frozenset({three})])
+        self.assertEqual(stats, {"dimacs_variables": 3, "dimacs_clauses": 4, "dimacs_tautologies": 1})
+
+    def test_round_trip(self):
+        """Test that exported clauses read back with their atom names."""
+        clauses = formula_to_clauses(parse_sentence("(Girl | Boy) & !Adult > Child"))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kb.cnf")
+            with open(path, "w") as file:
+                write_dimacs(clauses, file)
+            self.assertEqual(list(read_dimacs(path)), clauses)
+
+    def test_text_file_is_not_dimacs(self):
+        """Test that text knowledge bases are not mistaken for DIMACS files."""
+        self.assertFalse(is_dimacs(os.path.join(os.path.dirname(__file__), "datasets", "kb1.txt")))
+
+
+class TestLiterals(unittest.TestCase):
+    """Tests for the literal encoding module."""
+
+    def test_encode_decode_literal(self):
+        """Test that negation is a sign flip and decoding round-trips."""
+        self.assertEqual(encode_literal("!Girl"), -encode_literal("Girl"))
+        self.assertGreater(encode_literal("Girl"), 0)
+        self.assertEqual(decode_literal(encode_literal("!Girl")), "!Girl")
+        self.assertEqual(decode_literal(encode_literal("Girl")), "Girl")
+
+
+class TestClauseIndex(unittest.TestCase):
+    """Tests for the clause index module."""
+
+    def test_occurrence_index_clashing(self):
+        """Test that only clauses with a complementary literal are returned."""
+        c1 = clause_to_frozenset(['(', 'A', '|', 'B', ')'])
+        c2 = clause_to_frozenset(['(', '!', 'A', '|', 'C', ')'])
+        c3 = clause_to_frozenset(['(', 'B', '|', 'C', ')'])
+        index = OccurrenceIndex([c1, c2, c3])
+        self.assertEqual(index.clashing(c1), {c2})
+        self.assertEqual(index.clashing(c3), set())
+
+        index.remove(c2)
+        self.assertEqual(index.clashing(c1), set())
+
+    def test_subsumption_index(self):
+        """Test forward and backward subsumption queries."""
+        ab = clause_to_frozenset(['(', 'A', '|', 'B', ')'])
+        abc = clause_to_frozenset(['(', 'A', '|', 'B', '|', 'C', ')'])
+        a_notc = clause_to_frozenset(['(', 'A', '|', '!', 'C', ')'])
+        index = SubsumptionIndex([ab, a_notc])
+        self.assertTrue(index.subsumed(abc))
+        self.assertFalse(index.subsumed(clause_to_frozenset(['(', 'B', '|', 'C', ')'])))
+
+        index.add(abc)
+        self.assertEqual(set(index.subsumes(clause_to_frozenset(['A']))), {ab, a_notc, abc})
+        self.assertEqual(set(index.subsumes(ab)), {ab, abc})
+
+        index.remove(ab)
+        self.assertFalse(index.subsumed(clause_to_frozenset(['(', 'A', '|', 'B', '|', 'D', ')'])))
+        self.assertGreater(index.hits, 0)
+
 
 class TestResolver(unittest.TestCase):
     """Tests for the resolver module."""
 
+    def test_clause_to_frozenset(self):
+        """Test converting a CNF clause to a set of encoded literals."""
+        clause = clause_to_frozenset(['(', 'A', '|', '!', 'B', ')'])
+        self.assertEqual(clause, frozenset({encode_literal("A"), encode_literal("!B")}))
+        self.assertEqual(format_clause(clause), "[!B, A]")
+
+    def test_resolve_clause_pair(self):
+        """Test resolving two clauses on a complementary literal."""
+        c1 = clause_to_frozenset(['(', 'A', '|', 'B', ')'])
+        c2 = clause_to_frozenset(['(', '!', 'A', '|', 'C', ')'])
+        resolvents = resolve_clause_pair(c1, c2)
+        self.assertEqual(len(resolvents), 1)
+        self.assertEqual(format_clause(resolvents[0][0]), "[B, C]")
+
+    def test_tautology_elimination(self):
+        """Test that tautologies are discarded at input and never derived."""
+        self.assertIsNone(clause_to_frozenset(['(', 'A', '|', '!', 'A', '|', 'B', ')']))
+
+        # Clashing on both A and B only yields tautologies
+        c1 = clause_to_frozenset(['(', 'A', '|', 'B', ')'])
+        c2 = clause_to_frozenset(['(', '!', 'A', '|', '!', 'B', ')'])
+        stats = {"tautologies_discarded": 0}
+        self.assertEqual(resolve_clause_pair(c1, c2, stats), [])
+        self.assertEqual(stats["tautologies_discarded"], 1)
+
+        _, _, _, stats = resolve(to_cnf(segment_sentence("(A | !A) & B")), False)
+        self.assertEqual(stats["tautologies_discarded"], 1)
+        self.assertEqual(stats["initial_clauses"], 1)
+
     def test_resolution_true(self):
         """Test resolution that should return True."""
         kb = "A & B"
@@ -194,6 +474,531 @@ class TestResolver(unittest.TestCase):
         result, _, _, _ = resolve(kb_cnf + ['&'] + neg_query_cnf, False)
         self.assertFalse(result)
 
+    def test_set_of_support(self):
+        """Test resolution restricted to the set of support of the negated query."""
+        kb_cnf = to_cnf(segment_sentence("(A > B) & (C > D) & C"))
+        for resolve_fn in (resolve, resolver_new.resolve, resolver_given.resolve):
+            result, _, _, stats = resolve_fn(kb_cnf, False, support=to_cnf(segment_sentence("!(D)")))
+            self.assertTrue(result)
+            self.assertEqual(stats["support_clauses"], 1)
+
+            result, _, _, _ = resolve_fn(kb_cnf, False, support=to_cnf(segment_sentence("!(A)")))
+            self.assertFalse(result)
+
+    def test_parallel_resolution(self):
+        """Test that worker processes derive the same result as the serial resolvers."""
+        clauses = [frozenset({-3, 1, 7}), frozenset(), frozenset({2})]
+        self.assertEqual(unpack_clauses(pack_clauses(clauses)), clauses)
+
+        kb = formula_to_clauses(parse_sentence("(A > B) & (B > C) & (C | D > E) & A"))
+        for query, entailed in (("E", True), ("!D", False)):
+            negated_query = formula_to_clauses(parse_sentence(query), negate=True)
+            for resolve_fn in (resolve, resolver_new.resolve):
+                result, _, _, stats = resolve_fn(kb + negated_query, False, parallel=2)
+                self.assertEqual(result, entailed)
+                self.assertEqual(stats["parallel_workers"], 2)
+                self.assertGreaterEqual(stats["parallel_utilisation"], 0.0)
+                result, _, _, _ = resolve_fn(kb, False, support=negated_query, parallel=2)
+                self.assertEqual(result, entailed)
+
+
+class TestPreprocessor(unittest.TestCase):
+    """Tests for the preprocessing module."""
+
+    def test_unit_propagation_contradiction(self):
+        """Test that unit propagation detects an immediate empty clause."""
+        clauses = {clause_to_frozenset(['A']),
+                   clause_to_frozenset(['(', '!', 'A', '|', 'B', ')']),
+                   clause_to_frozenset(['!', 'B'])}
+        simplified, _, stats = simplify(clauses)
+        self.assertEqual(simplified, {frozenset()})
+        self.assertGreater(stats["preprocess_units_propagated"], 0)
+
+    def test_pure_literal_elimination(self):
+        """Test that clauses with pure literals are removed."""
+        clauses = {clause_to_frozenset(['(', 'A', '|', 'B', ')']),
+                   clause_to_frozenset(['(', 'A', '|', '!', 'B', ')']),
+                   clause_to_frozenset(['(', '!', 'C', '|', 'D', ')']),
+                   clause_to_frozenset(['(', 'C', '|', '!', 'D', ')'])}
+        simplified, _, stats = simplify(clauses)
+        self.assertEqual(len(simplified), 2)
+        self.assertEqual(stats["preprocess_pure_literals"], 1)
+        self.assertEqual(stats["preprocess_clauses_removed"], 2)
+
+    def test_support_inherited(self):
+        """Test that clauses shortened by a support unit join the set of support."""
+        unit = clause_to_frozenset(['!', 'B'])
+        clauses = {clause_to_frozenset(['(', '!', 'A', '|', 'B', ')']), clause_to_frozenset(['A']), unit}
+        simplified, support, _ = simplify(clauses, {unit})
+        self.assertEqual(simplified, {frozenset()})
+        self.assertEqual(support, {frozenset()})
+
+    def test_resolution_with_preprocessing(self):
+        """Test that preprocessing does not change resolution results."""
+        kb_cnf = to_cnf(segment_sentence("(A > B) & (B | C) & (C > D)"))
+        for resolve_fn in (resolve, resolver_new.resolve, resolver_given.resolve):
+            result, _, _, _ = resolve_fn(kb_cnf + ['&'] + to_cnf(segment_sentence("!(B | D)")), False, preprocess=True)
+            self.assertTrue(result)
+            result, _, _, _ = resolve_fn(kb_cnf + ['&'] + to_cnf(segment_sentence("!(D)")), False, preprocess=True)
+            self.assertFalse(result)
+
+
+class TestGivenClauseResolver(unittest.TestCase):
+    """Tests for the given-clause resolver module."""
+
+    def test_passive_queue_order(self):
+        """Test that the passive queue follows the selection heuristic."""
+        long_clause = clause_to_frozenset(['(', 'A', '|', 'B', '|', 'C', ')'])
+        short_clause = clause_to_frozenset(['A'])
+
+        queue = resolver_given.PassiveQueue("shortest")
+        queue.push(long_clause)
+        queue.push(short_clause)
+        self.assertEqual(queue.pop(), short_clause)
+
+        queue = resolver_given.PassiveQueue("fifo")
+        queue.push(long_clause)
+        queue.push(short_clause)
+        self.assertEqual(queue.pop(), long_clause)
+        self.assertEqual(len(queue), 1)
+
+    def test_resolution(self):
+        """Test given-clause resolution with every heuristic."""
+        kb_cnf = to_cnf(segment_sentence("(A > B) & A"))
+        for heuristic in resolver_given.HEURISTICS:
+            entailed = kb_cnf + ['&'] + to_cnf(segment_sentence("!(B)"))
+            result, _, _, _ = resolver_given.resolve(entailed, False, heuristic)
+            self.assertTrue(result)
+
+            not_entailed = kb_cnf + ['&'] + to_cnf(segment_sentence("!(C)"))
+            result, _, _, _ = resolver_given.resolve(not_entailed, False, heuristic)
+            self.assertFalse(result)
+
+
+class TestCDCLResolver(unittest.TestCase):
+    """Tests for the CDCL resolver module."""
+
+    def test_luby(self):
+        """Test the Luby restart sequence."""
+        self.assertEqual([resolver_cdcl.luby(i) for i in range(9)], [1, 1, 2, 1, 1, 2, 4, 1, 1])
+
+    def test_unsatisfiable(self):
+        """Test that an entailed query is refuted."""
+        kb_cnf = to_cnf(segment_sentence("(A > B) & (B > C) & A"))
+        result, _, _, stats = resolver_cdcl.resolve(kb_cnf + ['&'] + to_cnf(segment_sentence("!(C)")), False)
+        self.assertTrue(result)
+        self.assertNotIn("model", stats)
+
+    def test_pigeonhole(self):
+        """Test that 4 pigeons do not fit in 3 holes, which needs conflict analysis."""
+        clauses = []
+        for i in range(4):
+            clauses.append("(" + "|".join(f"P{i}H{j}" for j in range(3)) + ")")
+        for j in range(3):
+            for a in range(4):
+                for b in range(a + 1, 4):
+                    clauses.append(f"(!P{a}H{j}|!P{b}H{j})")
+        sentence = []
+        for clause in clauses:
+            sentence += to_cnf(segment_sentence(clause)) + ['&']
+        result, _, _, stats = resolver_cdcl.resolve(sentence[:-1], False)
+        self.assertTrue(result)
+        self.assertGreater(stats["conflicts"], 0)
+
+    def test_model(self):
+        """Test that a satisfying model is returned for a non-entailed query."""
+        kb_cnf = to_cnf(segment_sentence("(A | B) & (!A | C) & !C"))
+        result, _, _, stats = resolver_cdcl.resolve(kb_cnf, False)
+        self.assertFalse(result)
+        self.assertEqual(stats["model"], {"A": False, "B": True, "C": False})
+
+        # Preprocessing fixes every atom, which must still appear in the model
+        result, _, _, stats = resolver_cdcl.resolve(kb_cnf, False, preprocess=True)
+        self.assertFalse(result)
+        self.assertEqual(stats["model"], {"A": False, "B": True, "C": False})
+
+
+class TestBatch(unittest.TestCase):
+    """Tests for the batch query module."""
+
+    def test_prepare_knowledge_base(self):
+        """Test unit strengthening, subsumption and consistency of the prepared knowledge base."""
+        kb = formula_to_clauses(parse_sentence("A & (!A | B) & (B | C) & (C | D | !E)"))
+        prepared, consistent, stats = prepare_knowledge_base(kb, rounds=0)
+        self.assertTrue(consistent)
+        # !A | B is strengthened to B, which subsumes B | C
+        self.assertEqual(set(prepared), set(formula_to_clauses(parse_sentence("A & B & (C | D | !E)"))))
+        self.assertEqual(stats["kb_subsumed_clauses"], 1)
+
+        # Units derived by strengthening propagate in turn
+        kb = formula_to_clauses(parse_sentence("A & (!A | B) & (!B | C) & (!A | C)"))
+        prepared, _, stats = prepare_knowledge_base(kb, rounds=0)
+        self.assertEqual(set(prepared), set(formula_to_clauses(parse_sentence("A & B & C"))))
+
+        _, consistent, _ = prepare_knowledge_base(formula_to_clauses(parse_sentence("(A | B) & !A & !B")))
+        self.assertFalse(consistent)
+
+    def test_answer_query(self):
+        """Test that queries answered against a shared knowledge base match single runs."""
+        kb = []
+        for sentence in ["FirstGrade", "FirstGrade > Child", "Child & Male > Boy",
+                         "Kindergarten > Child", "Child & Female > Girl", "Female"]:
+            kb += formula_to_clauses(parse_sentence(sentence))
+        prepared, consistent, _ = prepare_knowledge_base(kb)
+        for query, entailed in (("Girl", True), ("Boy", False), ("Child & Female", True)):
+            negated_query = formula_to_clauses(parse_sentence(query), negate=True)
+            for resolve_function in (resolve, resolver_given.resolve, resolver_cdcl.resolve):
+                result, _, _, _ = answer_query(resolve_function, prepared, consistent, negated_query)
+                self.assertEqual(result, entailed)
+
+    def test_answer_queries_in_parallel(self):
+        """Test that worker processes return the same results in input order."""
+        kb = formula_to_definitional_clauses(parse_sentence("(A | B & C) > D & (E | !F)"))
+        prepared, consistent, _ = prepare_knowledge_base(kb)
+        queries = ["C & B > D", "C > D", "A > E | !F", "F > E", "!D > !A"]
+        negated_queries = [formula_to_definitional_clauses(parse_sentence(query), negate=True) for query in queries]
+        sequential = list(answer_queries(resolver_given.resolve, prepared, consistent, negated_queries))
+        parallel = list(answer_queries(resolver_given.resolve, prepared, consistent, negated_queries, jobs=2))
+        self.assertEqual([result for result, _, _ in parallel], [True, False, True, False, True])
+        self.assertEqual([result for result, _, _ in parallel], [result for result, _, _ in sequential])
+        totals = aggregate_stats([stats for _, _, stats in parallel])
+        self.assertEqual(totals["clauses_generated"], sum(stats["clauses_generated"] for _, _, stats in sequential))
+
+    def test_aggregate_stats(self):
+        """Test that counters are summed and ratios and memory statistics are left out."""
+        totals = aggregate_stats([
+            {"clauses_generated": 3, "parallel_utilisation": 0.5, "memory_growth_rate": 2.0, "memory_policy": "rss"},
+            {"clauses_generated": 4, "parallel_utilisation": 0.75, "memory_bytes_per_clause": 100.0},
+        ])
+        self.assertEqual(totals, {"clauses_generated": 7})
+
+
+class TestPortfolio(unittest.TestCase):
+    """Tests for the portfolio module."""
+
+    def test_race(self):
+        """Test that the portfolio reports a winner and the fate of every configuration."""
+        kb = formula_to_clauses(parse_sentence("(A > B) & (B > C) & A"))
+        negated_query = formula_to_clauses(parse_sentence("C"), negate=True)
+        result, _, _, stats = portfolio.resolve(kb + negated_query, False)
+        self.assertTrue(result)
+        self.assertIn(stats["portfolio_winner"], [name for name, _, _ in portfolio.CONFIGURATIONS])
+        self.assertEqual(len(stats["portfolio_runs"]), len(portfolio.CONFIGURATIONS))
+
+    def test_set_of_support_is_not_definitive(self):
+        """Test that an unrefuted set of support does not win against a complete configuration."""
+        kb = formula_to_clauses(parse_sentence("D & !D"))
+        negated_query = formula_to_clauses(parse_sentence("C"), negate=True)
+        configurations = [("given-clause", "resolver_given", {}), ("cdcl", "resolver_cdcl", {})]
+        result, _, _, stats = portfolio.resolve(kb, False, support=negated_query, configurations=configurations)
+        self.assertTrue(result)
+        self.assertEqual(stats["portfolio_winner"], "cdcl")
+
+    def test_crashed_configuration(self):
+        """Test that a configuration dying without an answer is reported as failed instead of awaited."""
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        directory = temporary.name
+        with open(os.path.join(directory, "crashing_resolver.py"), "w") as file:
+            file.write("import os\n\ndef resolve(*args, **kwargs):\n    os._exit(7)\n")
+        sys.path.insert(0, directory)
+        self.addCleanup(sys.path.remove, directory)
+        kb = formula_to_clauses(parse_sentence("A & !A"))
+        configurations = [("crash", "crashing_resolver", {})]
+        with self.assertRaisesRegex(RuntimeError, r"failed \(exit code 7\)"):
+            portfolio.resolve(kb, False, configurations=configurations)
+
+
+class TestBudget(unittest.TestCase):
+    """Tests for the budget module."""
+
+    def pigeonhole(self, pigeons):
+        """Clauses stating that the pigeons fit in one fewer holes."""
+        holes = pigeons - 1
+        sentence = " & ".join(
+            ["(" + " | ".join(f"P{i}H{j}" for j in range(holes)) + ")" for i in range(pigeons)] +
+            [f"(!P{a}H{j} | !P{b}H{j})" for j in range(holes)
+             for a in range(pigeons) for b in range(a + 1, pigeons)])
+        return formula_to_clauses(parse_sentence(sentence))
+
+    def test_check(self):
+        """Test that the first exceeded limit is reported."""
+        budget = Budget(max_clauses=10)
+        budget.start()
+        self.assertFalse(budget.check(10))
+        self.assertTrue(budget.check(11))
+        self.assertEqual(budget.reason, "clause limit of 10")
+        budget.start()
+        self.assertIsNone(budget.reason)
+
+        budget = Budget(timeout=0)
+        budget.start()
+        self.assertTrue(budget.check(0))
+        self.assertEqual(budget.reason, "timeout of 0 seconds")
+
+    def test_unknown_result(self):
+        """Test that every resolver stops with an unknown result when the budget runs out."""
+        clauses = self.pigeonhole(8)
+        for resolve_function in (resolve, resolver_new.resolve, resolver_given.resolve, resolver_cdcl.resolve):
+            budget = Budget(timeout=0, max_clauses=50)
+            result, _, _, stats = resolve_function(list(clauses), False, budget=budget)
+            self.assertIsNone(result)
+            self.assertEqual(stats["budget_exceeded"], budget.reason)
+
+    def test_within_budget(self):
+        """Test that a generous budget does not change the result."""
+        kb = formula_to_clauses(parse_sentence("(A > B) & (B > C) & A"))
+        negated_query = formula_to_clauses(parse_sentence("C"), negate=True)
+        result, _, _, stats = resolve(kb + negated_query, False, budget=Budget(timeout=60, max_clauses=1000))
+        self.assertTrue(result)
+        self.assertNotIn("budget_exceeded", stats)
+
+
+class TestMemoryMonitor(unittest.TestCase):
+    """Tests for the memory monitor module."""
+
+    def test_schedule(self):
+        """Test that samples are taken every interval clauses and thinned out when full."""
+        monitor = MemoryMonitor(interval=10)
+        monitor.start()
+        for clause_count in range(1, 100):
+            monitor.sample(clause_count)
+        self.assertEqual([clauses for _, clauses, _ in monitor.samples], list(range(0, 100, 10)))
+
+        monitor = MemoryMonitor(interval=1)
+        monitor.start()
+        for clause_count in range(1, 2 * memory_monitor.MAX_SAMPLES):
+            monitor.sample(clause_count)
+        self.assertLessEqual(len(monitor.samples), memory_monitor.MAX_SAMPLES)
+        self.assertGreater(monitor.interval, 1)
+        self.assertEqual(monitor.samples[0][1], 0)
+
+        # Restarting resets the interval doubled by the previous search
+        monitor.start()
+        self.assertEqual(monitor.interval, 1)
+        monitor.sample(1)
+        self.assertEqual([clauses for _, clauses, _ in monitor.samples], [0, 1])
+
+    def test_tracemalloc_peak(self):
+        """Test that the traced peak includes memory freed before the next sample."""
+        monitor = MemoryMonitor("tracemalloc", interval=1000)
+        monitor.start()
+        block = bytearray(8 * 1024 * 1024)
+        del block
+        stats = {}
+        peak = monitor.stop(10, stats)
+        self.assertGreaterEqual(peak - monitor.baseline, 8)
+        self.assertGreater(stats["memory_bytes_per_clause"], 0)
+        self.assertEqual(stats["memory_policy"], "tracemalloc")
+
+    def test_resolver_stats(self):
+        """Test that every resolver reports memory statistics with the given monitor."""
+        kb = formula_to_clauses(parse_sentence("(A > B) & (B > C) & A"))
+        negated_query = formula_to_clauses(parse_sentence("C"), negate=True)
+        for resolve_function in (resolve, resolver_new.resolve, resolver_given.resolve, resolver_cdcl.resolve):
+            monitor = MemoryMonitor(interval=1)
+            result, _, peak_memory, stats = resolve_function(kb + negated_query, False, memory=monitor)
+            self.assertTrue(result)
+            self.assertEqual(peak_memory, monitor.peak)
+            self.assertGreaterEqual(len(stats["memory_samples"]), 2)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Tests for the benchmark module."""
+
+    def test_families(self):
+        """Test that generated instances have the expected result."""
+        for name, size in benchmark.instances(sizes=[3, 4]):
+            sentences, query, expected = benchmark.FAMILIES[name](size)
+            clauses = []
+            for sentence in sentences:
+                clauses += formula_to_clauses(parse_sentence(sentence))
+            if query is not None:
+                clauses += formula_to_clauses(parse_sentence(query), negate=True)
+            result, _, _, _ = resolver_cdcl.resolve(clauses, False)
+            if expected is not None:
+                self.assertEqual(result, expected, (name, size))
+
+    def test_run_benchmark(self):
+        """Test that a run in a separate process reports its measurements."""
+        record = benchmark.run_benchmark("horn-chain", 5, "given-clause", "tseitin", timeout=30)
+        self.assertEqual(record["status"], "ok")
+        self.assertTrue(record["result"])
+        for metric in benchmark.METRICS:
+            self.assertIn(metric, record)
+
+    def test_compare_results(self):
+        """Test that only growth beyond the threshold and lost answers are regressions."""
+        def results(*records):
+            return {"results": [dict(zip(("family", "size", "resolver", "cnf", "status", "time", "peak_memory",
+                                          "clause_pairs_examined", "clauses_generated"), record))
+                                for record in records]}
+        baseline = results(("coloring", 5, "cdcl", "naive", "ok", 1.0, 20.0, 100, 100),
+                           ("coloring", 8, "cdcl", "naive", "ok", 0.01, 20.0, 100, 100),
+                           ("horn-chain", 5, "cdcl", "naive", "ok", 1.0, 20.0, 100, 100))
+        current = results(("coloring", 5, "cdcl", "naive", "ok", 1.2, 20.0, 100, 200),
+                          ("coloring", 8, "cdcl", "naive", "ok", 0.03, 20.0, 100, 100),
+                          ("horn-chain", 5, "cdcl", "naive", "timeout", 5.0, 20.0, 100, 100))
+        self.assertEqual(benchmark.compare_results(current, baseline, threshold=0.25),
+                         [(("coloring", 5, "cdcl", "naive"), "clauses_generated", 100, 200),
+                          (("horn-chain", 5, "cdcl", "naive"), "status", "ok", "timeout")])
+
+
+class TestProfiling(unittest.TestCase):
+    """Tests for the profiling module."""
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_by_default(self):
+        """Test that hot-loop functions are left unwrapped while profiling is disabled."""
+        self.assertFalse(profiling.current().enabled)
+        self.assertIs(profiling.timed(resolve_clause_pair, "resolvent generation"), resolve_clause_pair)
+        with profiling.phase("parse"):
+            pass
+
+    def test_nested_phases(self):
+        """Test that phases entered inside other phases are recorded as their parts."""
+        profiler = profiling.enable()
+        with profiling.phase("loading"):
+            parse_sentence("A & B")
+            parse_sentence("A | C")
+        parse_sentence("C")
+        double = profiling.timed(lambda x: 2 * x, "double")
+        self.assertEqual(double(21), 42)
+        profiling.count("rounds", 2)
+        report = {path: (calls, depth) for path, _, calls, depth in profiler.report()}
+        self.assertEqual(report, {"loading": (1, 0), "loading/parse": (2, 1), "parse": (1, 0), "double": (1, 0)})
+        self.assertEqual(profiler.counters, {"rounds": 2})
+
+    def test_resolver_phases(self):
+        """Test that the new resolver reports resolvent generation and subsumption."""
+        profiler = profiling.enable()
+        kb_cnf = to_cnf(segment_sentence("(A > B) & (B > C) & A"))
+        with profiling.phase("resolution"):
+            result, _, _, _ = resolver_new.resolve(kb_cnf + ['&'] + to_cnf(segment_sentence("!(C)")), False)
+        self.assertTrue(result)
+        paths = {path for path, _, _, _ in profiler.report()}
+        self.assertTrue({"cnf conversion", "parse", "resolution/clause conversion",
+                         "resolution/resolvent generation", "resolution/subsumption"} <= paths)
+
+
+class TestProof(unittest.TestCase):
+    """Tests for derivation records, proofs and trace writing."""
+
+    def setUp(self):
+        self.sentence = to_cnf(segment_sentence("(A > B) & (B > C) & (D > E) & A & D & !(C)"))
+        self.formula = sentence_to_clause_set(self.sentence)
+
+    def test_refutation(self):
+        """Test that both resolvers record a refutation that only uses the clauses it needs."""
+        for resolve_function in (resolve, resolver_new.resolve):
+            derivation = Derivation()
+            result, _, _, _ = resolve_function(self.sentence, False, proof=derivation)
+            self.assertTrue(result)
+            proof = derivation.refutation()
+            proof.check(self.formula)
+            self.assertEqual({format_clause(clause) for clause in proof.inputs()}, {"[!A, B]", "[!B, C]", "[A]", "[!C]"})
+            self.assertEqual(len(proof), 7)
+
+    def test_tracecheck_round_trip(self):
+        """Test that a written TraceCheck proof is read back and checked against its DIMACS formula."""
+        derivation = Derivation()
+        resolve(self.sentence, False, proof=derivation)
+        proof = derivation.refutation()
+        clauses = list(self.formula)
+        variables = variable_numbers(clauses)
+        with tempfile.TemporaryDirectory() as directory:
+            formula_file = os.path.join(directory, "proof.cnf")
+            proof_file = os.path.join(directory, "proof.trace")
+            with open(formula_file, "w") as file:
+                write_dimacs(clauses, file, variables)
+            with open(proof_file, "w") as file:
+                proof.write_tracecheck(file, variables)
+            read_back = read_tracecheck(proof_file)
+            read_back.check(set(read_dimacs(formula_file, named=False)))
+            self.assertEqual(len(read_back), len(proof))
+
+            # Claim a different resolvent for the last step
+            with open(proof_file) as file:
+                lines = file.read().splitlines()
+            lines[-1] = lines[-1].replace(" 0 ", f" {variables[encode_literal('A')]} 0 ", 1)
+            with open(proof_file, "w") as file:
+                file.write("\n".join(lines) + "\n")
+            with self.assertRaises(ValueError):
+                read_tracecheck(proof_file).check()
+
+    def test_drat(self):
+        """Test that DRAT output lists the derived clauses, ending with the empty clause."""
+        derivation = Derivation()
+        resolver_new.resolve(self.sentence, False, proof=derivation)
+        proof = derivation.refutation()
+        stream = io.StringIO()
+        proof.write_drat(stream, variable_numbers(list(self.formula)))
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), len(proof) - len(proof.inputs()))
+        self.assertEqual(lines[-1], "0")
+        self.assertTrue(all(line.endswith(" 0") for line in lines[:-1]))
+
+    def test_buffered_trace(self):
+        """Test that steps are only written once the buffer fills or the trace is flushed."""
+        stream = io.StringIO()
+        trace = TraceWriter(stream, buffer_size=2)
+        a, b = clause_to_frozenset(['A']), clause_to_frozenset(['!', 'A', '|', 'B'])
+        resolvent, eliminated = resolve_clause_pair(a, b)[0]
+        trace.step(a, b, resolvent, eliminated)
+        self.assertEqual(stream.getvalue(), "")
+        trace.message("Done")
+        self.assertEqual(stream.getvalue(), "  Step 1: Resolving [A] and [!A, B]\n    Derived: [B]\n"
+                                            "    (Eliminated: A/!A)\nDone\n")
+        self.assertEqual(trace.steps, 1)
+
+
+class TestJSONOutput(unittest.TestCase):
+    """Tests for the --format json output of main.py."""
+
+    def run_main(self, *arguments):
+        return subprocess.run([sys.executable, "main.py", *arguments, "--format", "json"],
+                              capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    def test_input_tautologies_counted(self):
+        """Test that tautological knowledge base lines count as discarded tautologies for every resolver."""
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+            file.write("A | !A\nB\n")
+        self.addCleanup(os.remove, file.name)
+        for resolver_name, encoding in (("default", "naive"), ("new", "tseitin"), ("cdcl", "naive")):
+            completed = self.run_main(file.name, "--no-query", "--resolver", resolver_name, "--cnf", encoding)
+            record = json.loads(completed.stdout)
+            self.assertEqual(record["stats"]["tautologies_discarded"], 1, resolver_name)
+
+    def test_single_record(self):
+        """Test that a query writes one JSON record to stdout and its messages to stderr."""
+        completed = self.run_main("datasets/kb1.txt", "datasets/q1.txt")
+        self.assertEqual(completed.returncode, 0)
+        lines = completed.stdout.splitlines()
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual(record["result"], "entailed")
+        self.assertEqual(record["exit_code"], 0)
+        self.assertEqual(len(record["kb_sha256"]), 64)
+        self.assertEqual(record["config"]["resolver"], "default")
+        self.assertIn("clauses_generated", record["stats"])
+        self.assertNotIn("\x1b", completed.stderr)
+
+    def test_batch_json_lines(self):
+        """Test that batch mode writes one record per query and a summary record."""
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+            file.write("Girl\nBoy\n")
+        self.addCleanup(os.remove, file.name)
+        completed = self.run_main("datasets/kb1.txt", file.name, "--batch")
+        records = [json.loads(line) for line in completed.stdout.splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual([record["query_number"] for record in records[:2]], [1, 2])
+        self.assertEqual([record["result"] for record in records[:2]], ["entailed", "not entailed"])
+        self.assertTrue(records[2]["summary"])
+        self.assertEqual(records[2]["queries"], 2)
+        self.assertEqual(completed.returncode, records[2]["exit_code"])
+
 
 if __name__ == '__main__':
     unittest.main()